@@ -11,11 +11,12 @@ from collections import Counter, deque, defaultdict
 from collections.abc import Collection, MutableSequence
 from enum import IntEnum, IntFlag
 from typing import (AbstractSet, Any, Callable, ClassVar, Dict, Iterable, Iterator, List, Literal, Mapping, NamedTuple,
-                    Optional, Protocol, Set, Tuple, Union, TYPE_CHECKING, Literal, overload)
+                    Optional, Protocol, Sequence, Set, Tuple, Union, TYPE_CHECKING, Literal, overload)
 import dataclasses
 
 from typing_extensions import NotRequired, TypedDict
 
+import GenerationProfiler
 import NetUtils
 import Options
 import Utils
@@ -134,6 +135,74 @@ class MultiWorld():
                     f"{region.name} already exists in region cache."
                 self.region_cache[region.player][region.name] = region
 
+        def add_region_table(self, multiworld: MultiWorld, player: int, region_names: Sequence[str],
+                             location_names: Sequence[str] = (), location_ids: Sequence[Optional[int]] = (),
+                             location_regions: Sequence[int] = (), exit_regions: Sequence[int] = (),
+                             exit_targets: Sequence[int] = (), exit_names: Optional[Sequence[str]] = None,
+                             exit_rules: Optional[Sequence[Optional[Callable[[CollectionState], bool]]]] = None,
+                             region_type: type[Region] | None = None,
+                             location_type: type[Location] | None = None) -> List[Region]:
+            """
+            Creates regions with their locations and exits from columns, which is faster than adding them one by one.
+            Locations and exits refer to their parent region, and exits to the region they connect to, by index in
+            region_names. Everything is added in the order of the columns.
+
+            :param region_names: names of the regions to be created
+            :param location_names: names of the locations to be created
+            :param location_ids: address of each location
+            :param location_regions: index of the parent region of each location
+            :param exit_regions: index of the parent region of each exit
+            :param exit_targets: index of the region each exit connects to
+            :param exit_names: name of each exit, if not provided exits are named "parent -> target"
+            :param exit_rules: access rule of each exit, None keeps the default rule
+            :param region_type: Region class to create the regions with
+            :param location_type: Location class to create the locations with
+            :return: the created regions, in the order of region_names
+            """
+            if region_type is None:
+                region_type = Region
+            if location_type is None:
+                location_type = Location
+            entrance_type = region_type.entrance_type
+
+            regions = [region_type(name, player, multiworld) for name in region_names]
+            locations = [location_type(player, name, address, regions[parent])
+                         for name, address, parent in zip(location_names, location_ids, location_regions, strict=True)]
+            if exit_names is None:
+                exit_names = [f"{region_names[parent]} -> {region_names[target]}"
+                              for parent, target in zip(exit_regions, exit_targets, strict=True)]
+            exits = [entrance_type(player, name, regions[parent])
+                     for name, parent in zip(exit_names, exit_regions, strict=True)]
+            connections = list(zip(exits, [regions[target] for target in exit_targets], strict=True))
+            if exit_rules is not None:
+                for exit_, rule in zip(exits, exit_rules, strict=True):
+                    if rule is not None:
+                        exit_.access_rule = rule
+
+            new_regions = self._by_new_name(self.region_cache[player], regions, "region")
+            new_locations = self._by_new_name(self.location_cache[player], locations, "location")
+            new_exits = self._by_new_name(self.entrance_cache[player], exits, "entrance")
+            self.region_cache[player].update(new_regions)
+            self.location_cache[player].update(new_locations)
+            self.entrance_cache[player].update(new_exits)
+
+            for location in locations:
+                location.parent_region.locations._list.append(location)
+            for exit_, target in connections:
+                exit_.parent_region.exits._list.append(exit_)
+                exit_.connect(target)
+            return regions
+
+        @staticmethod
+        def _by_new_name(cache: Dict[str, Any], objects: List[Union[Region, Location, Entrance]],
+                         kind: str) -> Dict[str, Any]:
+            by_name = {obj.name: obj for obj in objects}
+            if len(by_name) != len(objects) or not by_name.keys().isdisjoint(cache):
+                names = Counter(obj.name for obj in objects)
+                duplicates = [name for name in names if names[name] > 1 or name in cache]
+                raise AssertionError(f"{', '.join(duplicates)} already exists in {kind} cache.")
+            return by_name
+
         def add_group(self, new_id: int):
             self.region_cache[new_id] = {}
             self.entrance_cache[new_id] = {}
@@ -174,7 +243,7 @@ class MultiWorld():
                 self.__dict__.setdefault(attr, {})[player] = val
             set_player_attr('plando_item_blocks', [])
             set_player_attr('game', "Archipelago")
-            set_player_attr('completion_condition', lambda state: True)
+            set_player_attr('completion_condition', always_accessible)
         self.worlds = {}
         self.per_slot_randoms = Utils.DeprecateDict("Using per_slot_randoms is now deprecated. Please use the "
                                                     "world's random object instead (usually self.random)", True)
@@ -813,6 +882,7 @@ class CollectionState():
             queue.extend(blocked_connections)
 
     def copy(self) -> CollectionState:
+        GenerationProfiler.count("state_copies")
         ret = CollectionState(self.multiworld)
         ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
         ret.reachable_regions = {player: region_set.copy() for player, region_set in
@@ -951,6 +1021,7 @@ class CollectionState():
         :param checked_locations: Optional override of locations to filter out from the locations argument, defaults to
         self.advancements when None.
         """
+        GenerationProfiler.count("sweeps")
         if checked_locations is None:
             checked_locations = self.advancements
 
@@ -1171,15 +1242,48 @@ class EntranceType(IntEnum):
     TWO_WAY = 2
 
 
+def always_accessible(state: CollectionState) -> bool:
+    """The default access rule of locations and entrances."""
+    return True
+
+
+def allow_any_item(item: Item) -> bool:
+    """The default item rule of locations."""
+    return True
+
+
+def never_allow(state: CollectionState, item: Item) -> bool:
+    """The default always_allow of locations."""
+    return False
+
+
+def get_slot_defaults(cls: type, base: type, defaults: Tuple[Tuple[str, Any], ...]) -> Tuple[Tuple[str, Any], ...]:
+    """Returns the slot defaults of base that are not replaced by a class attribute of cls, like an access_rule method."""
+    replaced = {name for klass in cls.__mro__ if klass is not base and issubclass(klass, base) for name in vars(klass)}
+    return tuple((name, default) for name, default in defaults if name not in replaced)
+
+
 class Entrance:
-    access_rule: Callable[[CollectionState], bool] = staticmethod(lambda state: True)
-    hide_path: bool = False
+    """
+    Entrances are slotted to save memory, subclasses can declare __slots__ for their additional attributes, or keep a
+    __dict__ by not declaring any.
+    """
+    __slots__ = ("player", "name", "parent_region", "connected_region", "randomization_group", "randomization_type",
+                 "access_rule", "hide_path")
+    access_rule: Callable[[CollectionState], bool]
+    hide_path: bool
     player: int
     name: str
     parent_region: Optional[Region]
-    connected_region: Optional[Region] = None
+    connected_region: Optional[Region]
     randomization_group: int
     randomization_type: EntranceType
+    slot_defaults: ClassVar[Tuple[Tuple[str, Any], ...]] = (
+        ("connected_region", None), ("access_rule", always_accessible), ("hide_path", False))
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.slot_defaults = get_slot_defaults(cls, Entrance, Entrance.slot_defaults)
 
     def __init__(self, player: int, name: str = "", parent: Optional[Region] = None,
                  randomization_group: int = 0, randomization_type: EntranceType = EntranceType.ONE_WAY) -> None:
@@ -1188,6 +1292,8 @@ class Entrance:
         self.player = player
         self.randomization_group = randomization_group
         self.randomization_type = randomization_type
+        for attribute, default in self.slot_defaults:
+            setattr(self, attribute, default)
 
     def can_reach(self, state: CollectionState) -> bool:
         assert self.parent_region, f"called can_reach on an Entrance \"{self}\" with no parent_region"
@@ -1234,6 +1340,11 @@ class Entrance:
 
 
 class Region:
+    """
+    Regions are slotted to save memory, subclasses can declare __slots__ for their additional attributes, or keep a
+    __dict__ by not declaring any.
+    """
+    __slots__ = ("name", "_hint_text", "player", "multiworld", "entrances", "_exits", "_locations")
     name: str
     _hint_text: str
     player: int
@@ -1244,6 +1355,7 @@ class Region:
     entrance_type: ClassVar[type[Entrance]] = Entrance
 
     class Register(MutableSequence):
+        __slots__ = ("_list", "region_manager")
         region_manager: MultiWorld.RegionManager
 
         def __init__(self, region_manager: MultiWorld.RegionManager):
@@ -1270,6 +1382,8 @@ class Region:
             return self._list.copy()
 
     class LocationRegister(Register):
+        __slots__ = ()
+
         def __delitem__(self, index: int) -> None:
             location: Location = self._list[index]
             del self._list[index]
@@ -1282,6 +1396,8 @@ class Region:
             self.region_manager.location_cache[value.player][value.name] = value
 
     class EntranceRegister(Register):
+        __slots__ = ()
+
         def __delitem__(self, index: int) -> None:
             entrance: Entrance = self._list[index]
             del self._list[index]
@@ -1463,24 +1579,39 @@ class LocationProgressType(IntEnum):
 
 
 class Location:
+    """
+    Locations are slotted to save memory, subclasses can declare __slots__ for their additional attributes, or keep a
+    __dict__ by not declaring any.
+    """
     game: str = "Generic"
+    __slots__ = ("player", "name", "address", "parent_region", "item", "locked", "show_in_spoiler", "progress_type",
+                 "always_allow", "access_rule", "item_rule")
     player: int
     name: str
     address: Optional[int]
     parent_region: Optional[Region]
-    locked: bool = False
-    show_in_spoiler: bool = True
-    progress_type: LocationProgressType = LocationProgressType.DEFAULT
-    always_allow: Callable[[CollectionState, Item], bool] = staticmethod(lambda state, item: False)
-    access_rule: Callable[[CollectionState], bool] = staticmethod(lambda state: True)
-    item_rule: Callable[[Item], bool] = staticmethod(lambda item: True)
-    item: Optional[Item] = None
+    locked: bool
+    show_in_spoiler: bool
+    progress_type: LocationProgressType
+    always_allow: Callable[[CollectionState, Item], bool]
+    access_rule: Callable[[CollectionState], bool]
+    item_rule: Callable[[Item], bool]
+    item: Optional[Item]
+    slot_defaults: ClassVar[Tuple[Tuple[str, Any], ...]] = (
+        ("item", None), ("locked", False), ("show_in_spoiler", True), ("progress_type", LocationProgressType.DEFAULT),
+        ("always_allow", never_allow), ("access_rule", always_accessible), ("item_rule", allow_any_item))
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.slot_defaults = get_slot_defaults(cls, Location, Location.slot_defaults)
 
     def __init__(self, player: int, name: str = '', address: Optional[int] = None, parent: Optional[Region] = None):
         self.player = player
         self.name = name
         self.address = address
         self.parent_region = parent
+        for attribute, default in self.slot_defaults:
+            setattr(self, attribute, default)
 
     def can_fill(self, state: CollectionState, item: Item, check_access: bool = True) -> bool:
         return ((
@@ -23,7 +23,8 @@ if __name__ == "__main__":
 
 from MultiServer import CommandProcessor, mark_raw
 from NetUtils import (Endpoint, decode, NetworkItem, encode, JSONtoTextParser, ClientStatus, Permission, NetworkSlot,
-                      RawJSONtoTextParser, add_json_text, add_json_location, add_json_item, JSONTypes, HintStatus, SlotType)
+                      RawJSONtoTextParser, add_json_text, add_json_location, add_json_item, JSONTypes, HintStatus, SlotType,
+                      get_items_checksum, get_locations_checksum)
 from Utils import Version, stream_input, async_start
 from worlds import network_data_package, AutoWorldRegister
 import os
@@ -260,6 +261,7 @@ class CommonContext:
             self._archipelago_lookup: typing.Dict[int, str] = {}
             self._game_store: typing.Dict[str, typing.ChainMap[int, str]] = collections.defaultdict(
                 lambda: collections.ChainMap(self._archipelago_lookup, Utils.KeyedDefaultDict(self._unknown_item)))
+            self._name_indexes: typing.Dict[str, Utils.NameIndex] = {}
 
         # noinspection PyTypeChecker
         def __getitem__(self, key: str) -> typing.Mapping[int, str]:
@@ -298,12 +300,23 @@ class CommonContext:
 
             return self.lookup_in_game(code, self.ctx.slot_info[slot].game)
 
+        def name_index(self, game_name: str) -> Utils.NameIndex:
+            """Returns an index of the names of a game for searching them, built once per data package of the game."""
+            name_index = self._name_indexes.get(game_name)
+            if name_index is None:
+                name_index = Utils.NameIndex(self._game_store[game_name].values())
+                self._name_indexes[game_name] = name_index
+            return name_index
+
         def update_game(self, game: str, name_to_id_lookup_table: typing.Dict[str, int]) -> None:
             """Overrides existing lookup tables for a particular game."""
             id_to_name_lookup_table = Utils.KeyedDefaultDict(self._unknown_item)
             id_to_name_lookup_table.update({code: name for name, code in name_to_id_lookup_table.items()})
             self._game_store[game] = collections.ChainMap(self._archipelago_lookup, id_to_name_lookup_table)
+            self._name_indexes.pop(game, None)
             if game == "Archipelago":
+                # every game's names include Archipelago's
+                self._name_indexes.clear()
                 # Keep track of the Archipelago data package separately so if it gets updated in a custom datapackage,
                 # it updates in all chain maps automatically.
                 self._archipelago_lookup.clear()
@@ -325,6 +338,13 @@ class CommonContext:
     generator_version: Version = Version(0, 0, 0)
     current_energy_link_value: typing.Optional[int] = None  # to display in UI, gets set by server
     max_size: int = 16*1024*1024  # 16 MB of max incoming packet size
+    resume_connection: bool = False
+    """
+    Offer the state of the last connection when reconnecting, so the server only sends what changed.
+    Only for clients that don't need the full items and locations again on every connect, i.e. to rewrite game files.
+    """
+    packed_items: bool = True
+    """Ask the server for items packed into a list per field with the PackedItems tag, decoded by NetUtils"""
 
     last_death_link: float = time.time()  # last send/received death link on AP layer
 
@@ -371,6 +391,8 @@ class CommonContext:
     """
     items_received: list[NetworkItem]
     """List of NetworkItems recieved from the server"""
+    previous_items_received: list[NetworkItem]
+    """items_received of the last connection, kept to resume from when reconnecting"""
     missing_locations: set[int]
     """Container of Locations that are unchecked per server state"""
     checked_locations: set[int]
@@ -396,6 +418,9 @@ class CommonContext:
     """Message box reporting a loss of connection"""
 
     def __init__(self, server_address: typing.Optional[str] = None, password: typing.Optional[str] = None) -> None:
+        if self.packed_items:
+            self.tags = self.tags | {"PackedItems"}
+
         # server state
         self.server_address = server_address
         self.username = None
@@ -419,6 +444,7 @@ class CommonContext:
         self.locations_checked = set()  # local state
         self.locations_scouted = set()
         self.items_received = []
+        self.previous_items_received = []
         self.missing_locations = set()  # server state
         self.checked_locations = set()  # server state
         self.server_locations = set()  # all locations the server knows of, missing_location | checked_locations
@@ -473,6 +499,8 @@ class CommonContext:
         self.auth = None
         self.slot = None
         self.team = None
+        if self.items_received:
+            self.previous_items_received = self.items_received
         self.items_received = []
         self.locations_info = {}
         self.server_version = Version(0, 0, 0)
@@ -538,11 +566,24 @@ class CommonContext:
             'tags': self.tags, 'items_handling': self.items_handling,
             'uuid': Utils.get_unique_identifier(), 'game': self.game, "slot_data": self.want_slot_data,
         }
+        resume = self.get_resume_info()
+        if resume:
+            payload["resume"] = resume
         if kwargs:
             payload.update(kwargs)
         await self.send_msgs([payload])
         await self.send_msgs([{"cmd": "Get", "keys": ["_read_race_mode"]}])
 
+    def get_resume_info(self) -> dict[str, typing.Any] | None:
+        """Describes the items and locations kept from the last connection for the resume argument of Connect."""
+        if not self.resume_connection or not (self.previous_items_received or self.server_locations):
+            return None
+        return {
+            "items_index": len(self.previous_items_received),
+            "items_checksum": get_items_checksum(self.previous_items_received),
+            "locations_checksum": get_locations_checksum(self.checked_locations, self.missing_locations),
+        }
+
     async def check_locations(self, locations: typing.Collection[int]) -> set[int]:
         """Send new location checks to the server. Returns the set of actually new locations that were sent."""
         locations = set(locations) & self.missing_locations
@@ -1011,6 +1052,12 @@ async def process_server_cmd(ctx: CommonContext, args: dict):
             raise Exception('Connection refused by the multiworld host, no reason provided')
 
     elif cmd == 'Connected':
+        resume = args.get("resume", {})
+        # items past this index follow in ReceivedItems
+        ctx.items_received = ctx.previous_items_received[:resume.get("items_index", 0)]
+        ctx.previous_items_received = []
+        if ctx.items_received:
+            ctx.watcher_event.set()
         ctx.username = ctx.auth
         ctx.team = args["team"]
         ctx.slot = args["slot"]
@@ -1047,8 +1094,13 @@ async def process_server_cmd(ctx: CommonContext, args: dict):
         # This list is used to only send to the server what is reported as ACTUALLY Missing.
         # This also serves to allow an easy visual of what locations were already checked previously
         # when /missing is used for the client side view of what is missing.
-        ctx.missing_locations = set(args["missing_locations"])
-        ctx.checked_locations = set(args["checked_locations"])
+        if resume.get("locations"):
+            # the server left out the locations, as ours are still current
+            args["missing_locations"] = list(ctx.missing_locations)
+            args["checked_locations"] = list(ctx.checked_locations)
+        else:
+            ctx.missing_locations = set(args["missing_locations"])
+            ctx.checked_locations = set(args["checked_locations"])
         ctx.server_locations = ctx.missing_locations | ctx. checked_locations
 
         server_url = urllib.parse.urlparse(ctx.server_address)
@@ -1061,6 +1113,10 @@ async def process_server_cmd(ctx: CommonContext, args: dict):
             ctx.items_received = []
         elif start_index != len(ctx.items_received):
             sync_msg = [{'cmd': 'Sync'}]
+            if ctx.resume_connection and ctx.items_received:
+                # only ask for the items after the ones we have
+                sync_msg[0]["items_index"] = len(ctx.items_received)
+                sync_msg[0]["items_checksum"] = get_items_checksum(ctx.items_received)
             if ctx.locations_checked:
                 sync_msg.append({"cmd": "LocationChecks",
                                  "locations": list(ctx.locations_checked)})
@@ -1193,6 +1249,7 @@ def run_as_textclient(*args):
         game = ""  # empty matches any game since 0.3.2
         items_handling = 0b111  # receive all items for /received
         want_slot_data = False  # Can't use game specific slot_data
+        resume_connection = True  # received items are only listed, there is no game to deliver them to again
 
         async def server_auth(self, password_requested: bool = False):
             if password_requested and not self.password:
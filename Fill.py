@@ -4,6 +4,7 @@ import logging
 import typing
 from collections import Counter, deque
 
+import GenerationProfiler
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, PlandoItemBlock
 from Options import Accessibility
 
@@ -33,6 +34,7 @@ def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item]
     return new_state
 
 
+@GenerationProfiler.profiled("fill", name_argument="name")
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
@@ -250,6 +252,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     item_pool.extend(unplaced_items)
 
 
+@GenerationProfiler.profiled("fill", name_argument="name")
 def remaining_fill(multiworld: MultiWorld,
                    locations: typing.List[Location],
                    itempool: typing.List[Item],
@@ -726,6 +729,7 @@ def flood_items(multiworld: MultiWorld) -> None:
                 break
 
 
+@GenerationProfiler.profiled("balancing")
 def balance_multiworld_progression(multiworld: MultiWorld) -> None:
     # A system to reduce situations where players have no checks remaining, popularly known as "BK mode."
     # Overall progression balancing algorithm:
@@ -786,6 +790,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                 if not location.locked:
                     reachable_locations_count[location.player] += 1
 
+            GenerationProfiler.count("balancing_passes")
             logging.debug(f"Sphere {sphere_num}")
             logging.debug(f"Reachable locations: {reachable_locations_count}")
             debug_percentages = {
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import copy
+import hashlib
 import logging
 import os
 import random
@@ -49,6 +51,21 @@ def mystery_argparse():
                         help="Output rolled player options to csv (made for async multiworld).")
     parser.add_argument("--plando", default=defaults.plando_options,
                         help="List of options that can be set manually. Can be combined, for example \"bosses, items\"")
+    parser.add_argument("--roll_workers", default=1, type=lambda value: max(int(value), 1),
+                        help="Number of processes used to roll player options. "
+                             "Results are the same for any number of processes.")
+    parser.add_argument("--output_processes", default=0, type=lambda value: max(int(value), 0),
+                        help="Number of processes used to generate output of worlds that support it. "
+                             "0 generates all output in threads.")
+    parser.add_argument("--stage_threads", default=0, type=lambda value: max(int(value), 0),
+                        help="Number of threads used to call the generation steps of worlds that support it, "
+                             "before fill. Results are the same for any number of threads.")
+    parser.add_argument("--share_output_files", action="store_true",
+                        help="Store files that patches share, like a base patch, once in the output zip. "
+                             "Patches then need those files next to them, or have to be uploaded to a WebHost.")
+    parser.add_argument("--profile_out", "--profile-out",
+                        help="Write a json report of time and memory spent per generation step to this path. "
+                             "Compare two reports with GenerationProfiler.py.")
     parser.add_argument("--skip_prog_balancing", action="store_true",
                         help="Skip progression balancing step during generation.")
     parser.add_argument("--skip_output", action="store_true",
@@ -95,6 +112,9 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
         logging.info("Race mode enabled. Using non-deterministic random source.")
         random.seed()  # reset to time-based random source
 
+    # every roll gets its own RNG derived from this, so rolls don't depend on order or process
+    roll_seed = random.getrandbits(64)
+
     weights_cache: dict[str, tuple[Any, ...]] = {}
     if args.weights_file_path and os.path.exists(args.weights_file_path):
         try:
@@ -129,7 +149,7 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
             path = os.path.join(args.player_files_path, fname)
             try:
                 weights_for_file = []
-                for doc_idx, yaml in enumerate(read_weights_yamls(path)):
+                for doc_idx, yaml in enumerate(read_weights_yamls(path, use_cache=True)):
                     if yaml is None:
                         logging.warning(f"Ignoring empty yaml document #{doc_idx + 1} in {fname}")
                     else:
@@ -179,10 +199,10 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
     erargs.spoiler_only = args.spoiler_only
     erargs.name = {}
     erargs.csv_output = args.csv_output
-
-    settings_cache: dict[str, tuple[argparse.Namespace, ...]] = \
-        {fname: (tuple(roll_settings(yaml, args.plando) for yaml in yamls) if args.sameoptions else None)
-         for fname, yamls in weights_cache.items()}
+    erargs.profile_out = args.profile_out
+    erargs.output_processes = args.output_processes
+    erargs.stage_threads = args.stage_threads
+    erargs.share_output_files = args.share_output_files
 
     if meta_weights:
         for category_name, category_dict in meta_weights.items():
@@ -207,38 +227,50 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
     name_counter = Counter()
     erargs.player_options = {}
 
+    # each file fills as many consecutive slots as it has yamls, starting from the first slot that uses it
+    roll_jobs: list[tuple[int, str, int]] = []
     player = 1
     while player <= args.multi:
         path = player_path_cache[player]
-        if path:
-            try:
-                settings: tuple[argparse.Namespace, ...] = settings_cache[path] if settings_cache[path] else \
-                    tuple(roll_settings(yaml, args.plando) for yaml in weights_cache[path])
-                for settingsObject in settings:
-                    for k, v in vars(settingsObject).items():
-                        if v is not None:
-                            try:
-                                getattr(erargs, k)[player] = v
-                            except AttributeError:
-                                setattr(erargs, k, {player: v})
-                            except Exception as e:
-                                raise Exception(f"Error setting {k} to {v} for player {player}") from e
-
-                    # name was not specified
-                    if player not in erargs.name:
-                        if path == args.weights_file_path:
-                            # weights file, so we need to make the name unique
-                            erargs.name[player] = f"Player{player}"
-                        else:
-                            # use the filename
-                            erargs.name[player] = os.path.splitext(os.path.split(path)[-1])[0]
-                    erargs.name[player] = handle_name(erargs.name[player], player, name_counter)
-
-                    player += 1
-            except Exception as e:
-                raise ValueError(f"File {path} is invalid. Please fix your yaml.") from e
-        else:
+        if not path:
             raise RuntimeError(f'No weights specified for player {player}')
+        for yaml_index in range(len(weights_cache[path])):
+            roll_jobs.append((player, path, yaml_index))
+            player += 1
+
+    # with --sameoptions slots share the rolls of their file, so the RNG is derived from the file instead of the slot
+    roll_keys = [f"{path}_{yaml_index}" if args.sameoptions else str(player) for player, path, yaml_index in roll_jobs]
+    unique_rolls: dict[str, tuple[str, int]] = {}
+    for roll_key, (_, path, yaml_index) in zip(roll_keys, roll_jobs):
+        unique_rolls.setdefault(roll_key, (path, yaml_index))
+    rolled = dict(zip(unique_rolls, roll_all_settings(
+        [(path, weights_cache[path][yaml_index], f"{roll_seed}_{roll_key}")
+         for roll_key, (path, yaml_index) in unique_rolls.items()],
+        args.plando, args.roll_workers)))
+    rolled_settings = [rolled[roll_key] for roll_key in roll_keys]
+
+    for (player, path, yaml_index), settingsObject in zip(roll_jobs, rolled_settings):
+        try:
+            for k, v in vars(settingsObject).items():
+                if v is not None:
+                    try:
+                        getattr(erargs, k)[player] = v
+                    except AttributeError:
+                        setattr(erargs, k, {player: v})
+                    except Exception as e:
+                        raise Exception(f"Error setting {k} to {v} for player {player}") from e
+
+            # name was not specified
+            if player not in erargs.name:
+                if path == args.weights_file_path:
+                    # weights file, so we need to make the name unique
+                    erargs.name[player] = f"Player{player}"
+                else:
+                    # use the filename
+                    erargs.name[player] = os.path.splitext(os.path.split(path)[-1])[0]
+            erargs.name[player] = handle_name(erargs.name[player], player, name_counter)
+        except Exception as e:
+            raise ValueError(f"File {path} is invalid. Please fix your yaml.") from e
 
     if len(set(name.lower() for name in erargs.name.values())) != len(erargs.name):
         raise Exception(f"Names have to be unique. Names: {Counter(name.lower() for name in erargs.name.values())}")
@@ -246,19 +278,72 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
     return erargs, seed
 
 
-def read_weights_yamls(path) -> tuple[Any, ...]:
+def roll_seeded_settings(weights: dict, plando_options: PlandoOptions, roll_seed: str) -> argparse.Namespace:
+    """Roll options like roll_settings, using an RNG seeded only by roll_seed instead of the shared random state."""
+    random_state = random.getstate()
+    random.seed(roll_seed)
+    try:
+        return roll_settings(weights, plando_options)
+    finally:
+        random.setstate(random_state)
+
+
+def _roll_seeded_settings_job(job: tuple[dict, PlandoOptions, str]) -> argparse.Namespace:
+    return roll_seeded_settings(*job)
+
+
+def roll_all_settings(rolls: list[tuple[str, dict, str]], plando_options: PlandoOptions,
+                      workers: int = 1) -> list[argparse.Namespace]:
+    """
+    Roll options for every (path, weights, roll seed) in rolls, in order.
+    With more than one worker the rolls happen in a process pool, which gives the same results as rolling in-process.
+    """
+    if workers <= 1 or len(rolls) <= 1:
+        results = []
+        for path, weights, roll_seed in rolls:
+            try:
+                results.append(roll_seeded_settings(weights, plando_options, roll_seed))
+            except Exception as e:
+                raise ValueError(f"File {path} is invalid. Please fix your yaml.") from e
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(min(workers, len(rolls))) as executor:
+        futures = [executor.submit(_roll_seeded_settings_job, (weights, plando_options, roll_seed))
+                   for _, weights, roll_seed in rolls]
+        results = []
+        for (path, _, _), future in zip(rolls, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                raise ValueError(f"File {path} is invalid. Please fix your yaml.") from e
+        return results
+
+
+def read_weights_yamls(path, use_cache: bool = False) -> tuple[Any, ...]:
     try:
         if urllib.parse.urlparse(path).scheme in ('https', 'file'):
-            yaml = str(urllib.request.urlopen(path).read(), "utf-8-sig")
+            raw_yaml = urllib.request.urlopen(path).read()
         else:
             with open(path, 'rb') as f:
-                yaml = str(f.read(), "utf-8-sig")
+                raw_yaml = f.read()
     except Exception as e:
         raise Exception(f"Failed to read weights ({path})") from e
 
+    cache_file = Utils.cache_path("yaml", f"{hashlib.sha256(raw_yaml).hexdigest()}.pickle") if use_cache else None
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                weights = Utils.restricted_loads(f.read())
+            # marks the entry as recently used, so it's evicted last
+            os.utime(cache_file)
+            return weights
+        except Exception as e:
+            logging.debug(f"Ignoring broken yaml cache {cache_file}: {e}")
+    yaml = str(raw_yaml, "utf-8-sig")
+
     from yaml.error import MarkedYAMLError
     try:
-        return tuple(parse_yamls(yaml))
+        weights = tuple(parse_yamls(yaml))
     except MarkedYAMLError as ex:
         if ex.problem_mark:
             lines = yaml.splitlines()
@@ -271,6 +356,34 @@ def read_weights_yamls(path) -> tuple[Any, ...]:
                             f"\n{relevant_lines}\n{error_line}")
         raise ex
 
+    if cache_file:
+        # parsed yaml that can't round trip through restricted_loads, e.g. with timestamps, is simply not cached
+        try:
+            data = Utils.restricted_dumps(weights)
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(cache_file + ".tmp", cache_file)
+            evict_yaml_cache(os.path.dirname(cache_file))
+        except Exception as e:
+            logging.debug(f"Could not cache yaml {path}: {e}")
+    return weights
+
+
+yaml_cache_size = 256
+"""number of parsed yamls kept in the cache, the least recently used ones are removed beyond that"""
+
+
+def evict_yaml_cache(cache_folder: str) -> None:
+    files = [file for file in os.scandir(cache_folder) if file.name.endswith(".pickle")]
+    if len(files) > yaml_cache_size:
+        files.sort(key=lambda file: file.stat().st_mtime)
+        for file in files[:len(files) - yaml_cache_size]:
+            try:
+                os.remove(file.path)
+            except FileNotFoundError:
+                pass  # removed by another generator at the same time
+
 
 def interpret_on_off(value) -> bool:
     return {"on": True, "off": False}.get(value, value)
@@ -0,0 +1,226 @@
+"""
+Opt-in generation profiler.
+
+While a GenerationProfile is active, world calls, fill steps and a few hot operations of generation record their wall time,
+peak traced memory and counts, which can be written to a json report and compared with `python GenerationProfiler.py a b`.
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import inspect
+import json
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+__all__ = ["GenerationProfile", "active", "count", "section", "profiled", "diff_reports"]
+
+report_version = 1
+
+active: Optional["GenerationProfile"] = None
+"""The profile currently recording, if any."""
+
+FuncT = TypeVar("FuncT", bound=Callable[..., Any])
+
+
+class _Frame:
+    __slots__ = ("peak",)
+
+    def __init__(self) -> None:
+        self.peak = 0
+
+
+class GenerationProfile:
+    """
+    Records sections grouped by category plus named counters.
+
+    Peak memory is only tracked for sections on the thread that started the profile, as tracemalloc's peak is global;
+    sections on other threads, like output generation, only record wall time.
+    """
+    sections: Dict[str, List[Dict[str, Any]]]
+    counters: Counter[str]
+    track_memory: bool
+
+    def __init__(self, track_memory: bool = True) -> None:
+        self.sections = {}
+        self.counters = Counter()
+        self.track_memory = track_memory
+        self._owner: Optional[threading.Thread] = None
+        self._frames: List[_Frame] = []
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._start_time = 0.0
+        self.total_time = 0.0
+
+    def start(self) -> None:
+        global active
+        assert active is None, "Another GenerationProfile is already active."
+        self._owner = threading.current_thread()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._frames = [_Frame()]
+        self._start_time = time.perf_counter()
+        active = self
+
+    def stop(self) -> None:
+        global active
+        self.total_time = time.perf_counter() - self._start_time
+        if active is self:
+            active = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def __enter__(self) -> "GenerationProfile":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def _tracks_memory_here(self) -> bool:
+        return self.track_memory and tracemalloc.is_tracing() and threading.current_thread() is self._owner
+
+    @contextmanager
+    def section(self, category: str, name: str, **info: Any) -> Iterator[Dict[str, Any]]:
+        """Time the body as an entry named `name` in `category`. The yielded dict can be used to add extra info."""
+        entry: Dict[str, Any] = {"name": name, **info}
+        track_memory = self._tracks_memory_here()
+        if track_memory:
+            # fold the peak so far into the enclosing section, as the peak gets reset for this one
+            self._frames[-1].peak = max(self._frames[-1].peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._frames.append(_Frame())
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["wall_time"] = time.perf_counter() - start
+            if track_memory:
+                frame = self._frames.pop()
+                entry["peak_memory"] = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            with self._lock:
+                self.sections.setdefault(category, []).append(entry)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] += amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = {
+            "version": report_version,
+            "total_time": self.total_time,
+            "counters": dict(self.counters),
+            "sections": self.sections,
+        }
+        if self.track_memory:
+            report["peak_memory"] = max((entry.get("peak_memory", 0) for entries in self.sections.values()
+                                         for entry in entries), default=0)
+        return report
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+
+@contextmanager
+def section(category: str, name: str, **info: Any) -> Iterator[Optional[Dict[str, Any]]]:
+    """Record a section in the active profile, does nothing if no profile is active."""
+    profile = active
+    if profile is None:
+        yield None
+    else:
+        with profile.section(category, name, **info) as entry:
+            yield entry
+
+
+def count(counter: str, amount: int = 1) -> None:
+    """Increase a counter of the active profile, does nothing if no profile is active."""
+    profile = active
+    if profile is not None:
+        profile.counters[counter] += amount
+
+
+def profiled(category: str, name_argument: Optional[str] = None) -> Callable[[FuncT], FuncT]:
+    """
+    Decorator recording every call of the decorated function as a section while a profile is active.
+    If name_argument is given, the value of that argument is used as the section name instead of the function name.
+    """
+    def decorator(function: FuncT) -> FuncT:
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profile = active
+            if profile is None:
+                return function(*args, **kwargs)
+            name = function.__qualname__
+            if name_argument:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                name = str(bound.arguments[name_argument])
+            with profile.section(category, name):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _totals(report: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Sum up wall time, call count and maximum peak memory per category and name."""
+    totals: Dict[str, Dict[str, float]] = {}
+    for category, entries in report.get("sections", {}).items():
+        for entry in entries:
+            key = f"{category}: {entry['name']}"
+            total = totals.setdefault(key, {"calls": 0, "wall_time": 0.0, "peak_memory": 0})
+            total["calls"] += 1
+            total["wall_time"] += entry["wall_time"]
+            total["peak_memory"] = max(total["peak_memory"], entry.get("peak_memory", 0))
+    return totals
+
+
+def diff_reports(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Returns a human-readable line per section and counter that differs between two reports, largest changes first."""
+    old_totals = _totals(old)
+    new_totals = _totals(new)
+    empty = {"calls": 0, "wall_time": 0.0, "peak_memory": 0}
+    rows = []
+    for key in old_totals.keys() | new_totals.keys():
+        before = old_totals.get(key, empty)
+        after = new_totals.get(key, empty)
+        delta = after["wall_time"] - before["wall_time"]
+        rows.append((abs(delta), f"{key}: {before['wall_time']:.3f}s -> {after['wall_time']:.3f}s ({delta:+.3f}s), "
+                                 f"calls {before['calls']} -> {after['calls']}, "
+                                 f"peak {before['peak_memory'] / 2**20:.1f}MiB -> {after['peak_memory'] / 2**20:.1f}MiB"))
+    rows.sort(key=lambda row: row[0], reverse=True)
+    lines = [f"total: {old.get('total_time', 0):.3f}s -> {new.get('total_time', 0):.3f}s"]
+    lines += [line for _, line in rows]
+    old_counters = old.get("counters", {})
+    new_counters = new.get("counters", {})
+    for counter in sorted(old_counters.keys() | new_counters.keys()):
+        before = old_counters.get(counter, 0)
+        after = new_counters.get(counter, 0)
+        if before != after:
+            lines.append(f"counter {counter}: {before} -> {after} ({after - before:+})")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two generation profiles written by Generate.py --profile_out.")
+    parser.add_argument("old", help="Path to the baseline report.")
+    parser.add_argument("new", help="Path to the report to compare against the baseline.")
+    args = parser.parse_args()
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    print("\n".join(diff_reports(old, new)))
+
+
+if __name__ == "__main__":
+    main()
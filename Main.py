@@ -1,7 +1,9 @@
 import collections
 from collections.abc import Mapping
 import concurrent.futures
+import contextlib
 import logging
+import multiprocessing
 import os
 import tempfile
 import time
@@ -9,6 +11,7 @@ from typing import Any
 import zipfile
 import zlib
 
+import GenerationProfiler
 import worlds
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld
 from Fill import FillError, balance_multiworld_progression, distribute_items_restrictive, flood_items, \
@@ -18,12 +21,27 @@ from Options import StartInventoryPool
 from Utils import __version__, output_path, restricted_dumps, version_tuple
 from settings import get_settings
 from worlds import AutoWorld
+from worlds.Files import AutoPatchRegister, shared_file_ending, split_shared_files
 from worlds.generic.Rules import exclusion_rules, locality_rules
 
 __all__ = ["main"]
 
 
 def main(args, seed=None, baked_server_options: dict[str, object] | None = None):
+    if not args.profile_out:
+        return _main(args, seed, baked_server_options)
+
+    profile = GenerationProfiler.GenerationProfile()
+    profile.start()
+    try:
+        return _main(args, seed, baked_server_options)
+    finally:
+        profile.stop()
+        profile.save(args.profile_out)
+        logging.info(f"Wrote generation profile to {args.profile_out}")
+
+
+def _main(args, seed=None, baked_server_options: dict[str, object] | None = None):
     if not baked_server_options:
         baked_server_options = get_settings().server_options.as_dict()
     assert isinstance(baked_server_options, dict)
@@ -68,7 +86,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     if not args.skip_output and not args.spoiler_only:
         AutoWorld.call_stage(multiworld, "assert_generate")
 
-    AutoWorld.call_all(multiworld, "generate_early")
+    AutoWorld.call_all(multiworld, "generate_early", threads=args.stage_threads)
 
     logger.info('')
 
@@ -104,13 +122,13 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         multiworld.worlds[1].options.local_items.value = set()
 
     logger.info('Creating MultiWorld.')
-    AutoWorld.call_all(multiworld, "create_regions")
+    AutoWorld.call_all(multiworld, "create_regions", threads=args.stage_threads)
 
     logger.info('Creating Items.')
-    AutoWorld.call_all(multiworld, "create_items")
+    AutoWorld.call_all(multiworld, "create_items", threads=args.stage_threads)
 
     logger.info('Calculating Access Rules.')
-    AutoWorld.call_all(multiworld, "set_rules")
+    AutoWorld.call_all(multiworld, "set_rules", threads=args.stage_threads)
 
     for player in multiworld.player_ids:
         exclusion_rules(multiworld, player, multiworld.worlds[player].options.exclude_locations.value)
@@ -137,7 +155,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     multiworld.plando_item_blocks = parse_planned_blocks(multiworld)
 
     AutoWorld.call_all(multiworld, "connect_entrances")
-    AutoWorld.call_all(multiworld, "generate_basic")
+    AutoWorld.call_all(multiworld, "generate_basic", threads=args.stage_threads)
 
     # remove starting inventory from pool items.
     # Because some worlds don't actually create items during create_items this has to be as late as possible.
@@ -225,11 +243,24 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
-        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
-            check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
+        # worlds that can generate output from a snapshot get a worker process, so CPU-bound patching isn't
+        # serialized by the GIL. Everything else keeps using the live multiworld from a thread.
+        process_players = [player for player in output_players if multiworld.worlds[player].output_in_process] \
+            if args.output_processes else []
+        thread_players = [player for player in output_players if player not in process_players]
+        with concurrent.futures.ThreadPoolExecutor(len(thread_players) + 2) as pool, \
+                (concurrent.futures.ProcessPoolExecutor(min(args.output_processes, len(process_players)),
+                                                        # forking while the thread pool runs can deadlock the workers
+                                                        mp_context=multiprocessing.get_context("spawn"))
+                 if process_players else contextlib.nullcontext()) as process_pool:
+            check_accessibility_task = pool.submit(
+                GenerationProfiler.profiled("output")(multiworld.fulfills_accessibility))
 
             output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
-            for player in output_players:
+            for player in process_players:
+                snapshot = AutoWorld.call_single(multiworld, "get_output_snapshot", player)
+                output_file_futures.append(process_pool.submit(AutoWorld.call_from_snapshot, snapshot, temp_dir))
+            for player in thread_players:
                 # skip starting a thread for methods that say "pass".
                 output_file_futures.append(
                     pool.submit(AutoWorld.call_single, multiworld, "generate_output", player, temp_dir))
@@ -351,7 +382,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
                     f.write(bytes([3]))  # version of format
                     f.write(multidata)
 
-            output_file_futures.append(pool.submit(write_multidata))
+            output_file_futures.append(pool.submit(GenerationProfiler.profiled("output")(write_multidata)))
             if not check_accessibility_task.result():
                 if not multiworld.can_beat_game():
                     raise FillError("Game appears as unbeatable. Aborting.", multiworld=multiworld)
@@ -366,17 +397,29 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
 
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
-            multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
+            with GenerationProfiler.section("output", "create_playthrough"):
+                multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
 
         if args.spoiler:
             multiworld.spoiler.to_file(os.path.join(temp_dir, '%s_Spoiler.txt' % outfilebase))
 
         zipfilename = output_path(f"AP_{multiworld.seed_name}.zip")
         logger.info(f"Creating final archive at {zipfilename}")
-        with zipfile.ZipFile(zipfilename, mode="w", compression=zipfile.ZIP_DEFLATED,
-                             compresslevel=9) as zf:
+        with GenerationProfiler.section("output", "create_archive"), \
+                zipfile.ZipFile(zipfilename, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+            shared_files: dict[str, bytes] = {}
             for file in os.scandir(temp_dir):
-                zf.write(file.path, arcname=file.name)
+                if args.share_output_files and AutoPatchRegister.get_handler(file.name):
+                    with open(file.path, "rb") as f:
+                        container, container_shared_files = split_shared_files(f.read())
+                    shared_files.update(container_shared_files)
+                    zf.writestr(file.name, container)
+                else:
+                    zf.write(file.path, arcname=file.name)
+            for shared_hash, data in shared_files.items():
+                zf.writestr(shared_hash + shared_file_ending, data)
+            if shared_files:
+                logger.info(f"Stored {len(shared_files)} shared files once for all patches.")
 
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
@@ -43,7 +43,7 @@ import NetUtils
 import Utils
 from Utils import version_tuple, restricted_loads, Version, async_start, get_intended_text
 from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, encode, NetworkPlayer, Permission, NetworkSlot, \
-    SlotType, LocationStore, MultiData, Hint, HintStatus
+    SlotType, LocationStore, MultiData, Hint, HintStatus, get_items_checksum, get_locations_checksum, pack_network_items
 from BaseClasses import ItemClassification
 
 
@@ -157,6 +157,10 @@ class Client(Endpoint):
         self.remote_items = bool(value & 0b010)
         self.remote_start_inventory = bool(value & 0b100)
 
+    @property
+    def packed_items(self) -> bool:
+        return "PackedItems" in self.tags
+
     @property
     def name(self) -> str:
         ctx = self.ctx()
@@ -187,6 +191,7 @@ class Context:
     locations: LocationStore  # typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
     location_checks: typing.Dict[typing.Tuple[int, int], typing.Set[int]]
     hints_used: typing.Dict[typing.Tuple[int, int], int]
+    received_items: typing.Dict[typing.Tuple[int, int, bool], typing.List[NetworkItem]]
     groups: typing.Dict[int, typing.Set[int]]
     save_version = 2
     stored_data: typing.Dict[str, object]
@@ -205,6 +210,7 @@ class Context:
     spheres: typing.List[typing.Dict[int, typing.Set[int]]]
     """ each sphere is { player: { location_id, ... } } """
     logger: logging.Logger
+    received_items_packets_limit: int = 1024
 
     def __init__(self, host: str, port: int, server_password: str, password: str, location_check_points: int,
                  hint_cost: int, item_cheat: bool, release_mode: str = "disabled", collect_mode="disabled",
@@ -233,6 +239,9 @@ class Context:
         self.countdown_timer = 0
         self.received_items = {}
         self.start_inventory = {}
+        # encoded ReceivedItems packets by team, slot, items handling, format and range of items
+        self.received_items_packets: typing.OrderedDict[typing.Tuple[int, int, bool, bool, bool, int, int], str] = \
+            collections.OrderedDict()
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
         self.hint_cost = hint_cost
@@ -298,8 +307,8 @@ class Context:
 
         for game_package in self.gamespackage.values():
             # remove groups from data sent to clients
-            del game_package["item_name_groups"]
-            del game_package["location_name_groups"]
+            game_package.pop("item_name_groups", None)
+            game_package.pop("location_name_groups", None)
 
     def _init_game_data(self):
         for game_name, game_package in self.gamespackage.items():
@@ -327,6 +336,26 @@ class Context:
     def location_names_for_game(self, game: str) -> typing.Optional[typing.Dict[str, int]]:
         return self.gamespackage[game]["location_name_to_id"] if game in self.gamespackage else None
 
+    def name_index(self, game: str, kind: typing.Literal["items", "locations", "items_and_groups",
+                                                         "locations_and_groups"]) \
+            -> typing.Union[Utils.NameIndex, typing.Collection[str]]:
+        """
+        Returns the names of this kind for game to look up with get_intended_text, indexed once per data package
+        checksum and shared between rooms. Data packages without a checksum get their names as they are.
+        """
+        if kind == "items":
+            names = self.gamespackage[game]["item_name_to_id"]
+        elif kind == "locations":
+            names = self.gamespackage[game]["location_name_to_id"]
+        elif kind == "items_and_groups":
+            names = self.all_item_and_group_names[game]
+        else:
+            names = self.all_location_and_group_names[game]
+        checksum = self.checksums.get(game)
+        if checksum is None:
+            return names
+        return Utils.get_name_index(checksum, kind, names)
+
     # General networking
     async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
@@ -372,6 +401,27 @@ class Context:
                 self.logger.info(f"Outgoing broadcast: {msg}")
             return True
 
+    def encode_received_items(self, client: Client, start_inventory: typing.List[NetworkItem],
+                              items: typing.List[NetworkItem], index: int) -> str:
+        """
+        Returns the encoded ReceivedItems packet of client's start inventory and items from index on. Received items
+        only grow, so it is encoded once for all clients of the slot with the same items handling and item format.
+        """
+        end = len(start_inventory) + len(items)
+        key = (client.team, client.slot, client.remote_items, client.remote_start_inventory, client.packed_items,
+               index, end)
+        packet = self.received_items_packets.get(key)
+        if packet is None:
+            new_items = start_inventory[index:] + items[max(0, index - len(start_inventory)):]
+            packet = self.dumper({"cmd": "ReceivedItems", "index": index,
+                                  "items": pack_network_items(new_items) if client.packed_items else new_items})
+            self.received_items_packets[key] = packet
+            if len(self.received_items_packets) > self.received_items_packets_limit:
+                self.received_items_packets.popitem(last=False)
+        else:
+            self.received_items_packets.move_to_end(key)
+        return packet
+
     def broadcast_all(self, msgs: typing.List[dict]):
         msg_is_text = all(msg["cmd"] == "PrintJSON" for msg in msgs)
         data = self.dumper(msgs)
@@ -1023,6 +1073,23 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
     return ctx.start_inventory.setdefault(player, []) if remote_start_inventory else []
 
 
+def get_resumed_items_index(start_inventory: typing.List[NetworkItem], items: typing.List[NetworkItem],
+                            resume: typing.Any) -> int:
+    """
+    Returns how many of start_inventory and items a client already has, going by the count and checksum of its
+    received items in resume, or 0 if they don't match.
+    """
+    if not isinstance(resume, dict):
+        return 0
+    index = resume.get("items_index")
+    if type(index) is not int or not 0 < index <= len(start_inventory) + len(items):
+        return 0
+    received_items = start_inventory[:index] + items[:max(0, index - len(start_inventory))]
+    if resume.get("items_checksum") != get_items_checksum(received_items):
+        return 0
+    return index
+
+
 def send_new_items(ctx: Context):
     for team, clients in ctx.clients.items():
         for slot, clients in clients.items():
@@ -1032,11 +1099,8 @@ def send_new_items(ctx: Context):
                 start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
                 items = get_received_items(ctx, team, slot, client.remote_items)
                 if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+                    packet = ctx.encode_received_items(client, start_inventory, items, client.send_index)
+                    async_start(ctx.send_encoded_msgs(client, f"[{packet}]"))
                     client.send_index = len(start_inventory) + len(items)
 
 
@@ -1585,10 +1649,11 @@ class ClientMessageProcessor(CommonCommandProcessor):
     def _cmd_getitem(self, item_name: str) -> bool:
         """Cheat in an item, if it is enabled on this server"""
         if self.ctx.item_cheat:
-            names = self.ctx.item_names_for_game(self.ctx.games[self.client.slot])
+            game = self.ctx.games[self.client.slot]
+            names = self.ctx.item_names_for_game(game)
             item_name, usable, response = get_intended_text(
                 item_name,
-                names
+                self.ctx.name_index(game, "items")
             )
             if usable:
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
@@ -1645,9 +1710,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
             if game not in self.ctx.all_item_and_group_names:
                 self.output("Can't look up item/location for unknown game. Hint for ID instead.")
                 return False
-            names = self.ctx.all_location_and_group_names[game] \
-                if for_location else \
-                self.ctx.all_item_and_group_names[game]
+            names = self.ctx.name_index(game, "locations_and_groups" if for_location else "items_and_groups")
             hint_name, usable, response = get_intended_text(input_text, names)
 
             if usable:
@@ -1770,7 +1833,7 @@ def get_slot_points(ctx: Context, team: int, slot: int) -> int:
             ctx.get_hint_cost(slot) * ctx.hints_used[team, slot])
 
 
-async def process_client_cmd(ctx: Context, client: Client, args: dict):
+async def process_client_cmd(ctx: Context, client: Client, args: typing.Dict[str, typing.Any]):
     try:
         cmd: str = args["cmd"]
     except:
@@ -1835,27 +1898,42 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             client.no_locations = bool(client.tags & _non_game_messages.keys())
             # set NoText for old PopTracker clients that predate the tag to save traffic
             client.no_text = "NoText" in client.tags or ("PopTracker" in client.tags and client.version < (0, 5, 1))
+            missing_locations = get_missing_checks(ctx, team, slot)
+            checked_locations = get_checked_checks(ctx, team, slot)
             connected_packet = {
                 "cmd": "Connected",
                 "team": client.team, "slot": client.slot,
                 "players": ctx.get_players_package(),
-                "missing_locations": get_missing_checks(ctx, team, slot),
-                "checked_locations": get_checked_checks(ctx, team, slot),
                 "slot_info": ctx.slot_info,
                 "hint_points": get_slot_points(ctx, team, slot),
             }
-            reply = [connected_packet]
+            # a reconnecting client can skip the locations and items it still has from before
+            resume = args.get("resume")
+            resumed_locations = isinstance(resume, dict) and \
+                resume.get("locations_checksum") == get_locations_checksum(checked_locations, missing_locations)
+            if not resumed_locations:
+                connected_packet["missing_locations"] = missing_locations
+                connected_packet["checked_locations"] = checked_locations
+            received_items_packet = None
             start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
             items = get_received_items(ctx, client.team, client.slot, client.remote_items)
+            items_index = 0
             if (start_inventory or items) and not client.no_items:
-                reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items})
+                items_index = get_resumed_items_index(start_inventory, items, resume)
+                if items_index < len(start_inventory) + len(items):
+                    received_items_packet = ctx.encode_received_items(client, start_inventory, items, items_index)
                 client.send_index = len(start_inventory) + len(items)
+            if resume is not None:
+                connected_packet["resume"] = {"locations": resumed_locations, "items_index": items_index}
             if not client.auth:  # if this was a Re-Connect, don't print to console
                 client.auth = True
                 await on_client_joined(ctx, client)
             if args.get("slot_data", True):
                 connected_packet["slot_data"] = ctx.slot_data[client.slot]
-            await ctx.send_msgs(client, reply)
+            reply = ctx.dumper(connected_packet)
+            if received_items_packet:
+                reply += "," + received_items_packet
+            await ctx.send_encoded_msgs(client, f"[{reply}]")
 
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
@@ -1892,8 +1970,8 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                     items = get_received_items(ctx, client.team, client.slot, client.remote_items)
                     if (items or start_inventory) and not client.no_items:
                         client.send_index = len(start_inventory) + len(items)
-                        await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                                      "items": start_inventory + items}])
+                        packet = ctx.encode_received_items(client, start_inventory, items, 0)
+                        await ctx.send_encoded_msgs(client, f"[{packet}]")
                     else:
                         client.send_index = 0
                 except (ValueError, TypeError) as err:
@@ -1920,8 +1998,10 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             items = get_received_items(ctx, client.team, client.slot, client.remote_items)
             if (start_inventory or items) and not client.no_items:
                 client.send_index = len(start_inventory) + len(items)
-                await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                              "items": start_inventory + items}])
+                items_index = get_resumed_items_index(start_inventory, items, args)
+                if items_index < client.send_index:
+                    packet = ctx.encode_received_items(client, start_inventory, items, items_index)
+                    await ctx.send_encoded_msgs(client, f"[{packet}]")
 
         elif cmd == 'LocationChecks':
             if client.no_locations:
@@ -1951,7 +2031,8 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             ctx.notify_hints(client.team, hints, only_new=create_as_hint == 2, persist_even_if_found=True)
             if locs and create_as_hint:
                 ctx.save()
-            await ctx.send_msgs(client, [{'cmd': 'LocationInfo', 'locations': locs}])
+            await ctx.send_msgs(client, [{'cmd': 'LocationInfo',
+                                          'locations': pack_network_items(locs) if client.packed_items else locs}])
 
         elif cmd == 'CreateHints':
             location_player = args.get("player", client.slot)
@@ -2272,8 +2353,9 @@ class ServerCommandProcessor(CommonCommandProcessor):
         if usable:
             team, slot = self.ctx.player_name_lookup[seeked_player]
             item_name = " ".join(item_name)
-            names = self.ctx.item_names_for_game(self.ctx.games[slot])
-            item_name, usable, response = get_intended_text(item_name, names)
+            game = self.ctx.games[slot]
+            names = self.ctx.item_names_for_game(game)
+            item_name, usable, response = get_intended_text(item_name, self.ctx.name_index(game, "items"))
             if usable:
                 amount: int = int(amount)
                 if amount > 100:
@@ -2308,7 +2390,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 location, usable, response = int(full_name), True, None
             elif self.ctx.location_names_for_game(game) is not None:
-                location, usable, response = get_intended_text(full_name, self.ctx.location_names_for_game(game))
+                location, usable, response = get_intended_text(full_name, self.ctx.name_index(game, "locations"))
             else:
                 self.output("Can't look up location for unknown game. Send by ID instead.")
                 return False
@@ -2339,7 +2421,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 item, usable, response = int(full_name), True, None
             elif game in self.ctx.all_item_and_group_names:
-                item, usable, response = get_intended_text(full_name, self.ctx.all_item_and_group_names[game])
+                item, usable, response = get_intended_text(full_name, self.ctx.name_index(game, "items_and_groups"))
             else:
                 self.output("Can't look up item for unknown game. Hint for ID instead.")
                 return False
@@ -2378,7 +2460,8 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 location, usable, response = int(full_name), True, None
             elif game in self.ctx.all_location_and_group_names:
-                location, usable, response = get_intended_text(full_name, self.ctx.all_location_and_group_names[game])
+                location, usable, response = get_intended_text(full_name,
+                                                       self.ctx.name_index(game, "locations_and_groups"))
             else:
                 self.output("Can't look up location for unknown game. Hint for ID instead.")
                 return False
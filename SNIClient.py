@@ -9,6 +9,7 @@ import subprocess
 import base64
 import logging
 import asyncio
+import bisect
 import enum
 import typing
 
@@ -128,6 +129,8 @@ class SNIContext(CommonContext):
     snes_reconnect_address: typing.Optional[str]
     snes_recv_queue: "asyncio.Queue[bytes]"
     snes_request_lock: asyncio.Lock
+    snes_multi_read: typing.Optional[bool]
+    """whether the attached device answers GetAddress requests with several ranges, None until snes_read_multi tried"""
     snes_write_buffer: typing.List[typing.Tuple[int, bytes]]
     snes_connector_lock: threading.Lock
     death_state: DeathState
@@ -154,6 +157,7 @@ class SNIContext(CommonContext):
         self.snes_reconnect_address = None
         self.snes_recv_queue = asyncio.Queue()
         self.snes_request_lock = asyncio.Lock()
+        self.snes_multi_read = None
         self.snes_write_buffer = []
         self.snes_connector_lock = threading.Lock()
         self.death_state = DeathState.alive  # for death link flop behaviour
@@ -445,6 +449,7 @@ async def snes_connect(ctx: SNIContext, address: str, deviceIndex: int = -1) ->
         }
         await ctx.snes_socket.send(dumps(Attach_Request))
         ctx.snes_state = SNESState.SNES_ATTACHED
+        ctx.snes_multi_read = None
         ctx.snes_attached_device = (devices.index(device), device)
         ctx.snes_reconnect_address = address
         recv_task = asyncio.create_task(snes_recv_loop(ctx))
@@ -558,6 +563,167 @@ async def snes_read(ctx: SNIContext, address: int, size: int) -> typing.Optional
         ctx.snes_request_lock.release()
 
 
+snes_read_multi_operands = 8
+"""Maximum number of address ranges sent in a single GetAddress request by snes_read_multi"""
+snes_multi_read_probe_timeout = 0.5
+"""Seconds the first snes_read_multi on a device waits for the ranges after the first one, before reading one by one"""
+
+
+class SNESMemory:
+    """
+    The result of snes_read_multi. Reads are served as memoryviews of the received blocks, so slicing doesn't copy.
+    `memory[address]` returns a byte, `memory[start:stop]` a memoryview.
+    """
+    _starts: typing.List[int]
+    _blocks: typing.List[memoryview]
+
+    def __init__(self, blocks: typing.Iterable[typing.Tuple[int, bytes]]) -> None:
+        blocks = sorted(blocks, key=lambda block: block[0])
+        self._starts = [start for start, _ in blocks]
+        self._blocks = [memoryview(data) for _, data in blocks]
+
+    def read(self, address: int, size: int) -> memoryview:
+        index = bisect.bisect_right(self._starts, address) - 1
+        if index >= 0:
+            offset = address - self._starts[index]
+            block = self._blocks[index]
+            if offset + size <= len(block):
+                return block[offset:offset + size]
+        raise KeyError(f"{hex(address)} with size {size} was not read.")
+
+    def read_int(self, address: int, size: int, byteorder: typing.Literal["little", "big"] = "little") -> int:
+        return int.from_bytes(self.read(address, size), byteorder)
+
+    def __getitem__(self, item: typing.Union[int, slice]) -> typing.Union[int, memoryview]:
+        if isinstance(item, slice):
+            if item.step is not None:
+                raise ValueError("SNESMemory does not support slices with a step.")
+            return self.read(item.start, item.stop - item.start)
+        return self.read(item, 1)[0]
+
+
+def merge_ranges(ranges: typing.Iterable[typing.Tuple[int, int]], max_gap: int = 0) -> typing.List[typing.Tuple[int, int]]:
+    """
+    Merges overlapping and adjacent (address, size) ranges, as well as ranges at most max_gap bytes apart.
+    Returns the merged ranges sorted by address.
+    """
+    merged: typing.List[typing.Tuple[int, int]] = []
+    for address, size in sorted(ranges):
+        if merged and address <= merged[-1][0] + merged[-1][1] + max_gap:
+            start, merged_size = merged[-1]
+            merged[-1] = (start, max(merged_size, address + size - start))
+        else:
+            merged.append((address, size))
+    return merged
+
+
+async def _snes_get_address(ctx: SNIContext, batches: typing.List[typing.List[typing.Tuple[int, int]]],
+                            rest_timeout: float = 5) -> typing.Optional[bytearray]:
+    """
+    Sends a GetAddress request for each batch of ranges, then receives the answers as one stream of the requested
+    ranges. The result is shorter than requested if the device didn't answer every range in time.
+    Once the first range was received, each further answer is waited for at most rest_timeout seconds.
+    """
+    try:
+        for batch in batches:
+            GetAddress_Request: SNESRequest = {
+                "Opcode": "GetAddress",
+                "Space": "SNES",
+                "Operands": [operand for address, size in batch for operand in (hex(address)[2:], hex(size)[2:])]
+            }
+            await ctx.snes_socket.send(dumps(GetAddress_Request))
+    except ConnectionClosed:
+        return None
+
+    total_size = sum(size for batch in batches for _, size in batch)
+    first_size = batches[0][0][1] if batches else 0
+    data = bytearray()
+    while len(data) < total_size:
+        try:
+            data += await asyncio.wait_for(ctx.snes_recv_queue.get(), 5 if len(data) < first_size else rest_timeout)
+        except asyncio.TimeoutError:
+            break
+    return data
+
+
+async def snes_read_multi(ctx: SNIContext, ranges: typing.Iterable[typing.Tuple[int, int]],
+                          max_gap: int = 0) -> typing.Optional[SNESMemory]:
+    """
+    Reads several (address, size) ranges at once. The ranges are merged where possible, packed into GetAddress
+    requests of up to snes_read_multi_operands ranges each, and all requests are sent before waiting for the first
+    answer, so the whole read costs about one round trip.
+    The first read of several ranges on a device checks that it answers every range of a request. If it only answers
+    the first one, like older SNI versions or connectors, every range is requested on its own until the next attach.
+    A check answered neither way fails the read, and is repeated once the device is attached again.
+
+    :param ranges: The (address, size) ranges to read
+    :param max_gap: Ranges at most this many bytes apart are read as one range
+    :return: The memory that was read, or None if the read failed
+    """
+    merged = merge_ranges(ranges, max_gap)
+    if not merged:
+        return SNESMemory(())
+    try:
+        await ctx.snes_request_lock.acquire()
+
+        if (
+            ctx.snes_state != SNESState.SNES_ATTACHED or
+            ctx.snes_socket is None or
+            not ctx.snes_socket.open or
+            ctx.snes_socket.closed
+        ):
+            return None
+
+        data = bytearray()
+        remaining = merged
+        if not ctx.snes_recv_queue.empty():
+            # a late answer to an earlier request, like a slow answer to the check below, would be read as ours
+            snes_logger.warning("Received data from the SNES device that was not requested.")
+            remaining = []
+        elif ctx.snes_multi_read is None and len(merged) > 1:
+            probe = merged[:snes_read_multi_operands]
+            probe_data = await _snes_get_address(ctx, [probe], snes_multi_read_probe_timeout)
+            if probe_data is None:
+                return None
+            data = probe_data
+            if len(probe_data) == sum(size for _, size in probe):
+                ctx.snes_multi_read = True
+                remaining = merged[len(probe):]
+            elif len(probe_data) == probe[0][1]:
+                snes_logger.info("SNES device does not answer reads of several ranges, reading them one by one.")
+                ctx.snes_multi_read = False
+                remaining = merged[1:]
+            else:
+                remaining = []  # fails the read below, the check is repeated after reconnecting
+
+        operands = snes_read_multi_operands if ctx.snes_multi_read is not False else 1
+        remaining_data = await _snes_get_address(ctx, [remaining[batch_start:batch_start + operands]
+                                                       for batch_start in range(0, len(remaining), operands)])
+        if remaining_data is None:
+            return None
+        data += remaining_data
+
+        total_size = sum(size for _, size in merged)
+        if len(data) != total_size:
+            snes_logger.error(f"Error reading {len(merged)} ranges, requested {total_size} bytes, "
+                              f"received {len(data)}")
+            if len(data):
+                snes_logger.warning('Communication Failure with SNI')
+            if ctx.snes_socket is not None and not ctx.snes_socket.closed:
+                await ctx.snes_socket.close()
+            return None
+
+        view = memoryview(data)
+        blocks = []
+        offset = 0
+        for address, size in merged:
+            blocks.append((address, view[offset:offset + size]))
+            offset += size
+        return SNESMemory(blocks)
+    finally:
+        ctx.snes_request_lock.release()
+
+
 async def snes_write(ctx: SNIContext, write_list: typing.List[typing.Tuple[int, bytes]]) -> bool:
     try:
         await ctx.snes_request_lock.acquire()
@@ -12,6 +12,7 @@ import pickle
 import functools
 import io
 import collections
+import heapq
 import importlib
 import logging
 import warnings
@@ -498,6 +499,65 @@ def restricted_dumps(obj: Any) -> bytes:
     return s
 
 
+world_data_cache_version = 1
+"""changes whenever cached world data has to be rebuilt, independent of its sources"""
+
+
+class WorldDataUnpickler(pickle.Unpickler):
+    """Unpickles cached world data, only allowing safe builtins and classes from the modules it was built with."""
+    def __init__(self, file: BinaryIO, modules: typing.Collection[str]) -> None:
+        super().__init__(file)
+        self.modules = modules
+
+    def find_class(self, module: str, name: str) -> type:
+        if module == "builtins" and name in safe_builtins:
+            return getattr(builtins, name)
+        if module in self.modules and "." not in name:
+            obj = getattr(importlib.import_module(module), name, None)
+            if isinstance(obj, type):
+                return obj
+        raise pickle.UnpicklingError(f"global '{module}.{name}' is forbidden")
+
+
+def load_cached_world_data(name: str, sources: typing.Iterable[bytes], build: typing.Callable[[], RetType],
+                           modules: typing.Collection[str]) -> RetType:
+    """
+    Returns the data returned by build, which is slow, like parsing and processing large json files.
+    The data is cached in a binary file for the hash of sources, which have to include everything the data depends on,
+    like the json files and the module building it. modules are the modules of all classes the data contains.
+    """
+    import hashlib
+
+    source_hash = hashlib.sha256(world_data_cache_version.to_bytes(4, "little"))
+    for source in sources:
+        source_hash.update(len(source).to_bytes(8, "little"))
+        source_hash.update(source)
+    cache_folder = cache_path("world_data", get_file_safe_name(name))
+    cache_file = os.path.join(cache_folder, f"{source_hash.hexdigest()}.pickle")
+    try:
+        with open(cache_file, "rb") as f:
+            return WorldDataUnpickler(f, modules).load()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.debug(f"Ignoring broken world data cache {cache_file}: {e}")
+
+    data = build()
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, "wb") as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+        # caches for older sources won't be used again
+        for file in os.scandir(cache_folder):
+            if file.name.endswith(".pickle") and file.path != cache_file:
+                os.remove(file.path)
+    except Exception as e:
+        logging.debug(f"Could not cache world data {name}: {e}")
+    return data
+
+
 class ByValue:
     """
     Mixin for enums to pickle value instead of name (restores pre-3.11 behavior). Use as left-most parent.
@@ -670,8 +730,132 @@ def format_SI_prefix(value, power=1000, power_labels=("", "k", "M", "G", "T", "P
     return f"{value.quantize(decimal.Decimal('1.00'))} {chaining_prefix(n, power_labels)}"
 
 
-def get_fuzzy_results(input_word: str, word_list: typing.Collection[str], limit: typing.Optional[int] = None) \
-        -> typing.List[typing.Tuple[str, int]]:
+class NameIndex:
+    """
+    Case-insensitive lookups over a fixed collection of names, like the item names of a game.
+    Substring searches only check the names that contain every trigram of the search text.
+    """
+    names: typing.Tuple[str, ...]
+    lowered: typing.Tuple[str, ...]
+    _trigrams: typing.Dict[str, typing.List[int]]
+    _positions: typing.Dict[str, int]
+    _lowered_positions: typing.Dict[str, int]
+    """first position of each lowered name"""
+
+    def __init__(self, names: typing.Iterable[str]) -> None:
+        self.names = tuple(dict.fromkeys(names))
+        self.lowered = tuple(name.lower() for name in self.names)
+        self._trigrams = {}
+        for index, name in enumerate(self.lowered):
+            for trigram in {name[start:start + 3] for start in range(len(name) - 2)}:
+                self._trigrams.setdefault(trigram, []).append(index)
+        self._positions = {name: index for index, name in enumerate(self.names)}
+        self._lowered_positions = {}
+        for index, name in enumerate(self.lowered):
+            self._lowered_positions.setdefault(name, index)
+
+    def _candidates(self, lowered: str) -> typing.Iterable[int]:
+        if len(lowered) < 3:
+            return range(len(self.names))
+        postings = sorted((self._trigrams.get(lowered[start:start + 3], ()) for start in range(len(lowered) - 2)),
+                          key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return sorted(candidates)
+
+    def find_substring(self, text: str) -> typing.List[typing.Tuple[str, int]]:
+        """Returns every name containing text, ignoring case, with the position of text in it, in index order."""
+        lowered = text.lower()
+        results = []
+        for index in self._candidates(lowered):
+            position = self.lowered[index].find(lowered)
+            if position != -1:
+                results.append((self.names[index], position))
+        return results
+
+    def find_exact(self, text: str) -> typing.Optional[typing.Tuple[str, bool]]:
+        """Returns the name equal to text and True, or else the first name equal to it ignoring case and False."""
+        if text in self._positions:
+            return text, True
+        index = self._lowered_positions.get(text.lower())
+        if index is None:
+            return None
+        return self.names[index], False
+
+    def get_fuzzy_results(self, input_word: str, limit: typing.Optional[int] = None) \
+            -> typing.List[typing.Tuple[str, int]]:
+        """
+        Returns the same as `get_fuzzy_results` over the names in index order, but only calculates the distance of
+        names that may still make the limit. Names are visited by an upper bound of their ratio, from the length
+        difference and the trigrams of input_word they are missing, as every edit removes at most 4 trigrams.
+        """
+        import jellyfish
+
+        if not limit or limit >= len(self.names):
+            return get_fuzzy_results(input_word, self.names, limit)
+
+        lowered = input_word.lower()
+        query_trigrams = {lowered[start:start + 3] for start in range(len(lowered) - 2)}
+        shared_trigrams: typing.Counter[int] = collections.Counter()
+        for trigram in query_trigrams:
+            shared_trigrams.update(self._trigrams.get(trigram, ()))
+
+        bounds = []
+        for index, name in enumerate(self.lowered):
+            min_distance = max(abs(len(name) - len(lowered)),
+                               (len(query_trigrams) - shared_trigrams[index] + 3) // 4)
+            if min_distance == 0:
+                bounds.append(1.01)
+            else:
+                bounds.append(1 - min_distance / max(len(self.names[index]), len(input_word)))
+
+        # min heap of the best (ratio, -index) so far, the worst one first
+        best: typing.List[typing.Tuple[float, int]] = []
+        for index in sorted(range(len(self.names)), key=bounds.__getitem__, reverse=True):
+            if len(best) == limit and bounds[index] < best[0][0]:
+                break
+            name = self.names[index]
+            if name == input_word:
+                ratio = 1.01
+            else:
+                ratio = (1 - jellyfish.damerau_levenshtein_distance(lowered, self.lowered[index])
+                         / max(len(input_word), len(name)))
+            if len(best) < limit:
+                heapq.heappush(best, (ratio, -index))
+            elif (ratio, -index) > best[0]:
+                heapq.heapreplace(best, (ratio, -index))
+
+        return [(self.names[-negative_index], int(ratio * 100))
+                for ratio, negative_index in sorted(best, reverse=True)]
+
+
+_name_indexes: "collections.OrderedDict[typing.Tuple[str, str], NameIndex]" = collections.OrderedDict()
+_name_indexes_limit = 256
+
+
+def get_name_index(checksum: str, kind: str, names: typing.Iterable[str]) -> NameIndex:
+    """
+    Returns a `NameIndex` of names, built once and shared by everything using the data package with this checksum,
+    like the rooms of a server. kind tells apart the different name collections of the same data package.
+    """
+    key = (checksum, kind)
+    name_index = _name_indexes.get(key)
+    if name_index is None:
+        name_index = _name_indexes[key] = NameIndex(names)
+        if len(_name_indexes) > _name_indexes_limit:
+            _name_indexes.popitem(last=False)
+    else:
+        _name_indexes.move_to_end(key)
+    return name_index
+
+
+def get_fuzzy_results(input_word: str, word_list: typing.Union[typing.Collection[str], NameIndex],
+                      limit: typing.Optional[int] = None) -> typing.List[typing.Tuple[str, int]]:
+    if isinstance(word_list, NameIndex):
+        return word_list.get_fuzzy_results(input_word, limit)
     import jellyfish
 
     def get_fuzzy_ratio(word1: str, word2: str) -> float:
@@ -693,7 +877,12 @@ def get_fuzzy_results(input_word: str, word_list: typing.Collection[str], limit:
     )
 
 
-def get_intended_text(input_text: str, possible_answers) -> typing.Tuple[str, bool, str]:
+def get_intended_text(input_text: str, possible_answers: typing.Union[typing.Collection[str], NameIndex]) \
+        -> typing.Tuple[str, bool, str]:
+    if isinstance(possible_answers, NameIndex) and len(possible_answers.names) > 1:
+        exact = possible_answers.find_exact(input_text)
+        if exact is not None:
+            return exact[0], True, "Perfect Match" if exact[1] else "Case Insensitive Perfect Match"
     picks = get_fuzzy_results(input_text, possible_answers, limit=2)
     if len(picks) > 1:
         dif = picks[0][1] - picks[1][1]
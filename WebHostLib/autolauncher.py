@@ -94,9 +94,11 @@ def cleanup():
         rooms = Room.select(lambda room: room.owner == UUID(int=0)).delete(bulk=True)
         seeds = Seed.select(lambda seed: seed.owner == UUID(int=0) and not seed.rooms).delete(bulk=True)
         slots = Slot.select(lambda slot: not slot.seed).delete(bulk=True)
+        shared_files = SharedFile.select(lambda shared_file: not shared_file.seeds).delete(bulk=True)
         # Command gets deleted by ponyorm Cascade Delete, as Room is Required
-    if rooms or seeds or slots:
-        logging.info(f"{rooms} Rooms, {seeds} Seeds and {slots} Slots have been deleted.")
+    if rooms or seeds or slots or shared_files:
+        logging.info(f"{rooms} Rooms, {seeds} Seeds, {slots} Slots and {shared_files} Shared Files "
+                     f"have been deleted.")
 
 
 def autohost(config: dict):
@@ -210,6 +212,7 @@ class MultiworldInstance():
         self.process = None
 
 
-from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot
+from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot, \
+    SharedFile
 from .customserver import run_server_process, get_static_server_data
 from .generate import gen_game
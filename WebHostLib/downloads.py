@@ -7,7 +7,7 @@ from pony.orm import select
 
 from worlds.Files import AutoPatchRegister
 from . import app, cache
-from .models import Slot, Room, Seed
+from .models import Slot, Room, Seed, SharedFile
 
 
 @app.route("/dl_patch/<suuid:room_id>/<int:patch_id>")
@@ -33,6 +33,14 @@ def download_patch(room_id, patch_id):
                             new_zip.writestr("archipelago.json", json.dumps(manifest))
                         else:
                             new_zip.writestr(file.filename, zf.read(file), file.compress_type, 9)
+                    # put back the files that are stored once for all patches
+                    for file_name, shared_hash in manifest.get("shared_files", {}).items():
+                        if file_name not in zf.namelist():
+                            shared_file = SharedFile.get(id=shared_hash)
+                            if not shared_file:
+                                return f"Patch is incomplete, {file_name} is missing.", 500
+                            new_zip.writestr(file_name, shared_file.data, zipfile.ZIP_STORED
+                                             if file_name.endswith(".bsdiff4") else zipfile.ZIP_DEFLATED, 9)
             if "patch_file_ending" in manifest:
                 patch_file_ending = manifest["patch_file_ending"]
             else:
@@ -143,6 +143,10 @@ def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None,
         erargs.skip_output = False
         erargs.spoiler_only = False
         erargs.csv_output = False
+        erargs.profile_out = None
+        erargs.output_processes = 0
+        erargs.stage_threads = 0
+        erargs.share_output_files = True
 
         name_counter = Counter()
         for player, (playerfile, settings) in enumerate(gen_options.items(), 1):
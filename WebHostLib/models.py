@@ -42,6 +42,7 @@ class Seed(db.Entity):
     slots = Set(Slot)
     spoiler = Optional(LongStr, lazy=True)
     meta = Required(LongStr, default=lambda: "{\"race\": false}")  # additional meta information/tags
+    shared_files = Set('SharedFile')  # files left out of the slots' patches, see SharedFile
 
 
 class Command(db.Entity):
@@ -61,3 +62,9 @@ class Generation(db.Entity):
 class GameDataPackage(db.Entity):
     checksum = PrimaryKey(str)
     data = Required(bytes)
+
+
+class SharedFile(db.Entity):
+    id = PrimaryKey(str)  # sha256 hash of data
+    data = Required(bytes, lazy=True)
+    seeds = Set(Seed)  # seeds with patches that need this file, files no seed needs are deleted on cleanup
@@ -1,3 +1,5 @@
+import hashlib
+import io
 import json
 import pickle
 import typing
@@ -5,20 +7,25 @@ import uuid
 import zipfile
 import zlib
 
-from io import BytesIO
 from flask import request, flash, redirect, url_for, session, render_template, abort
 from markupsafe import Markup
 from pony.orm import commit, flush, select, rollback
 from pony.orm.core import TransactionIntegrityError
 import schema
 
-import MultiServer
-from NetUtils import GamesPackage, SlotType
-from Utils import VersionException, __version__
-from worlds.Files import AutoPatchRegister
+from NetUtils import GamesPackage, NetworkSlot, SlotType
+from Utils import RestrictedUnpickler, VersionException, __version__
+from worlds.Files import AutoPatchRegister, shared_file_ending, split_shared_files
 from worlds.AutoWorld import data_package_checksum
 from . import app
-from .models import Seed, Room, Slot, GameDataPackage
+from .models import Seed, Room, Slot, GameDataPackage, SharedFile, db
+
+ProgressCallback = typing.Callable[[int, int], None]
+SlotFiles = typing.Mapping[int, typing.Union[bytes, typing.Callable[[], bytes]]]
+
+slot_batch_size = 32
+"""Number of slot files that are read from an upload before they are written to the database."""
+stream_chunk_size = 1024 * 1024
 
 banned_extensions = (".sfc", ".z64", ".n64", ".nes", ".smc", ".sms", ".gb", ".gbc", ".gba")
 allowed_options_extensions = (".yaml", ".json", ".yml", ".txt", ".zip")
@@ -46,12 +53,87 @@ def banned_file(filename: str) -> bool:
     return filename.endswith(banned_extensions)
 
 
-def process_multidata(compressed_multidata, files={}):
+class _ZlibReader(io.RawIOBase):
+    """Read-only stream decompressing a zlib buffer on demand, so the raw pickle never exists in memory as a whole."""
+
+    def __init__(self, data: typing.Union[bytes, memoryview]) -> None:
+        self._data = memoryview(data)
+        self._pos = 0
+        self._decompressor = zlib.decompressobj()
+        self._pending = b""
+        self._pending_pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._pending_pos >= len(self._pending):
+            if self._pos >= len(self._data):
+                self._pending = self._decompressor.flush()
+                self._pending_pos = 0
+                if not self._pending:
+                    return 0
+                break
+            chunk = self._data[self._pos:self._pos + stream_chunk_size]
+            self._pos += len(chunk)
+            self._pending = self._decompressor.decompress(chunk)
+            self._pending_pos = 0
+        size = min(len(buffer), len(self._pending) - self._pending_pos)
+        buffer[:size] = self._pending[self._pending_pos:self._pending_pos + size]
+        self._pending_pos += size
+        return size
+
+
+class _ZlibWriter:
+    """Write-only sink compressing everything written to it, used to re-pickle multidata without a full copy."""
+
+    def __init__(self, level: int = 9) -> None:
+        self._compressor = zlib.compressobj(level)
+        self._chunks: typing.List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self._chunks.append(compressed)
+        return len(data)
+
+    def getvalue(self) -> bytes:
+        self._chunks.append(self._compressor.flush())
+        return b"".join(self._chunks)
+
+
+def load_multidata(compressed_multidata: bytes) -> typing.Dict[str, typing.Any]:
+    """Validates the multidata header and unpickles it while decompressing, instead of decompressing it in one go."""
+    if not compressed_multidata:
+        raise Exception("Multidata is empty.")
+    format_version = compressed_multidata[0]
+    if format_version > 3:
+        raise VersionException("Incompatible multidata.")
+    with io.BufferedReader(_ZlibReader(memoryview(compressed_multidata)[1:]), stream_chunk_size) as stream:
+        decompressed_multidata = RestrictedUnpickler(stream).load()
+    if not isinstance(decompressed_multidata, dict):
+        raise Exception("Multidata is not a dictionary.")
+    for section, section_type in (("datapackage", dict), ("slot_info", dict)):
+        if not isinstance(decompressed_multidata.get(section, {}), section_type):
+            raise Exception(f"Multidata section {section} is malformed.")
+    return decompressed_multidata
+
+
+def dump_multidata(decompressed_multidata: typing.Dict[str, typing.Any], format_version: int) -> bytes:
+    writer = _ZlibWriter(9)
+    pickle.dump(decompressed_multidata, writer)
+    return bytes((format_version,)) + writer.getvalue()
+
+
+def ingest_multidata(compressed_multidata: bytes) -> typing.Tuple[typing.Dict[int, NetworkSlot], bytes]:
+    """
+    Stores the embedded datapackages in the database and strips them from the multidata.
+    Returns the slot infos of all non-group slots and the re-compressed multidata.
+    """
     game_data: GamesPackage
 
-    decompressed_multidata = MultiServer.Context.decompress(compressed_multidata)
+    decompressed_multidata = load_multidata(compressed_multidata)
 
-    slots: typing.Set[Slot] = set()
     if "datapackage" in decompressed_multidata:
         # strip datapackage from multidata, leaving only the checksums
         game_data_packages: typing.List[GameDataPackage] = []
@@ -79,22 +161,94 @@ def process_multidata(compressed_multidata, files={}):
                     del game_data_package
                     rollback()
 
-    if "slot_info" in decompressed_multidata:
-        for slot, slot_info in decompressed_multidata["slot_info"].items():
-            # Ignore Player Groups (e.g. item links)
-            if slot_info.type == SlotType.group:
-                continue
-            slots.add(Slot(data=files.get(slot, None),
-                           player_name=slot_info.name,
-                           player_id=slot,
-                           game=slot_info.game))
-        flush()  # commit slots
-
-    compressed_multidata = compressed_multidata[0:1] + zlib.compress(pickle.dumps(decompressed_multidata), 9)
+    slot_infos: typing.Dict[int, NetworkSlot] = {}
+    for slot, slot_info in decompressed_multidata.get("slot_info", {}).items():
+        # Ignore Player Groups (e.g. item links)
+        if slot_info.type == SlotType.group:
+            continue
+        slot_infos[slot] = slot_info
+
+    return slot_infos, dump_multidata(decompressed_multidata, compressed_multidata[0])
+
+
+def process_multidata(compressed_multidata, files={}):
+    slot_infos, compressed_multidata = ingest_multidata(compressed_multidata)
+
+    slots: typing.Set[Slot] = set()
+    for slot, slot_info in slot_infos.items():
+        data = files.get(slot, None)
+        slots.add(Slot(data=data() if callable(data) else data,
+                       player_name=slot_info.name,
+                       player_id=slot,
+                       game=slot_info.game))
+    flush()  # commit slots
+
     return slots, compressed_multidata
 
 
-def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, sid=None):
+def read_container_file(zfile: zipfile.ZipFile, member: zipfile.ZipInfo, file_name: str) -> bytes:
+    """Reads a file from a patch container in the uploaded zip."""
+    with zfile.open(member, "r") as stream, zipfile.ZipFile(stream) as container:
+        return container.read(file_name)
+
+
+def get_shared_files(shared_hashes: typing.AbstractSet[str],
+                     readers: typing.Mapping[str, typing.Callable[[], bytes]]) -> typing.List[SharedFile]:
+    """
+    Returns the files that patches share by their sha256 hashes, once per hash for all seeds.
+    Files that aren't stored yet are added to the session from readers, to be committed with the seed needing them.
+    """
+    new_files: typing.Dict[str, bytes] = {}
+    for shared_hash in shared_hashes:
+        if SharedFile.exists(id=shared_hash):
+            continue
+        if shared_hash not in readers:
+            raise FileNotFoundError(f"Patches need {shared_hash}{shared_file_ending}, which was not uploaded.")
+        data = readers[shared_hash]()
+        if hashlib.sha256(data).hexdigest() != shared_hash:
+            raise ValueError(f"{shared_hash}{shared_file_ending} does not match its hash.")
+        new_files[shared_hash] = data
+    return [SharedFile.get(id=shared_hash) or SharedFile(id=shared_hash, data=new_files[shared_hash])
+            for shared_hash in shared_hashes]
+
+
+def store_slots(seed: Seed, slot_infos: typing.Dict[int, NetworkSlot], files: SlotFiles,
+                progress: typing.Optional[ProgressCallback] = None) -> int:
+    """
+    Adds the slots of a seed to the database in batches of slot_batch_size.
+    Slot files are only read when their batch is written and don't go through the ORM, so at most one batch is in
+    memory. The slots themselves are regular entities of the session, loading their data from the database.
+    Returns the number of slots written.
+    """
+    total = len(slot_infos)
+    done = 0
+    batch: typing.List[typing.Tuple[Slot, typing.Optional[typing.Union[bytes, typing.Callable[[], bytes]]]]] = []
+
+    def write_batch() -> None:
+        nonlocal done
+        flush()  # assigns the ids of the batch
+        for slot, data in batch:
+            if callable(data):
+                data = data()
+            if data is not None:
+                db.execute("UPDATE slot SET data = $data WHERE id = $slot_id", {"data": data, "slot_id": slot.id})
+        done += len(batch)
+        batch.clear()
+        if progress:
+            progress(done, total)
+
+    for slot, slot_info in slot_infos.items():
+        batch.append((Slot(seed=seed, player_id=slot, player_name=slot_info.name, game=slot_info.game),
+                      files.get(slot, None)))
+        if len(batch) >= slot_batch_size:
+            write_batch()
+    if batch:
+        write_batch()
+    return done
+
+
+def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, sid=None,
+                     progress: typing.Optional[ProgressCallback] = None):
     if not owner:
         owner = session["_id"]
     infolist = zfile.infolist()
@@ -104,10 +258,13 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
         return
 
     spoiler = ""
-    files = {}
+    members: typing.Dict[int, zipfile.ZipInfo] = {}
+    containers: typing.Set[int] = set()
+    shared_hashes: typing.Set[str] = set()
+    shared_readers: typing.Dict[str, typing.Callable[[], bytes]] = {}
     multidata = None
 
-    # Load files.
+    # Index files, slot files are only read once they get written to the database.
     for file in infolist:
         handler = AutoPatchRegister.get_handler(file.filename)
         if banned_file(file.filename):
@@ -116,10 +273,22 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
 
         # AP Container
         elif handler:
-            data = zfile.open(file, "r").read()
-            with zipfile.ZipFile(BytesIO(data)) as container:
-                player = json.loads(container.open("archipelago.json").read())["player"]
-            files[player] = data
+            with zfile.open(file, "r") as stream, zipfile.ZipFile(stream) as container:
+                manifest = json.loads(container.open("archipelago.json").read())
+                player = manifest["player"]
+                # shared files are stored once, instead of in every slot file
+                for file_name, shared_hash in manifest.get("shared_files", {}).items():
+                    shared_hashes.add(shared_hash)
+                    if shared_hash not in shared_readers and file_name in container.namelist():
+                        shared_readers[shared_hash] = lambda member=file, file_name=file_name: \
+                            read_container_file(zfile, member, file_name)
+            members[player] = file
+            containers.add(player)
+
+        # Files shared by patches, split from them on generation
+        elif file.filename.endswith(shared_file_ending):
+            shared_readers[file.filename.rsplit("/", 1)[-1][:-len(shared_file_ending)]] = \
+                lambda member=file: zfile.read(member)
 
         # Spoiler
         elif file.filename.endswith(".txt"):
@@ -141,8 +310,7 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
             except ValueError:
                 flash("Error: Unexpected file found in .zip: " + file.filename)
                 return
-            data = zfile.open(file, "r").read()
-            files[int(slot_id[1:])] = data
+            members[int(slot_id[1:])] = file
 
         # All other files using the standard MultiWorld.get_out_file_name_base method
         else:
@@ -151,18 +319,25 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
             except ValueError:
                 flash("Error: Unexpected file found in .zip: " + file.filename)
                 return
-            data = zfile.open(file, "r").read()
-            files[int(slot_id[1:])] = data
+            members[int(slot_id[1:])] = file
 
     # Load multi data.
     if multidata:
-        slots, multidata = process_multidata(multidata, files)
-
-        seed = Seed(multidata=multidata, spoiler=spoiler, slots=slots, owner=owner, meta=json.dumps(meta),
-                    id=sid if sid else uuid.uuid4())
+        slot_infos, multidata = ingest_multidata(multidata)
+        try:
+            shared_files = get_shared_files(shared_hashes, shared_readers)
+        except (FileNotFoundError, ValueError) as e:
+            flash(f"Error: {e}")
+            return
+
+        seed = Seed(multidata=multidata, spoiler=spoiler, owner=owner, meta=json.dumps(meta),
+                    id=sid if sid else uuid.uuid4(), shared_files=shared_files)
+        del multidata
         flush()  # create seed
-        for slot in slots:
-            slot.seed = seed
+        files = {player: (lambda member=member, container=player in containers:
+                          split_shared_files(zfile.read(member))[0] if container else zfile.read(member))
+                 for player, member in members.items()}
+        store_slots(seed, slot_infos, files, progress)
         return seed
     else:
         flash("No multidata was found in the zip file, which is required.")
@@ -20,7 +20,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 ]]
 
-local SCRIPT_VERSION = 1
+local SCRIPT_VERSION = 2
 
 -- Set to log incoming requests
 -- Will cause lag due to large console output
@@ -37,6 +37,25 @@ field `type`. The value of `type` determines what other fields may exist.
 To get the script version, instead of JSON, send "VERSION" to get the script
 version directly (e.g. "2").
 
+### Protocol 2
+
+Sending "PROTOCOL 2" (answered with "2") switches the connection from JSON
+lines to frames. A frame is a 4 byte little endian length followed by that
+many bytes.
+
+Frames from the client contain a JSON object `{"id": 1, "requests": [...]}`.
+The client may send more frames before receiving the responses to earlier
+ones. Every frame that arrived by the end of a frame of emulation is processed
+on that frame.
+
+Frames from the script contain a 4 byte little endian length of a JSON header
+`{"id": 1, "responses": [...]}`, the header, and then the binary data of the
+responses in order. `id` matches the id of the request frame, or is 0 for
+`WATCH_UPDATE`s pushed by the script. Instead of a base64 `value`, a
+`READ_RESPONSE` or `WATCH_RESPONSE` has a `size` field giving the number of
+bytes it takes from the binary data, and a `WATCH_UPDATE` takes the sizes of
+its `changes`.
+
 #### Ex. 1
 
 Request: `[{"type": "PING"}]`
@@ -178,6 +197,28 @@ Response:
     - `domain` (`string`): The name of the memory domain the address
     corresponds to
 
+- `WATCH` (protocol 2 only)  
+    Starts sending the changed bytes of a section of memory at the end of
+    every frame on which any of them changed, as `WATCH_UPDATE`s.
+
+    Expected Response Type: `WATCH_RESPONSE`
+
+    Additional Fields:
+    - `watch` (`int`): An id chosen by the client, replacing any watch with
+    the same id
+    - `address` (`int`): The address of the memory to watch
+    - `size` (`int`): The number of bytes to watch
+    - `domain` (`string`): The name of the memory domain the address
+    corresponds to
+
+- `UNWATCH` (protocol 2 only)  
+    Stops the updates of a watch.
+
+    Expected Response Type: `UNWATCH_RESPONSE`
+
+    Additional Fields:
+    - `watch` (`int`): The id of the watch
+
 - `DISPLAY_MESSAGE`  
     Adds a message to the message queue which will be displayed using
     `gui.addmessage` according to the message interval.
@@ -254,6 +295,24 @@ Response:
 - `WRITE_RESPONSE`  
     Acknowledges `WRITE`.
 
+- `WATCH_RESPONSE`  
+    Contains the current contents of the watched memory.
+
+    Additional Fields:
+    - `watch` (`int`): The id of the watch
+    - `size` (`int`): The number of bytes of binary data
+
+- `UNWATCH_RESPONSE`  
+    Acknowledges `UNWATCH`.
+
+- `WATCH_UPDATE`  
+    Pushed with id 0, contains the bytes of a watch that changed.
+
+    Additional Fields:
+    - `watch` (`int`): The id of the watch
+    - `changes` (list of `[int, int]`): Offset into the watched memory and size of
+    every changed run of bytes, in the order of the binary data
+
 - `DISPLAY_MESSAGE_RESPONSE`  
     Acknowledges `DISPLAY_MESSAGE`.
 
@@ -311,6 +370,13 @@ local locked = false
 
 local rom_hash = nil
 
+local protocol_version = 1
+local receive_buffer = ""
+local receive_frame_size = nil
+local watches = {}
+
+local unpack = table.unpack or unpack
+
 function queue_push (self, value)
     self[self.right] = value
     self.right = self.right + 1
@@ -334,6 +400,34 @@ end
 
 local message_queue = new_queue()
 
+function reset_connection ()
+    protocol_version = 1
+    receive_buffer = ""
+    receive_frame_size = nil
+    watches = {}
+end
+
+function bytes_to_string (bytes, first, last)
+    first = first or 1
+    last = last or #bytes
+    local parts = {}
+    -- string.char takes its bytes as arguments, so pass them in chunks to stay below the argument limit
+    for chunk_start = first, last, 4096 do
+        parts[#parts + 1] = string.char(unpack(bytes, chunk_start, math.min(chunk_start + 4095, last)))
+    end
+    return table.concat(parts)
+end
+
+function u32_to_string (value)
+    return string.char(value % 256, math.floor(value / 256) % 256, math.floor(value / 65536) % 256,
+        math.floor(value / 16777216) % 256)
+end
+
+function string_to_u32 (str)
+    local b1, b2, b3, b4 = str:byte(1, 4)
+    return b1 + b2 * 256 + b3 * 65536 + b4 * 16777216
+end
+
 function lock ()
     locked = true
     client_socket:settimeout(2)
@@ -437,7 +531,13 @@ request_handlers = {
         local res = {}
 
         res["type"] = "READ_RESPONSE"
-        res["value"] = base64.encode(memory.read_bytes_as_array(req["address"], req["size"], req["domain"]))
+        local data = memory.read_bytes_as_array(req["address"], req["size"], req["domain"])
+        if protocol_version >= 2 then
+            res["size"] = #data
+            res["data"] = bytes_to_string(data)
+        else
+            res["value"] = base64.encode(data)
+        end
 
         return res
     end,
@@ -451,6 +551,33 @@ request_handlers = {
         return res
     end,
 
+    ["WATCH"] = function (req)
+        local res = {}
+
+        if protocol_version < 2 then
+            error("WATCH needs protocol 2")
+        end
+
+        local data = memory.read_bytes_as_array(req["address"], req["size"], req["domain"])
+        watches[req["watch"]] = {address = req["address"], size = req["size"], domain = req["domain"], data = data}
+
+        res["type"] = "WATCH_RESPONSE"
+        res["watch"] = req["watch"]
+        res["size"] = #data
+        res["data"] = bytes_to_string(data)
+
+        return res
+    end,
+
+    ["UNWATCH"] = function (req)
+        local res = {}
+
+        res["type"] = "UNWATCH_RESPONSE"
+        watches[req["watch"]] = nil
+
+        return res
+    end,
+
     ["DISPLAY_MESSAGE"] = function (req)
         local res = {}
 
@@ -487,24 +614,161 @@ function process_request (req)
     end
 end
 
--- Receive data from AP client and send message back
-function send_receive ()
-    local message, err = client_socket:receive()
+function process_requests (data)
+    local res = {}
+    local failed_guard_response = nil
+    for i, req in ipairs(data) do
+        if failed_guard_response ~= nil then
+            res[i] = failed_guard_response
+        else
+            -- An error is more likely to cause an NLua exception than to return an error here
+            local status, response = pcall(process_request, req)
+            if status then
+                res[i] = response
+
+                -- If the GUARD validation failed, skip the remaining commands
+                if response["type"] == "GUARD_RESPONSE" and not response["value"] then
+                    failed_guard_response = response
+                end
+            else
+                if type(response) ~= "string" then response = "Unknown error" end
+                res[i] = {type = "ERROR", err = response}
+            end
+        end
+    end
+    return res
+end
 
-    -- Handle errors
+function handle_receive_error (err)
     if err == "closed" then
         if current_state == STATE_CONNECTED then
             print("Connection to client closed")
         end
         current_state = STATE_NOT_CONNECTED
-        return
     elseif err == "timeout" then
         unlock()
-        return
-    elseif err ~= nil then
+    else
         print(err)
         current_state = STATE_NOT_CONNECTED
         unlock()
+    end
+end
+
+function send_all (data)
+    local sent = 0
+    while sent < #data do
+        local last, err, partial_last = client_socket:send(data, sent + 1)
+        if last ~= nil then
+            sent = last
+        elseif err == "timeout" then
+            sent = partial_last
+        else
+            return err
+        end
+    end
+end
+
+-- Sends responses as a protocol 2 frame, moving their binary data behind the JSON header
+function send_frame (id, responses)
+    local binary_parts = {}
+    for _, response in ipairs(responses) do
+        if response["data"] ~= nil then
+            binary_parts[#binary_parts + 1] = response["data"]
+            response["data"] = nil
+        end
+    end
+    local header = json.encode({id = id, responses = responses})
+    local binary = table.concat(binary_parts)
+    send_all(u32_to_string(4 + #header + #binary)..u32_to_string(#header)..header..binary)
+end
+
+-- Returns the next complete protocol 2 frame, or nil and the error if there is none yet
+function receive_frame ()
+    while true do
+        local needed = receive_frame_size or 4
+        local data, err, partial = client_socket:receive(needed - #receive_buffer)
+        receive_buffer = receive_buffer..(data or partial or "")
+        if #receive_buffer < needed then
+            return nil, err
+        end
+
+        if receive_frame_size == nil then
+            receive_frame_size = string_to_u32(receive_buffer)
+            receive_buffer = ""
+        else
+            local frame = receive_buffer
+            receive_buffer = ""
+            receive_frame_size = nil
+            return frame
+        end
+    end
+end
+
+-- Push the changed runs of bytes of every watch
+function send_watch_updates ()
+    local updates = {}
+    for id, watch in pairs(watches) do
+        local current = memory.read_bytes_as_array(watch.address, watch.size, watch.domain)
+        local changes = {}
+        local parts = {}
+        local i = 1
+        while i <= #current do
+            if current[i] ~= watch.data[i] then
+                local run_start = i
+                while i <= #current and current[i] ~= watch.data[i] do
+                    i = i + 1
+                end
+                changes[#changes + 1] = {run_start - 1, i - run_start}
+                parts[#parts + 1] = bytes_to_string(current, run_start, i - 1)
+            else
+                i = i + 1
+            end
+        end
+
+        if #changes > 0 then
+            watch.data = current
+            updates[#updates + 1] = {type = "WATCH_UPDATE", watch = id, changes = changes, data = table.concat(parts)}
+        end
+    end
+
+    if #updates > 0 then
+        send_frame(0, updates)
+    end
+end
+
+-- Process every request frame received so far
+function send_receive_frames ()
+    while true do
+        local frame, err = receive_frame()
+        if frame == nil then
+            handle_receive_error(err)
+            return
+        end
+
+        -- Reset timeout timer
+        timeout_timer = 5
+
+        if DEBUG then
+            print("Received Frame ["..emu.framecount().."]: "..'"'..frame..'"')
+        end
+
+        local message = json.decode(frame)
+        send_frame(message["id"], process_requests(message["requests"]))
+    end
+end
+
+-- Receive data from AP client and send message back
+function send_receive ()
+    if protocol_version >= 2 then
+        send_receive_frames()
+        return
+    end
+
+    local message, err = client_socket:receive()
+
+    -- Handle errors
+    if err ~= nil then
+        handle_receive_error(err)
         return
     end
 
@@ -518,31 +782,11 @@ function send_receive ()
 
     if message == "VERSION" then
         client_socket:send(tostring(SCRIPT_VERSION).."\n")
+    elseif message == "PROTOCOL 2" then
+        protocol_version = 2
+        client_socket:send("2\n")
     else
-        local res = {}
-        local data = json.decode(message)
-        local failed_guard_response = nil
-        for i, req in ipairs(data) do
-            if failed_guard_response ~= nil then
-                res[i] = failed_guard_response
-            else
-                -- An error is more likely to cause an NLua exception than to return an error here
-                local status, response = pcall(process_request, req)
-                if status then
-                    res[i] = response
-
-                    -- If the GUARD validation failed, skip the remaining commands
-                    if response["type"] == "GUARD_RESPONSE" and not response["value"] then
-                        failed_guard_response = response
-                    end
-                else
-                    if type(response) ~= "string" then response = "Unknown error" end
-                    res[i] = {type = "ERROR", err = response}
-                end
-            end
-        end
-
-        client_socket:send(json.encode(res).."\n")
+        client_socket:send(json.encode(process_requests(json.decode(message))).."\n")
     end
 end
 
@@ -602,6 +846,7 @@ function main ()
                 if timeout == nil then
                     print("Client connected")
                     current_state = STATE_CONNECTED
+                    reset_connection()
                     client_socket = client
                     server:close()
                     server = nil
@@ -613,6 +858,10 @@ function main ()
                 send_receive()
             until not locked
 
+            if protocol_version >= 2 and current_state == STATE_CONNECTED then
+                send_watch_updates()
+            end
+
             if timeout_timer <= 0 then
                 print("Client timed out")
                 current_state = STATE_NOT_CONNECTED
@@ -4,8 +4,9 @@ import random
 import time
 from collections import deque
 from collections.abc import Callable, Iterable
+from typing import Generic, TypeVar
 
-from BaseClasses import CollectionState, Entrance, Region, EntranceType
+from BaseClasses import CollectionState, Entrance, Location, Region, EntranceType
 from Options import Accessibility
 from worlds.AutoWorld import World
 
@@ -14,6 +15,52 @@ class EntranceRandomizationError(RuntimeError):
     pass
 
 
+T = TypeVar("T")
+
+
+class _JournaledSet(set, Generic[T]):
+    """
+    A set that can record its changes to a journal, so speculative changes can be rolled back without copying the set.
+    Only the mutating methods used by region propagation are journaled.
+    """
+    journal: list[tuple[bool, T]] | None
+    """Pairs of (added, element) since recording started, or None when not recording"""
+
+    def __init__(self, elements: Iterable[T] = ()):
+        super().__init__(elements)
+        self.journal = None
+
+    def add(self, element: T) -> None:
+        if self.journal is not None and element not in self:
+            self.journal.append((True, element))
+        super().add(element)
+
+    def remove(self, element: T) -> None:
+        super().remove(element)
+        if self.journal is not None:
+            self.journal.append((False, element))
+
+    def discard(self, element: T) -> None:
+        if element in self:
+            self.remove(element)
+
+    def update(self, *iterables: Iterable[T]) -> None:
+        if self.journal is None:
+            super().update(*iterables)
+            return
+        for element in itertools.chain(*iterables):
+            self.add(element)
+
+    def rollback(self) -> None:
+        """Undoes all changes since recording started and stops recording"""
+        journal, self.journal = self.journal, None
+        for added, element in reversed(journal):
+            if added:
+                super().remove(element)
+            else:
+                super().add(element)
+
+
 class EntranceLookup:
     class GroupLookup:
         _lookup: dict[int, list[Entrance]]
@@ -181,6 +228,13 @@ class ERPlacementState:
     coupled: bool
     """Whether entrance randomization is operating in coupled mode"""
 
+    _new_exits: list[Entrance] | None
+    """Exits connected since reachability was last propagated, or None if a full update is needed"""
+    _pending_advancements: list[Location]
+    """Advancement locations which have not been swept yet"""
+    _swept_region_count: int
+    """The number of reachable regions at the time of the last sweep"""
+
     def __init__(self, world: World, entrance_lookup: EntranceLookup, coupled: bool):
         self.placements = []
         self.pairings = []
@@ -188,6 +242,15 @@ class ERPlacementState:
         self.coupled = coupled
         self.collection_state = world.multiworld.get_all_state(False, True)
         self.entrance_lookup = entrance_lookup
+        self._new_exits = None
+        self._pending_advancements = []
+        self._swept_region_count = -1
+        # journaled, so speculative connections can be rolled back instead of testing them on a copied state
+        player = world.player
+        self.collection_state.reachable_regions[player] = _JournaledSet(
+            self.collection_state.reachable_regions[player])
+        self.collection_state.blocked_connections[player] = _JournaledSet(
+            self.collection_state.blocked_connections[player])
 
     @property
     def placed_regions(self) -> set[Region]:
@@ -212,13 +275,130 @@ class ERPlacementState:
         target_region.entrances.remove(target_entrance)
         source_exit.connect(target_region)
 
+        if self._new_exits is not None:
+            self._new_exits.append(source_exit)
         self.collection_state.stale[self.world.player] = True
         self.placements.append(source_exit)
         self.pairings.append((source_exit.name, target_entrance.name))
         self.entrance_lookup.remove(target_entrance)
 
+    def update_reachability(self, full: bool = False) -> None:
+        """
+        Updates the reachable regions after placements. If nothing but connections changed since the last update,
+        only the newly connected exits are propagated instead of retrying every blocked connection.
+
+        :param full: Whether a full update is required, e.g. because items were collected outside of a sweep
+        """
+        state = self.collection_state
+        player = self.world.player
+        new_exits = self._new_exits
+        self._new_exits = []
+        if full or new_exits is None:
+            state.update_reachable_regions(player)
+            return
+        blocked_connections = state.blocked_connections[player]
+        state.stale[player] = False
+        # connection changes don't affect access rules, so blocked connections other than the new ones stay blocked
+        # (or are retried through indirect conditions) and don't need to be checked again.
+        self._propagate_reachability(deque(exit_ for exit_ in new_exits if exit_ in blocked_connections))
+
+    def _propagate_reachability(self, queue: deque[Entrance]) -> None:
+        """Continues the reachable region search of the collection state from the connections in queue"""
+        if self.world.explicit_indirect_conditions:
+            self.collection_state._update_reachable_regions_explicit_indirect_conditions(self.world.player, queue)
+        else:
+            # without explicit indirect conditions every blocked connection is retried once new regions are reached
+            self.collection_state._update_reachable_regions_auto_indirect_conditions(self.world.player, queue)
+
+    def sweep(self, full: bool = False) -> None:
+        """
+        Sweeps for advancements reachable after placements. Skipped if no new region became reachable since the last
+        sweep, as nothing else could have unlocked a location.
+
+        :param full: Whether to sweep even if no new region is reachable, and reconsider all advancement locations,
+                     e.g. because items were placed or collected outside of a sweep
+        """
+        state = self.collection_state
+        reachable_regions = state.reachable_regions[self.world.player]
+        if full or self._swept_region_count < 0:
+            self._pending_advancements = [location for locations in self.world.multiworld.regions.location_cache.values()
+                                          for location in locations.values()
+                                          if location.advancement and location not in state.advancements]
+        elif len(reachable_regions) == self._swept_region_count:
+            return
+        state.sweep_for_advancements(self._pending_advancements)
+        self._pending_advancements = [location for location in self._pending_advancements
+                                      if location not in state.advancements]
+        if state.stale[self.world.player]:
+            self.update_reachability(full=True)
+        self._swept_region_count = len(state.reachable_regions[self.world.player])
+
     def test_speculative_connection(self, source_exit: Entrance, target_entrance: Entrance,
                                     usable_exits: set[Entrance]) -> bool:
+        state = self.collection_state
+        player = self.world.player
+        reachable_regions = state.reachable_regions[player]
+        blocked_connections = state.blocked_connections[player]
+        if not isinstance(reachable_regions, _JournaledSet) or not isinstance(blocked_connections, _JournaledSet):
+            # the journaled sets were replaced, e.g. by removing an item from the state, so fall back to a copy
+            return self._test_speculative_connection_on_copy(source_exit, target_entrance, usable_exits)
+        if state.stale[player]:
+            self.update_reachability(full=True)
+
+        path_length = len(state.path)
+        reachable_regions.journal = []
+        blocked_connections.journal = []
+        try:
+            # simulated connection. A real connection is unsafe because on_connect side effects would have to be
+            # undone as well.
+            target_region = target_entrance.connected_region
+            queue = deque(target_region.exits)
+            reachable_regions.add(target_region)
+            blocked_connections.remove(source_exit)
+            blocked_connections.update(target_region.exits)
+            for new_entrance in self.world.multiworld.indirect_connections.get(target_region, ()):
+                if new_entrance in blocked_connections:
+                    queue.append(new_entrance)
+            self._propagate_reachability(queue)
+            state.sweep_for_advancements(self._pending_advancements)
+            return self._has_new_reachable_exit(state, source_exit, target_entrance, usable_exits)
+        finally:
+            self._rollback_speculation(path_length)
+
+    def _rollback_speculation(self, path_length: int) -> None:
+        """Undoes the changes made to the collection state by test_speculative_connection"""
+        state = self.collection_state
+        player = self.world.player
+        multiworld = self.world.multiworld
+        for location in self._pending_advancements:
+            if location in state.advancements:
+                state.advancements.remove(location)
+                state.locations_checked.discard(location)
+                item = location.item
+                multiworld.worlds[item.player].remove(state, item)
+                if item.player != player:
+                    # other players' region caches aren't journaled, so they have to be rebuilt
+                    state.reachable_regions[item.player] = set()
+                    state.blocked_connections[item.player] = set()
+                    state.stale[item.player] = True
+        reachable_regions = state.reachable_regions[player]
+        blocked_connections = state.blocked_connections[player]
+        if isinstance(reachable_regions, _JournaledSet) and isinstance(blocked_connections, _JournaledSet) \
+                and reachable_regions.journal is not None and blocked_connections.journal is not None:
+            reachable_regions.rollback()
+            blocked_connections.rollback()
+            state.stale[player] = False
+        else:
+            state.reachable_regions[player] = _JournaledSet()
+            state.blocked_connections[player] = _JournaledSet()
+            state.stale[player] = True
+            self._new_exits = None
+        # paths found during the speculation were appended at the end
+        for _ in range(len(state.path) - path_length):
+            state.path.popitem()
+
+    def _test_speculative_connection_on_copy(self, source_exit: Entrance, target_entrance: Entrance,
+                                             usable_exits: set[Entrance]) -> bool:
         copied_state = self.collection_state.copy()
         # simulated connection. A real connection is unsafe because the region graph is shallow-copied and would
         # propagate back to the real multiworld.
@@ -227,8 +407,12 @@ class ERPlacementState:
         copied_state.blocked_connections[self.world.player].update(target_entrance.connected_region.exits)
         copied_state.update_reachable_regions(self.world.player)
         copied_state.sweep_for_advancements()
+        return self._has_new_reachable_exit(copied_state, source_exit, target_entrance, usable_exits)
+
+    def _has_new_reachable_exit(self, state: CollectionState, source_exit: Entrance, target_entrance: Entrance,
+                                usable_exits: set[Entrance]) -> bool:
         # test that at there are newly reachable randomized exits that are ACTUALLY reachable
-        available_randomized_exits = copied_state.blocked_connections[self.world.player]
+        available_randomized_exits = state.blocked_connections[self.world.player]
         for _exit in available_randomized_exits:
             if _exit.connected_region:
                 continue
@@ -241,7 +425,7 @@ class ERPlacementState:
             # technically this should be is_valid_source_transition, but that may rely on side effects from
             # on_connect, which have not happened here (because we didn't do a real connection, and if we did, we would
             # not want them to persist). can_reach is a close enough approximation most of the time.
-            if _exit.can_reach(copied_state):
+            if _exit.can_reach(state):
                 return True
         return False
 
@@ -396,18 +580,19 @@ def randomize_entrances(
         coupled
     )
     # place the menu region and connected start region(s)
-    er_state.collection_state.update_reachable_regions(world.player)
+    er_state.update_reachability(full=True)
+    er_state.sweep(full=True)
 
     def do_placement(source_exit: Entrance, target_entrance: Entrance) -> None:
         placed_exits, paired_entrances = er_state.connect(source_exit, target_entrance)
         # propagate new connections
-        er_state.collection_state.update_reachable_regions(world.player)
-        er_state.collection_state.sweep_for_advancements()
+        er_state.update_reachability()
+        er_state.sweep()
         if on_connect:
             change = on_connect(er_state, placed_exits, paired_entrances)
             if change:
-                er_state.collection_state.update_reachable_regions(world.player)
-                er_state.collection_state.sweep_for_advancements()
+                er_state.update_reachability(full=True)
+                er_state.sweep(full=True)
 
     def needs_speculative_sweep(dead_end: bool, require_new_exits: bool, placeable_exits: list[Entrance]) -> bool:
         # speculative sweep is expensive. We currently only do it as a last resort, if we might cap off the graph
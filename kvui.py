@@ -514,7 +514,7 @@ class AutocompleteHintInput(ResizableTextField):
             ctx: context_type = MDApp.get_running_app().ctx
             if not ctx.game:
                 return
-            item_names = ctx.item_names._game_store[ctx.game].values()
+            name_index = ctx.item_names.name_index(ctx.game)
 
             def on_press(text):
                 split_text = MarkupLabel(text=text).markup
@@ -523,20 +523,14 @@ class AutocompleteHintInput(ResizableTextField):
                 self.dropdown.dismiss()
                 self.focus = True
 
-            lowered = value.lower()
-            for item_name in item_names:
-                try:
-                    index = item_name.lower().index(lowered)
-                except ValueError:
-                    pass  # substring not found
-                else:
-                    text = escape_markup(item_name)
-                    text = text[:index] + "[b]" + text[index:index+len(value)]+"[/b]"+text[index+len(value):]
-                    self.dropdown.items.append({
-                        "text": text,
-                        "on_release": lambda txt=text: on_press(txt),
-                        "markup": True
-                    })
+            for item_name, index in name_index.find_substring(value):
+                text = escape_markup(item_name)
+                text = text[:index] + "[b]" + text[index:index+len(value)]+"[/b]"+text[index+len(value):]
+                self.dropdown.items.append({
+                    "text": text,
+                    "on_release": lambda txt=text: on_press(txt),
+                    "markup": True
+                })
             if not self.dropdown.parent:
                 self.dropdown.open()
         else:
@@ -1129,24 +1123,28 @@ class LogtoUI(logging.Handler):
 class UILog(MDRecycleView):
     messages: typing.ClassVar[int]  # comes from kv file
     adaptive_height = True
+    lines: typing.Deque[typing.Dict[str, str]]
+    """Ring buffer of the latest messages, handed to the view at most once per frame"""
 
     def __init__(self, *loggers_to_handle, **kwargs):
         super(UILog, self).__init__(**kwargs)
         self.data = []
+        self.lines = deque(maxlen=self.messages)
+        # every assignment to data refreshes the whole view, so a burst of messages only assigns once
+        self._update_data = Clock.create_trigger(self.update_data)
         for logger in loggers_to_handle:
             logger.addHandler(LogtoUI(self.on_log))
 
     def on_log(self, record: str) -> None:
-        self.data.append({"text": escape_markup(record)})
-        self.clean_old()
+        self.lines.append({"text": escape_markup(record)})
+        self._update_data()
 
     def on_message_markup(self, text):
-        self.data.append({"text": text})
-        self.clean_old()
+        self.lines.append({"text": text})
+        self._update_data()
 
-    def clean_old(self):
-        if len(self.data) > self.messages:
-            self.data.pop(0)
+    def update_data(self, dt: typing.Optional[float] = None) -> None:
+        self.data = list(self.lines)
 
     def fix_heights(self):
         """Workaround fix for divergent texture and layout heights"""
@@ -0,0 +1,77 @@
+def run_entrance_rando_benchmark():
+    """Time generic entrance randomization on grids of regions, in coupled and uncoupled mode.
+    Every region holds an event that unlocks some of the exits of the next row, so sweeps find something to collect."""
+    import argparse
+    import logging
+
+    from time_it import TimeIt
+
+    from BaseClasses import CollectionState, EntranceType, Item, ItemClassification, Location, MultiWorld, Region
+    from Utils import init_logging
+    from worlds.AutoWorld import AutoWorldRegister, call_all
+    from entrance_rando import randomize_entrances
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    group_lookup = {1: [2], 2: [1], 3: [4], 4: [3]}
+
+    def add_entrance_pair(region: Region, name: str, group: int) -> None:
+        exit_ = region.create_exit(name)
+        exit_.randomization_group = group
+        exit_.randomization_type = EntranceType.TWO_WAY
+        target = region.create_er_target(name)
+        target.randomization_group = group
+        target.randomization_type = EntranceType.TWO_WAY
+
+    def create_multiworld(side: int, seed: int) -> MultiWorld:
+        # any world with explicit indirect conditions works, the regions are created here
+        game = "Archipelago"
+        multiworld = MultiWorld(1)
+        multiworld.game = {1: game}
+        multiworld.player_name = {1: "Tester"}
+        multiworld.set_seed(seed)
+        args = argparse.Namespace()
+        for name, option in AutoWorldRegister.world_types[game].options_dataclass.type_hints.items():
+            setattr(args, name, {1: option.from_any(option.default)})
+        multiworld.set_options(args)
+        multiworld.state = CollectionState(multiworld)
+        call_all(multiworld, "generate_early")
+        multiworld.worlds[1].origin_region_name = "Menu"
+        menu = Region("Menu", 1, multiworld)
+        multiworld.regions.append(menu)
+        for row in range(side):
+            for col in range(side):
+                index = row * side + col
+                region = Region(f"region{index}", 1, multiworld)
+                multiworld.regions.append(region)
+                event = Location(1, f"event{index}", None, region)
+                event.place_locked_item(Item(f"Key{row}", ItemClassification.progression, None, 1))
+                region.locations.append(event)
+                if index == 0:
+                    menu.connect(region)
+                if col != 0:
+                    add_entrance_pair(region, f"region{index}_left", 1)
+                if col != side - 1:
+                    add_entrance_pair(region, f"region{index}_right", 2)
+                if row != 0:
+                    add_entrance_pair(region, f"region{index}_top", 3)
+                if row != side - 1:
+                    add_entrance_pair(region, f"region{index}_bottom", 4)
+                    if col % 3 == 1:
+                        exit_ = multiworld.get_entrance(f"region{index}_bottom", 1)
+                        exit_.access_rule = lambda state, key=f"Key{row}": state.has(key, 1, 2)
+        return multiworld
+
+    for side in (10, 20, 30):
+        for coupled in (True, False):
+            mode = "coupled" if coupled else "uncoupled"
+            with TimeIt(f"{side}x{side} grid, {mode}", logger):
+                for seed in range(3):
+                    randomize_entrances(create_multiworld(side, seed).worlds[1], coupled, group_lookup)
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_entrance_rando_benchmark()
@@ -0,0 +1,70 @@
+def run_memory_benchmark():
+    """Report the memory used by the Location, Region and Entrance objects of every world with default options, in
+    bytes per object. Only the object itself, its __dict__ and the lists owned by it are counted, not the names, rules
+    and other objects it refers to."""
+    import argparse
+    import logging
+    import sys
+    from typing import Any, Counter, Dict, Tuple
+
+    from BaseClasses import CollectionState, Entrance, Location, MultiWorld, Region
+    from Utils import init_logging
+    from worlds import AutoWorldRegister
+    from worlds.AutoWorld import call_all
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    def own_size(obj: Any) -> int:
+        size = sys.getsizeof(obj)
+        if hasattr(obj, "__dict__"):
+            size += sys.getsizeof(obj.__dict__)
+        return size
+
+    def region_size(region: Region) -> int:
+        size = own_size(region) + sys.getsizeof(region.entrances)
+        for register in (region.locations, region.exits):
+            size += own_size(register) + sys.getsizeof(register._list)
+        return size
+
+    totals: Dict[type, Tuple[int, int]] = {Location: (0, 0), Region: (0, 0), Entrance: (0, 0)}
+    for game, world_type in sorted(AutoWorldRegister.world_types.items()):
+        try:
+            multiworld = MultiWorld(1)
+            multiworld.game[1] = game
+            multiworld.player_name = {1: "Tester"}
+            multiworld.set_seed(0)
+            args = argparse.Namespace()
+            for name, option in world_type.options_dataclass.type_hints.items():
+                setattr(args, name, {1: option.from_any(option.default)})
+            multiworld.set_options(args)
+            multiworld.state = CollectionState(multiworld)
+            for step in ("generate_early", "create_regions", "create_items", "set_rules", "connect_entrances",
+                         "generate_basic", "pre_fill"):
+                call_all(multiworld, step)
+        except Exception as e:
+            logger.warning(f"{game} could not be generated: {e}")
+            continue
+        sizes: Dict[type, Counter[str]] = {kind: Counter() for kind in totals}
+        for region in multiworld.get_regions():
+            sizes[Region].update(size=region_size(region), count=1)
+            for location in region.locations:
+                sizes[Location].update(size=own_size(location), count=1)
+            for entrance in region.exits:
+                sizes[Entrance].update(size=own_size(entrance), count=1)
+        for kind, counter in sizes.items():
+            total_size, total_count = totals[kind]
+            totals[kind] = total_size + counter["size"], total_count + counter["count"]
+        logger.info(f"{game}: " + ", ".join(f"{counter['count']} {kind.__name__}s at "
+                                            f"{counter['size'] / max(counter['count'], 1):.0f} bytes"
+                                            for kind, counter in sizes.items()))
+
+    for kind, (size, count) in totals.items():
+        logger.info(f"All worlds: {count} {kind.__name__}s at {size / max(count, 1):.1f} bytes each, "
+                    f"{size / 1024 / 1024:.1f} MiB in total")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_memory_benchmark()
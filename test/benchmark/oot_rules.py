@@ -0,0 +1,58 @@
+def run_oot_rules_benchmark():
+    """Time create_regions and set_rules for multiworlds of more and more Ocarina of Time players, with the compiled
+    rule cache of the rule parser cleared first, and again with the rules of the previous multiworld still cached,
+    like in a generator process creating several seeds."""
+    import argparse
+    import logging
+    import time
+
+    from BaseClasses import CollectionState, MultiWorld
+    from Utils import init_logging
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+    from worlds.oot.RuleParser import compiled_rules, parsed_rules
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    game = "Ocarina of Time"
+    steps = ("generate_early", "create_regions", "create_items", "set_rules")
+    timed_steps = ("create_regions", "set_rules")
+
+    def time_multiworld(players: int) -> float:
+        multiworld = MultiWorld(players)
+        multiworld.game = {player: game for player in multiworld.player_ids}
+        multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+        multiworld.set_seed(0)
+        args = argparse.Namespace()
+        for name, option in AutoWorld.AutoWorldRegister.world_types[game].options_dataclass.type_hints.items():
+            setattr(args, name, {player: option.from_any(option.default) for player in multiworld.player_ids})
+        multiworld.set_options(args)
+        multiworld.state = CollectionState(multiworld)
+        total = 0.
+        for step in steps:
+            start = time.perf_counter()
+            call_all(multiworld, step)
+            if step in timed_steps:
+                total += time.perf_counter() - start
+        return total
+
+    for cached in (False, True):
+        mode = "rules of the previous seed cached" if cached else "rule cache cleared"
+        single = 0.
+        for players in (1, 2, 4, 8):
+            if not cached:
+                compiled_rules.clear()
+                parsed_rules.clear()
+            total = time_multiworld(players)
+            if players == 1:
+                single = total
+                logger.info(f"1 player, {mode}: {' and '.join(timed_steps)} took {total:.4f} seconds")
+            else:
+                logger.info(f"{players} players, {mode}: {' and '.join(timed_steps)} took {total:.4f} seconds, "
+                            f"{(total - single) / (players - 1):.4f} seconds per additional player")
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_oot_rules_benchmark()
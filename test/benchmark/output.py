@@ -0,0 +1,65 @@
+def run_output_benchmark():
+    """Compare generating output in threads against worker processes, for worlds that set output_in_process.
+    A game name can be passed as the first command line argument, the player count as the second."""
+    import argparse
+    import concurrent.futures
+    import logging
+    import sys
+    import tempfile
+
+    from time_it import TimeIt
+
+    from BaseClasses import CollectionState, MultiWorld
+    from Fill import distribute_items_restrictive
+    from Utils import init_logging
+    from worlds import AutoWorld
+    from worlds.AutoWorld import AutoWorldRegister, call_all
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    games = [sys.argv[1]] if len(sys.argv) > 1 else \
+        [game for game, world_type in AutoWorldRegister.world_types.items() if world_type.output_in_process]
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    if not games:
+        logger.info("No loaded world sets output_in_process.")
+        return
+
+    for game in games:
+        multiworld = MultiWorld(players)
+        multiworld.game = {player: game for player in multiworld.player_ids}
+        multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+        multiworld.set_seed(0)
+        args = argparse.Namespace()
+        for name, option in AutoWorldRegister.world_types[game].options_dataclass.type_hints.items():
+            setattr(args, name, {player: option.from_any(option.default) for player in multiworld.player_ids})
+        multiworld.set_options(args)
+        multiworld.state = CollectionState(multiworld)
+        for step in ("generate_early", "create_regions", "create_items", "set_rules", "connect_entrances",
+                     "generate_basic", "pre_fill"):
+            call_all(multiworld, step)
+        distribute_items_restrictive(multiworld)
+
+        with tempfile.TemporaryDirectory() as output_directory:
+            with TimeIt(f"{game} output for {players} players in threads", logger):
+                with concurrent.futures.ThreadPoolExecutor(players) as pool:
+                    futures = [pool.submit(AutoWorld.call_single, multiworld, "generate_output", player,
+                                           output_directory) for player in multiworld.player_ids]
+                    for future in futures:
+                        future.result()
+
+        with tempfile.TemporaryDirectory() as output_directory:
+            with TimeIt(f"{game} output for {players} players in processes", logger):
+                with concurrent.futures.ProcessPoolExecutor() as pool:
+                    snapshots = [AutoWorld.call_single(multiworld, "get_output_snapshot", player)
+                                 for player in multiworld.player_ids]
+                    futures = [pool.submit(AutoWorld.call_from_snapshot, snapshot, output_directory)
+                               for snapshot in snapshots]
+                    for future in futures:
+                        future.result()
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_output_benchmark()
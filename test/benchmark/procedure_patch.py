@@ -0,0 +1,85 @@
+def run_procedure_patch_benchmark():
+    """Time APProcedurePatch.patch with the procedures of the bundled worlds on random data, against copying the data
+    for every step like patching used to. Only the generic steps of APPatchExtension are run, as the steps of a world
+    need its real ROM, and worlds with the same generic steps are timed together."""
+    import logging
+    import os
+    import random
+    import tempfile
+    from typing import Dict, List, Tuple
+
+    import bsdiff4
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from worlds.Files import APPatchExtension, APProcedurePatch, APTokenMixin, APTokenTypes, AutoPatchRegister
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    generic_steps = {"apply_bsdiff4", "apply_tokens", "calc_snes_crc"}
+    procedures: Dict[Tuple[str, ...], List[str]] = {}
+    for game, patch_type in AutoPatchRegister.patch_types.items():
+        if issubclass(patch_type, APProcedurePatch) and isinstance(patch_type.procedure, list):
+            steps = tuple(step for step, _ in patch_type.procedure if step in generic_steps)
+            if steps:
+                procedures.setdefault(steps, []).append(game)
+
+    class BenchmarkPatch(APProcedurePatch, APTokenMixin):
+        hash = None
+        patch_file_ending = ".apbenchmark"
+        source: bytes = b""
+
+        @classmethod
+        def get_source_data(cls) -> bytes:
+            return cls.source
+
+        def get_source_data_with_cache(self) -> bytes:
+            return self.source
+
+    class CopyingPatch(BenchmarkPatch):
+        def patch(self, target: str) -> None:
+            self.read()
+            for file in tuple(self._unread_files):
+                self.get_file(file)
+            data = self.get_source_data_with_cache()
+            for step, args in self.procedure:
+                extension = getattr(APPatchExtension, step)
+                data = bytes(extension(self, bytearray(data) if getattr(extension, "in_place", False) else data,
+                                       *args))
+            with open(target, "wb") as f:
+                f.write(data)
+
+    rng = random.Random(0)
+    for size in (4, 16):
+        source = rng.randbytes(size << 20)
+        modified = bytearray(source)
+        for offset in range(0, len(modified), 0x10000):
+            modified[offset:offset + 16] = rng.randbytes(16)
+        delta = bsdiff4.diff(source, bytes(modified))
+        BenchmarkPatch.source = source
+
+        with tempfile.TemporaryDirectory() as directory:
+            for steps, games in procedures.items():
+                path = os.path.join(directory, "benchmark.apbenchmark")
+                patch = BenchmarkPatch(path=path, player=1, player_name="Tester")
+                patch.procedure = [(step, {"apply_bsdiff4": ["delta.bsdiff4"], "apply_tokens": ["token_data.bin"],
+                                           "calc_snes_crc": []}[step]) for step in steps]
+                patch.write_file("delta.bsdiff4", delta)
+                for _ in range(5000):
+                    patch.write_token(APTokenTypes.WRITE, rng.randrange(len(source) - 16), rng.randbytes(16))
+                patch.write_file("token_data.bin", patch.get_token_binary())
+                patch.write()
+
+                logger.info(f"{', '.join(steps)} used by {', '.join(sorted(games))}")
+                for patch_type in (BenchmarkPatch, CopyingPatch):
+                    mode = "copying every step" if patch_type is CopyingPatch else "one buffer"
+                    with TimeIt(f"{size}MB, {mode}", logger):
+                        for _ in range(5):
+                            patch_type(path=path).patch(os.path.join(directory, "benchmark.bin"))
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_procedure_patch_benchmark()
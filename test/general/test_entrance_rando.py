@@ -2,7 +2,7 @@ from typing import Callable
 import unittest
 from enum import IntEnum
 
-from BaseClasses import Region, EntranceType, MultiWorld, Entrance
+from BaseClasses import Region, EntranceType, MultiWorld, Entrance, Item, ItemClassification
 from entrance_rando import disconnect_entrance_for_randomization, randomize_entrances, EntranceRandomizationError, \
     ERPlacementState, EntranceLookup, bake_target_group_lookup
 from Options import Accessibility
@@ -480,6 +480,74 @@ class TestRandomizeEntrances(unittest.TestCase):
         self.assertTrue(("region0_right", "region4_left") in result.pairings
                         or ("region0_right2", "region4_left") in result.pairings)
 
+    def test_incremental_reachability(self):
+        """tests that the incrementally updated state matches a full update of the final region graph"""
+        multiworld = generate_test_multiworld()
+        generate_disconnected_region_grid(multiworld, 5, 1)
+        for region_index in (3, 11, 17):
+            event = multiworld.get_region(f"region{region_index}", 1).locations[0]
+            event.place_locked_item(Item(f"Event{region_index}", ItemClassification.progression, None, 1))
+            multiworld.get_entrance(f"region{region_index + 5}_right", 1).access_rule = \
+                lambda state, item=f"Event{region_index}": state.has(item, 1)
+
+        result = randomize_entrances(multiworld.worlds[1], True, directionally_matched_group_lookup)
+        full_state = multiworld.get_all_state(False, True)
+        full_state.update_reachable_regions(1)
+        self.assertEqual(full_state.reachable_regions[1], result.collection_state.reachable_regions[1])
+        self.assertEqual(full_state.advancements, result.collection_state.advancements)
+
+    def test_incremental_reachability_auto_indirect_conditions(self):
+        """tests that connections depending on other regions are retried for worlds without explicit indirect
+        conditions"""
+        multiworld = generate_test_multiworld()
+        multiworld.worlds[1].explicit_indirect_conditions = False
+        generate_disconnected_region_grid(multiworld, 3)
+        multiworld.get_entrance("region0_bottom", 1).access_rule = lambda state: state.can_reach_region("region1", 1)
+        exits = [ex for region in multiworld.get_regions(1) for ex in region.exits if not ex.connected_region]
+        targets = [entrance for region in multiworld.get_regions(1)
+                   for entrance in region.entrances if not entrance.parent_region]
+        er_state = ERPlacementState(multiworld.worlds[1], EntranceLookup(multiworld.worlds[1].random, False,
+                                                                         set(exits), targets), False)
+        er_state.update_reachability(full=True)
+
+        er_state.connect(multiworld.get_entrance("region0_bottom", 1),
+                         er_state.entrance_lookup.find_target("region3_top"))
+        er_state.update_reachability()
+        self.assertNotIn(multiworld.get_region("region3", 1), er_state.placed_regions)
+        # reaching region1 unblocks the earlier connection to region3
+        er_state.connect(multiworld.get_entrance("region0_right", 1),
+                         er_state.entrance_lookup.find_target("region1_left"))
+        er_state.update_reachability()
+        self.assertIn(multiworld.get_region("region3", 1), er_state.placed_regions)
+
+    def test_speculative_connection_rolls_back(self):
+        """tests that testing a speculative connection leaves the placement state unchanged"""
+        multiworld = generate_test_multiworld()
+        generate_disconnected_region_grid(multiworld, 3, 1)
+        event = multiworld.get_region("region1", 1).locations[0]
+        event.place_locked_item(Item("Event", ItemClassification.progression, None, 1))
+        exits = [ex for region in multiworld.get_regions(1) for ex in region.exits if not ex.connected_region]
+        targets = [entrance for region in multiworld.get_regions(1)
+                   for entrance in region.entrances if not entrance.parent_region]
+        er_state = ERPlacementState(multiworld.worlds[1], EntranceLookup(multiworld.worlds[1].random, True,
+                                                                         set(exits), targets), True)
+        er_state.update_reachability(full=True)
+        er_state.sweep(full=True)
+        state = er_state.collection_state
+        reachable_regions = set(state.reachable_regions[1])
+        blocked_connections = set(state.blocked_connections[1])
+        advancements = set(state.advancements)
+        prog_items = state.prog_items[1].copy()
+
+        source_exit = multiworld.get_entrance("region0_right", 1)
+        target_entrance = er_state.entrance_lookup.find_target("region1_left")
+        self.assertTrue(er_state.test_speculative_connection(source_exit, target_entrance, set(exits)))
+        self.assertEqual(reachable_regions, state.reachable_regions[1])
+        self.assertEqual(blocked_connections, state.blocked_connections[1])
+        self.assertEqual(advancements, state.advancements)
+        self.assertEqual(prog_items, state.prog_items[1])
+        self.assertFalse(state.has("Event", 1))
+
     def test_fails_when_mismatched_entrance_and_exit_count(self):
         """tests that entrance randomization fast-fails if the input exit and entrance count do not match"""
         multiworld = generate_test_multiworld()
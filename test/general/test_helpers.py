@@ -3,7 +3,7 @@ from typing import Callable, Dict, Optional
 
 from typing_extensions import override
 
-from BaseClasses import CollectionState, MultiWorld, Region
+from BaseClasses import CollectionState, MultiWorld, Region, always_accessible
 
 
 class TestHelpers(unittest.TestCase):
@@ -84,3 +84,33 @@ class TestHelpers(unittest.TestCase):
                 for reg_exit in reg_exit_set[region]:
                     self.assertTrue(f"{region} -> {reg_exit}" in exit_names,
                                     f"{region} -> {reg_exit} not in {exit_names}")
+
+    def test_region_table(self) -> None:
+        """Tests `RegionManager.add_region_table()` creates the same as the region helpers"""
+        exit_rule: Callable[[CollectionState], bool] = lambda state: state.has("test_item", self.player)
+        regions = self.multiworld.regions.add_region_table(
+            self.multiworld, self.player, ["TestRegion1", "TestRegion2", "TestRegion3"],
+            location_names=["loc_1", "loc_2", "event_loc", "loc_3"], location_ids=[123, 456, None, 321],
+            location_regions=[0, 0, 0, 1], exit_regions=[0, 1, 0], exit_targets=[1, 0, 2],
+            exit_rules=[exit_rule, None, None])
+
+        self.assertEqual(["TestRegion1", "TestRegion2", "TestRegion3"], [region.name for region in regions])
+        self.assertEqual(regions, list(self.multiworld.get_regions(self.player)))
+        self.assertEqual([("loc_1", 123), ("loc_2", 456), ("event_loc", None)],
+                         [(location.name, location.address) for location in regions[0].locations])
+        self.assertIs(regions[1], self.multiworld.get_location("loc_3", self.player).parent_region)
+        self.assertEqual(["TestRegion1 -> TestRegion2", "TestRegion1 -> TestRegion3"],
+                         [exit_.name for exit_ in regions[0].exits])
+        self.assertEqual([regions[1], regions[2]], [exit_.connected_region for exit_ in regions[0].exits])
+        self.assertEqual(["TestRegion1 -> TestRegion2"], [entrance.name for entrance in regions[1].entrances])
+        self.assertIs(regions[0].exits[0], self.multiworld.get_entrance("TestRegion1 -> TestRegion2", self.player))
+        self.assertIs(exit_rule, regions[0].exits[0].access_rule)
+        self.assertIs(always_accessible, regions[1].exits[0].access_rule)
+
+        with self.assertRaises(AssertionError):
+            self.multiworld.regions.add_region_table(self.multiworld, self.player, ["TestRegion4", "TestRegion1"])
+        with self.assertRaises(AssertionError):
+            self.multiworld.regions.add_region_table(self.multiworld, self.player, ["TestRegion4"],
+                                                     location_names=["loc_5", "loc_5"], location_ids=[1, 2],
+                                                     location_regions=[0, 0])
+        self.assertNotIn("TestRegion4", self.multiworld.regions.region_cache[self.player])
@@ -1,7 +1,10 @@
 import unittest
 
-from BaseClasses import MultiWorld
+from typing_extensions import override
+
+from BaseClasses import CollectionState, Entrance, Location, MultiWorld, Region, always_accessible
 from worlds.AutoWorld import AutoWorldRegister
+from worlds.generic.Rules import add_rule
 from . import setup_solo_multiworld
 
 
@@ -19,3 +22,56 @@ class TestWorldMemory(unittest.TestCase):
         for game_name, weak in refs.items():
             with self.subTest("Game cleanup", game_name=game_name):
                 self.assertFalse(weak(), "World leaked a reference")
+
+
+class TestSlots(unittest.TestCase):
+    @override
+    def setUp(self) -> None:
+        self.multiworld = setup_solo_multiworld(AutoWorldRegister.world_types["Archipelago"], ())
+
+    def test_no_dict(self) -> None:
+        """Tests that the core classes don't have a __dict__ and share their default rules."""
+        region = Region("Region", 1, self.multiworld)
+        location = Location(1, "Location", 1, region)
+        entrance = Entrance(1, "Entrance", region)
+        for obj in (region, region.locations, region.exits, location, entrance):
+            with self.subTest(type(obj).__name__):
+                self.assertFalse(hasattr(obj, "__dict__"))
+        self.assertIs(always_accessible, location.access_rule)
+        self.assertIs(always_accessible, entrance.access_rule)
+        self.assertIs(Location(1, "Other Location").item_rule, location.item_rule)
+
+    def test_subclass_extension(self) -> None:
+        """Tests that subclasses can add attributes, declared in __slots__ or in a __dict__."""
+        class SlottedLocation(Location):
+            __slots__ = ("cost",)
+
+        class DictLocation(Location):
+            pass
+
+        slotted = SlottedLocation(1, "Slotted")
+        slotted.cost = 5
+        self.assertFalse(hasattr(slotted, "__dict__"))
+        with self.assertRaises(AttributeError):
+            setattr(slotted, "other", 5)
+        free = DictLocation(1, "Free")
+        setattr(free, "other", 5)
+        self.assertEqual({"other": 5}, vars(free))
+
+    def test_subclass_class_attributes(self) -> None:
+        """Tests that class attributes of subclasses replacing a default, like an access_rule, are kept."""
+        def never_accessible(state: CollectionState) -> bool:
+            return False
+
+        class MethodLocation(Location):
+            locked = True
+            access_rule = staticmethod(never_accessible)
+
+        location = MethodLocation(1, "Method")
+        state = CollectionState(self.multiworld)
+        self.assertTrue(location.locked)
+        self.assertFalse(location.access_rule(state))
+        self.assertIsNone(location.item)
+        add_rule(location, lambda state: True)
+        self.assertFalse(location.access_rule(state))
+        self.assertEqual([("item", None), ("show_in_spoiler", True)], list(MethodLocation.slot_defaults)[:2])
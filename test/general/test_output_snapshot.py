@@ -0,0 +1,97 @@
+import concurrent.futures
+import importlib
+import multiprocessing
+import os
+import pickle
+import tempfile
+import unittest
+import zipfile
+from typing import Dict
+
+from Fill import distribute_items_restrictive
+from worlds.AutoWorld import AutoWorldRegister, OutputSnapshot, call_from_snapshot, call_single
+from . import generate_test_multiworld, setup_multiworld
+
+# Main starts output workers with spawn, so they have to import everything they need themselves
+spawn_context = multiprocessing.get_context("spawn")
+
+def read_output(output_directory: str) -> Dict[str, Dict[str, bytes]]:
+    output: Dict[str, Dict[str, bytes]] = {}
+    for file_name in os.listdir(output_directory):
+        with zipfile.ZipFile(os.path.join(output_directory, file_name)) as zf:
+            output[file_name] = {member: zf.read(member) for member in zf.namelist()}
+    return output
+
+
+class TestOutputSnapshot(unittest.TestCase):
+    game = "Castlevania 64"
+
+    def setUp(self) -> None:
+        self.multiworld = setup_multiworld([AutoWorldRegister.world_types[self.game]] * 2, seed=1)
+        distribute_items_restrictive(self.multiworld)
+        self.snapshot: OutputSnapshot = call_single(self.multiworld, "get_output_snapshot", 1)
+
+    def test_contents(self) -> None:
+        """Tests that the snapshot copies the filled locations and continues the world's random."""
+        filled = self.multiworld.get_filled_locations(1)
+        self.assertEqual(len(self.snapshot.locations), len(filled))
+        snapshot_items = {location.name: (location.item_name, location.item_player)
+                          for location in self.snapshot.locations}
+        for location in filled:
+            self.assertEqual(snapshot_items[location.name], (location.item.name, location.item.player))
+        self.assertEqual(self.snapshot.out_file_name_base, self.multiworld.get_out_file_name_base(1))
+        world_random = self.multiworld.worlds[1].random
+        world_random.setstate(self.snapshot.random_state)
+        self.assertEqual(self.snapshot.random.random(), world_random.random())
+
+    def test_picklable(self) -> None:
+        """Tests that the snapshot survives being sent to another process."""
+        snapshot = pickle.loads(pickle.dumps(self.snapshot))
+        self.assertEqual(snapshot.locations, self.snapshot.locations)
+        self.assertEqual(snapshot.data, self.snapshot.data)
+        self.assertEqual(snapshot.options.accessibility.value, self.snapshot.options.accessibility.value)
+        self.assertEqual(snapshot.random.random(), self.snapshot.random.random())
+
+    def test_same_as_generate_output(self) -> None:
+        """Tests that output generated from the snapshot in a worker process is the same as from generate_output."""
+        for game_name, world_type in AutoWorldRegister.world_types.items():
+            if not world_type.output_in_process:
+                continue
+            with self.subTest(game_name):
+                multiworld = setup_multiworld([world_type] * 2, seed=1)
+                distribute_items_restrictive(multiworld)
+                snapshot: OutputSnapshot = pickle.loads(pickle.dumps(
+                    call_single(multiworld, "get_output_snapshot", 1)))
+                with tempfile.TemporaryDirectory() as process_directory, \
+                        tempfile.TemporaryDirectory() as thread_directory, \
+                        concurrent.futures.ProcessPoolExecutor(1, mp_context=spawn_context) as pool:
+                    pool.submit(call_from_snapshot, snapshot, process_directory).result()
+                    # get_output_snapshot used up some of the world's random, so start generate_output from
+                    # the same state
+                    multiworld.worlds[1].random.setstate(snapshot.random_state)
+                    call_single(multiworld, "generate_output", 1, thread_directory)
+                    process_output = read_output(process_directory)
+                    self.assertEqual(1, len(process_output))
+                    self.assertEqual(read_output(thread_directory), process_output)
+
+    def test_not_implemented(self) -> None:
+        """Tests that an error in a worker process reaches the generator."""
+        snapshot: OutputSnapshot = call_single(generate_test_multiworld(), "get_output_snapshot", 1)
+        with tempfile.TemporaryDirectory() as output_directory, \
+                concurrent.futures.ProcessPoolExecutor(1, mp_context=spawn_context,
+                                                       initializer=importlib.import_module,
+                                                       initargs=(__package__,)) as pool:
+            future = pool.submit(call_from_snapshot, snapshot, output_directory)
+            with self.assertRaises(NotImplementedError):
+                future.result()
+            self.assertFalse(os.listdir(output_directory))
+
+    def test_output_in_process_implemented(self) -> None:
+        """Tests that worlds generating output in a process implement generate_output_from_snapshot."""
+        self.assertTrue(AutoWorldRegister.world_types[self.game].output_in_process)
+        for game_name, world_type in AutoWorldRegister.world_types.items():
+            if world_type.output_in_process:
+                with self.subTest(game_name):
+                    self.assertIsNot(world_type.generate_output_from_snapshot.__func__,
+                                     AutoWorldRegister.world_types["Archipelago"]
+                                     .generate_output_from_snapshot.__func__)
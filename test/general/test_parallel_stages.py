@@ -0,0 +1,42 @@
+import random
+import unittest
+from typing import List, Tuple
+
+from BaseClasses import MultiWorld
+from Fill import distribute_items_restrictive
+from worlds import AutoWorldRegister
+from worlds.AutoWorld import call_all
+from . import gen_steps, setup_multiworld
+
+
+class TestParallelStages(unittest.TestCase):
+    games = ("Stardew Valley", "The Witness", "ChecksFinder", "The Witness", "Stardew Valley")
+
+    def generate(self, threads: int) -> MultiWorld:
+        # options with a random default are rolled with the global random
+        random.seed(42)
+        multiworld = setup_multiworld([AutoWorldRegister.world_types[game] for game in self.games], (), seed=42)
+        for step in gen_steps:
+            call_all(multiworld, step, threads=threads)
+        distribute_items_restrictive(multiworld)
+        return multiworld
+
+    @staticmethod
+    def placements(multiworld: MultiWorld) -> List[Tuple[str, int, str, int]]:
+        return [(location.name, location.player, location.item.name, location.item.player)
+                for location in multiworld.get_filled_locations()]
+
+    def test_same_as_serial(self) -> None:
+        """Tests that calling parallel safe worlds in threads gives the same results as calling them one by one."""
+        self.assertTrue(AutoWorldRegister.world_types["Stardew Valley"].parallel_safe)
+        self.assertFalse(AutoWorldRegister.world_types["ChecksFinder"].parallel_safe)
+        serial = self.generate(0)
+        parallel = self.generate(4)
+        self.assertEqual([(item.name, item.player) for item in serial.itempool],
+                         [(item.name, item.player) for item in parallel.itempool])
+        for player in serial.player_ids:
+            with self.subTest(game=serial.game[player], player=player):
+                self.assertEqual(serial.worlds[player].random.getstate(), parallel.worlds[player].random.getstate())
+                self.assertEqual(sorted(region.name for region in serial.get_regions(player)),
+                                 sorted(region.name for region in parallel.get_regions(player)))
+        self.assertEqual(self.placements(serial), self.placements(parallel))
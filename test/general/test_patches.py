@@ -1,6 +1,15 @@
-﻿import unittest
+﻿import hashlib
+import os
+import random
+import tempfile
+import unittest
+from typing import List, Union
+
+import bsdiff4
+
 from worlds.AutoWorld import AutoWorldRegister
-from worlds.Files import AutoPatchRegister
+from worlds.Files import APPatchExtension, APProcedurePatch, APTokenMixin, APTokenTypes, AutoPatchRegister, in_place, \
+    shared_file_ending, split_shared_files, token_header
 
 
 class TestPatches(unittest.TestCase):
@@ -9,3 +18,159 @@ class TestPatches(unittest.TestCase):
             with self.subTest(game=game_name):
                 self.assertIn(game_name, AutoWorldRegister.world_types.keys(),
                               f"Patch '{game_name}' does not match the name of any world.")
+
+
+source_data = bytes(range(256)) * 256
+data_types: List[type] = []
+
+
+class ProcedureTestExtension(APPatchExtension):
+    game = "Procedure Test"
+
+    @staticmethod
+    def reverse(caller: APProcedurePatch, rom: bytes) -> bytes:
+        data_types.append(type(rom))
+        return rom[::-1]
+
+    @staticmethod
+    @in_place
+    def invert_first(caller: APProcedurePatch, rom: bytearray) -> bytearray:
+        data_types.append(type(rom))
+        rom[0] ^= 0xFF
+        return rom
+
+
+class ProcedureTestPatch(APProcedurePatch, APTokenMixin):
+    # no game, so it isn't registered as a patch type
+    hash = None
+    patch_file_ending = ".aptest"
+    procedure = [
+        ("apply_bsdiff4", ["delta.bsdiff4"]),
+        ("apply_tokens", ["token_data.bin"]),
+        ("invert_first", []),
+        ("reverse", []),
+        ("invert_first", []),
+        ("calc_snes_crc", []),
+    ]
+
+    @classmethod
+    def get_source_data(cls) -> bytes:
+        return source_data
+
+
+class TestProcedurePatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.aptest")
+        data_types.clear()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write_patch(self) -> None:
+        modified = bytearray(source_data)
+        modified[0x100:0x104] = b"test"
+        patch = ProcedureTestPatch(path=self.path, player=1, player_name="Tester")
+        patch.game = "Procedure Test"
+        patch.write_file("delta.bsdiff4", bsdiff4.diff(source_data, bytes(modified)))
+        patch.write_token(APTokenTypes.WRITE, 0x200, b"tokens")
+        patch.write_token(APTokenTypes.XOR_8, 0x300, 0xFF)
+        patch.write_file("token_data.bin", patch.get_token_binary())
+        patch.write_file("unused.bin", b"unused")
+        patch.write()
+
+    def read_patch(self) -> ProcedureTestPatch:
+        patch = ProcedureTestPatch(path=self.path)
+        patch.game = "Procedure Test"
+        return patch
+
+    def test_procedure(self) -> None:
+        """Tests that the procedure produces the same as applying every step to a copy."""
+        self.write_patch()
+        patch = self.read_patch()
+        target = os.path.join(self.directory.name, "test.sfc")
+        patch.patch(target)
+
+        expected: Union[bytes, bytearray] = bytearray(source_data)
+        expected[0x100:0x104] = b"test"
+        expected[0x200:0x206] = b"tokens"
+        expected[0x300] ^= 0xFF
+        expected[0] ^= 0xFF
+        expected = bytearray(expected[::-1])
+        expected[0] ^= 0xFF
+        crc = (sum(expected[:0x7FDC]) + sum(expected[0x7FE0:]) + 0x01FE) & 0xFFFF
+        expected[0x7FDC:0x7FE0] = (crc ^ 0xFFFF).to_bytes(2, "little") + crc.to_bytes(2, "little")
+        with open(target, "rb") as f:
+            self.assertEqual(bytes(expected), f.read())
+        self.assertEqual([bytearray, bytes, bytearray], data_types)
+        self.assertEqual(source_data, ProcedureTestPatch.get_source_data_with_cache())
+
+    def test_lazy_files(self) -> None:
+        """Tests that files are only read once needed, and still written back if they weren't."""
+        self.write_patch()
+        patch = self.read_patch()
+        patch.read()
+        self.assertEqual({}, patch.files)
+        self.assertEqual(b"unused", patch.get_file("unused.bin"))
+        self.assertEqual(["unused.bin"], list(patch.files))
+
+        patch = self.read_patch()
+        patch.read()
+        patch.write()
+        patch = self.read_patch()
+        self.assertEqual(b"unused", patch.get_file("unused.bin"))
+        with self.assertRaises(KeyError):
+            patch.get_file("missing.bin")
+
+    def test_tokens(self) -> None:
+        """Tests that merged writes patch the same as every write on its own, in the same token format."""
+        rng = random.Random(0)
+        writes = [(offset, bytes((rng.randrange(256),))) for offset in range(0x400, 0x500)]
+        writes += [(offset, rng.randbytes(4)) for offset in (0x4FE, 0x502, 0x480, 0x490)]
+        patch = ProcedureTestPatch(path=self.path, player=1, player_name="Tester")
+        expected = bytearray(source_data)
+        for offset, data in writes:
+            patch.write_token(APTokenTypes.WRITE, offset, data)
+            expected[offset:offset + len(data)] = data
+        merged = bytes(expected[0x400:0x506])
+        patch.write_token(APTokenTypes.COPY, 0x600, (0x10, 0x480))
+        patch.write_token(APTokenTypes.RLE, 0x700, (0x10, 0xAA))
+        patch.write_token(APTokenTypes.AND_8, 0x480, 0x0F)
+        patch.write_token(APTokenTypes.WRITE, 0x481, b"\x01")
+        expected[0x600:0x610] = expected[0x480:0x490]
+        expected[0x700:0x710] = b"\xAA" * 0x10
+        expected[0x480] &= 0x0F
+        expected[0x481] = 1
+
+        token_data = patch.get_token_binary()
+        self.assertEqual(5, int.from_bytes(token_data[:4], "little"))
+        self.assertEqual((APTokenTypes.WRITE, 0x400, 0x106), token_header.unpack_from(token_data, 4))
+        self.assertEqual(merged, token_data[13:13 + 0x106])
+        patch.write_file("token_data.bin", token_data)
+        self.assertEqual(expected, APPatchExtension.apply_tokens(patch, bytearray(source_data), "token_data.bin"))
+
+    def test_shared_files(self) -> None:
+        """Tests that shared files are split from the container by hash and read from next to it."""
+        patch = ProcedureTestPatch(path=self.path, player=1, player_name="Tester")
+        patch.write_file("shared.bin", b"shared", shared=True)
+        patch.write_file("tampered.bin", b"tampered", shared=True)
+        patch.write_file("unshared.bin", b"unshared", shared=True)
+        patch.write_file("unshared.bin", b"unshared")
+        patch.shared_files["tampered.bin"] = hashlib.sha256(b"other").hexdigest()
+        patch.write()
+        with open(self.path, "rb") as f:
+            container, shared_files = split_shared_files(f.read())
+        shared_hash = hashlib.sha256(b"shared").hexdigest()
+        self.assertEqual({shared_hash: b"shared"}, shared_files)
+        self.assertEqual((container, {}), split_shared_files(container))
+        with open(self.path, "wb") as f:
+            f.write(container)
+
+        patch = self.read_patch()
+        self.assertEqual(b"tampered", patch.get_file("tampered.bin"))
+        self.assertEqual(b"unshared", patch.get_file("unshared.bin"))
+        with self.assertRaises(FileNotFoundError):
+            patch.get_file("shared.bin")
+        with open(os.path.join(self.directory.name, shared_hash + shared_file_ending), "wb") as f:
+            f.write(b"shared")
+        self.assertEqual(b"shared", patch.get_file("shared.bin"))
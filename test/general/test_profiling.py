@@ -0,0 +1,60 @@
+import unittest
+
+import GenerationProfiler
+from Fill import distribute_items_restrictive
+from worlds.AutoWorld import AutoWorldRegister
+from . import setup_solo_multiworld
+
+
+class TestGenerationProfile(unittest.TestCase):
+    def test_records_generation(self) -> None:
+        """Tests that an active profile records world calls, fills and counters, with memory on the main thread."""
+        world_type = AutoWorldRegister.world_types["A Link to the Past"]
+        with GenerationProfiler.GenerationProfile() as profile:
+            multiworld = setup_solo_multiworld(world_type)
+            distribute_items_restrictive(multiworld)
+        self.assertIsNone(GenerationProfiler.active)
+
+        report = profile.to_dict()
+        world_calls = {entry["name"] for entry in report["sections"]["world_calls"]}
+        for step in ("generate_early", "create_regions", "create_items", "set_rules"):
+            self.assertIn(step, world_calls)
+        self.assertIn("stage_pre_fill", world_calls)
+        for entry in report["sections"]["world_calls"]:
+            self.assertEqual(entry["game"], world_type.game)
+            self.assertGreaterEqual(entry["peak_memory"], 0)
+        self.assertIn("Progression", {entry["name"] for entry in report["sections"]["fill"]})
+        self.assertGreater(report["counters"]["sweeps"], 0)
+        self.assertGreater(report["counters"]["state_copies"], 0)
+        self.assertGreater(report["peak_memory"], 0)
+
+    def test_inactive(self) -> None:
+        """Tests that nothing gets recorded without an active profile."""
+        profile = GenerationProfiler.GenerationProfile(track_memory=False)
+        with GenerationProfiler.section("test", "inactive") as entry:
+            GenerationProfiler.count("test")
+        self.assertIsNone(entry)
+        self.assertFalse(profile.sections)
+        self.assertFalse(profile.counters)
+
+    def test_nested_peak(self) -> None:
+        """Tests that an outer section's peak memory includes allocations made by inner sections."""
+        with GenerationProfiler.GenerationProfile() as profile:
+            with GenerationProfiler.section("test", "outer"):
+                with GenerationProfiler.section("test", "inner"):
+                    data = bytearray(4 * 1024 * 1024)
+                    del data
+        inner, outer = profile.sections["test"]
+        self.assertEqual(inner["name"], "inner")
+        self.assertGreaterEqual(inner["peak_memory"], 4 * 1024 * 1024)
+        self.assertGreaterEqual(outer["peak_memory"], inner["peak_memory"])
+
+    def test_diff(self) -> None:
+        old = {"total_time": 2.0, "counters": {"sweeps": 10},
+               "sections": {"fill": [{"name": "Progression", "wall_time": 1.0, "peak_memory": 0}]}}
+        new = {"total_time": 1.0, "counters": {"sweeps": 4},
+               "sections": {"fill": [{"name": "Progression", "wall_time": 0.25, "peak_memory": 0}]}}
+        lines = GenerationProfiler.diff_reports(old, new)
+        self.assertEqual(lines[0], "total: 2.000s -> 1.000s")
+        self.assertTrue(lines[1].startswith("fill: Progression: 1.000s -> 0.250s (-0.750s)"))
+        self.assertEqual(lines[-1], "counter sweeps: 10 -> 4 (-6)")
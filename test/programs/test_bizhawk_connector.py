@@ -0,0 +1,292 @@
+import asyncio
+import base64
+import json
+import unittest
+from typing import Any, Dict, List, Optional
+
+from worlds._bizhawk import BizHawkContext, ConnectionStatus, NotConnectedError, RequestFailedError, \
+    get_script_version, guarded_read, read, send_requests, unwatch, upgrade_protocol, watch, write
+
+
+class FakeConnector:
+    """
+    Local stand-in for connector_bizhawk_generic.lua, speaking protocol 1 and 2 over TCP.
+    In protocol 2, request frames are collected and processed once per emulated frame, answered in reverse order so
+    responses have to be matched by id, followed by the watch updates of that frame.
+    """
+    memory: bytearray
+    script_version: int
+    frames_per_tick: List[int]
+    """number of request frames processed on each emulated frame that had any"""
+    pushed_changes: List[List[List[int]]]
+    handshake: List[str]
+    """lines received before switching to protocol 2"""
+    received_frames: List[bytes]
+    """raw protocol 2 request frames, including their size"""
+    malformed_frame: Optional[bytes]
+    """sent instead of the responses to the next request frame, if set"""
+
+    def __init__(self, script_version: int = 2) -> None:
+        self.memory = bytearray(range(256)) * 4
+        self.script_version = script_version
+        self.protocol_version = 1
+        self.frames_per_tick = []
+        self.pushed_changes = []
+        self.handshake = []
+        self.received_frames = []
+        self.malformed_frame = None
+        self.watches: Dict[int, Dict[str, Any]] = {}
+        self.inbox: List[Dict[str, Any]] = []
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.tick_task: Optional[asyncio.Task] = None
+
+    def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request["type"] == "PING":
+            return {"type": "PONG"}
+        if request["type"] == "HASH":
+            return {"type": "HASH_RESPONSE", "value": "F7D18982"}
+        if request["type"] == "GUARD":
+            expected = base64.b64decode(request["expected_data"])
+            actual = self.memory[request["address"]:request["address"] + len(expected)]
+            return {"type": "GUARD_RESPONSE", "value": actual == expected, "address": request["address"]}
+        if request["type"] == "READ":
+            data = bytes(self.memory[request["address"]:request["address"] + request["size"]])
+            if self.protocol_version >= 2:
+                return {"type": "READ_RESPONSE", "size": len(data), "data": data}
+            return {"type": "READ_RESPONSE", "value": base64.b64encode(data).decode("ascii")}
+        if request["type"] == "WRITE":
+            data = base64.b64decode(request["value"])
+            self.memory[request["address"]:request["address"] + len(data)] = data
+            return {"type": "WRITE_RESPONSE"}
+        if request["type"] == "WATCH" and self.protocol_version >= 2:
+            data = bytes(self.memory[request["address"]:request["address"] + request["size"]])
+            self.watches[request["watch"]] = {"address": request["address"], "size": request["size"], "data": data}
+            return {"type": "WATCH_RESPONSE", "watch": request["watch"], "size": len(data), "data": data}
+        if request["type"] == "UNWATCH":
+            self.watches.pop(request["watch"], None)
+            return {"type": "UNWATCH_RESPONSE"}
+        return {"type": "ERROR", "err": f"Unknown command: {request['type']}"}
+
+    def process_requests(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        responses = []
+        for request in requests:
+            if responses and responses[-1]["type"] == "GUARD_RESPONSE" and not responses[-1]["value"]:
+                responses.append(responses[-1])
+            else:
+                responses.append(self.process_request(request))
+        return responses
+
+    def send_frame(self, frame_id: int, responses: List[Dict[str, Any]]) -> None:
+        binary = b"".join(response.pop("data") for response in responses if "data" in response)
+        header = json.dumps({"id": frame_id, "responses": responses}).encode("utf-8")
+        self.writer.write((4 + len(header) + len(binary)).to_bytes(4, "little") +
+                          len(header).to_bytes(4, "little") + header + binary)
+
+    def send_watch_updates(self) -> None:
+        updates = []
+        for watch_id, memory_watch in self.watches.items():
+            current = bytes(self.memory[memory_watch["address"]:memory_watch["address"] + memory_watch["size"]])
+            changes = []
+            parts = []
+            index = 0
+            while index < len(current):
+                if current[index] != memory_watch["data"][index]:
+                    run_start = index
+                    while index < len(current) and current[index] != memory_watch["data"][index]:
+                        index += 1
+                    changes.append([run_start, index - run_start])
+                    parts.append(current[run_start:index])
+                else:
+                    index += 1
+            if changes:
+                memory_watch["data"] = current
+                self.pushed_changes.append(changes)
+                updates.append({"type": "WATCH_UPDATE", "watch": watch_id, "changes": changes, "data": b"".join(parts)})
+        if updates:
+            self.send_frame(0, updates)
+
+    async def tick(self) -> None:
+        while True:
+            await asyncio.sleep(0.01)
+            if self.writer is None or self.protocol_version < 2:
+                continue
+            messages, self.inbox = self.inbox, []
+            if messages:
+                self.frames_per_tick.append(len(messages))
+            if messages and self.malformed_frame is not None:
+                self.writer.write(len(self.malformed_frame).to_bytes(4, "little") + self.malformed_frame)
+                self.malformed_frame = None
+                continue
+            for message in reversed(messages):
+                self.send_frame(message["id"], self.process_requests(message["requests"]))
+            self.send_watch_updates()
+
+    async def handler(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        try:
+            while self.protocol_version < 2:
+                line = await reader.readline()
+                if not line:
+                    return
+                message = line.decode("utf-8").strip()
+                self.handshake.append(message)
+                if message == "VERSION":
+                    writer.write(f"{self.script_version}\n".encode("utf-8"))
+                elif message == "PROTOCOL 2" and self.script_version >= 2:
+                    self.protocol_version = 2
+                    writer.write(b"2\n")
+                else:
+                    writer.write(json.dumps(self.process_requests(json.loads(message))).encode("utf-8") + b"\n")
+            while True:
+                size_bytes = await reader.readexactly(4)
+                frame = await reader.readexactly(int.from_bytes(size_bytes, "little"))
+                self.received_frames.append(size_bytes + frame)
+                self.inbox.append(json.loads(frame))
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+
+    def drop_client(self) -> None:
+        self.writer.close()
+        self.writer = None
+        self.protocol_version = 1
+        self.watches.clear()
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handler, "127.0.0.1", 0)
+        self.tick_task = asyncio.create_task(self.tick())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.tick_task.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+
+
+class TestBizHawkConnector(unittest.IsolatedAsyncioTestCase):
+    script_version = 2
+
+    async def asyncSetUp(self) -> None:
+        self.connector = FakeConnector(self.script_version)
+        self.port = await self.connector.start()
+        self.ctx = BizHawkContext()
+        await self.connect()
+
+    async def connect(self) -> None:
+        self.ctx.streams = await asyncio.open_connection("127.0.0.1", self.port)
+        self.ctx.connection_status = ConnectionStatus.TENTATIVE
+        self.assertEqual(self.script_version,
+                         await upgrade_protocol(self.ctx, await get_script_version(self.ctx)))
+
+    async def asyncTearDown(self) -> None:
+        self.ctx._close("Test done")
+        await self.connector.stop()
+
+    async def test_read_write(self) -> None:
+        self.assertEqual([bytes(range(16, 48)), b"\xff"], await read(self.ctx, [(16, 32, "RAM"), (255, 1, "RAM")]))
+        await write(self.ctx, [(16, b"\x01\x02", "RAM")])
+        self.assertEqual(b"\x01\x02", self.connector.memory[16:18])
+        self.assertEqual(ConnectionStatus.CONNECTED, self.ctx.connection_status)
+
+    async def test_guarded_read(self) -> None:
+        self.assertEqual([bytes(range(8))], await guarded_read(self.ctx, [(0, 8, "RAM")], [(100, b"\x64\x65", "RAM")]))
+        self.assertIsNone(await guarded_read(self.ctx, [(0, 8, "RAM")], [(100, b"\x00", "RAM")]))
+
+    async def test_send_requests_format(self) -> None:
+        """Tests that send_requests keeps returning read data as base64, whatever the protocol."""
+        response = (await send_requests(self.ctx, [{"type": "READ", "address": 4, "size": 3, "domain": "RAM"}]))[0]
+        self.assertEqual({"type": "READ_RESPONSE", "value": "BAUG"}, {key: response[key] for key in ("type", "value")})
+        self.assertNotIn("data", response)
+
+
+class TestBizHawkConnectorProtocol1(TestBizHawkConnector):
+    script_version = 1
+
+    async def test_no_watches(self) -> None:
+        with self.assertRaises(NotImplementedError):
+            await watch(self.ctx, 0, 4, "RAM")
+
+
+class TestBizHawkConnectorProtocol2(TestBizHawkConnector):
+    async def test_pipelining(self) -> None:
+        """Tests that concurrent requests are in flight together and get their own responses."""
+        results = await asyncio.gather(*(read(self.ctx, [(address, 2, "RAM")]) for address in range(0, 40, 2)))
+        self.assertEqual([[bytes([address, address + 1])] for address in range(0, 40, 2)], results)
+        self.assertGreater(max(self.connector.frames_per_tick), 1)
+
+    async def test_watch(self) -> None:
+        updated = asyncio.Event()
+        self.ctx.on_watch_update = updated.set
+        memory_watch = await watch(self.ctx, 32, 64, "RAM")
+        self.assertEqual(bytes(range(32, 96)), memory_watch.data)
+
+        self.connector.memory[40:42] = b"\xaa\xbb"
+        self.connector.memory[90] = 0xcc
+        await asyncio.wait_for(updated.wait(), 1)
+        self.assertEqual(bytes(self.connector.memory[32:96]), memory_watch.data)
+        self.assertEqual(1, memory_watch.version)
+        self.assertEqual([[[8, 2], [58, 1]]], self.connector.pushed_changes)
+
+        await unwatch(self.ctx, memory_watch)
+        self.connector.memory[40] = 0
+        await asyncio.sleep(0.05)
+        self.assertEqual(1, len(self.connector.pushed_changes))
+        self.assertEqual(0xaa, memory_watch.data[8])
+
+    async def test_framing(self) -> None:
+        """Tests the handshake, that request frames are size prefixed json with unique ids, and that the binary part of
+        a response frame is split among the responses with data, in order."""
+        self.assertEqual(["VERSION", "PROTOCOL 2"], self.connector.handshake)
+        responses = await send_requests(self.ctx, [{"type": "READ", "address": 1, "size": 2, "domain": "RAM"},
+                                                   {"type": "PING"},
+                                                   {"type": "READ", "address": 10, "size": 3, "domain": "RAM"}])
+        self.assertEqual(["AQI=", "CgsM"], [responses[0]["value"], responses[2]["value"]])
+        self.assertEqual("PONG", responses[1]["type"])
+        await read(self.ctx, [(0, 1, "RAM")])
+
+        ids = []
+        for frame in self.connector.received_frames:
+            self.assertEqual(len(frame) - 4, int.from_bytes(frame[:4], "little"))
+            ids.append(json.loads(frame[4:])["id"])
+        self.assertEqual(2, len(ids))
+        self.assertNotIn(0, ids)
+        self.assertEqual(len(ids), len(set(ids)))
+
+    async def test_malformed_frame(self) -> None:
+        """Tests that a frame that can't be read is logged and closes the connection, failing waiting requests."""
+        header = json.dumps({"id": 1, "responses": [{"type": "READ_RESPONSE", "size": 4}]}).encode("utf-8")
+        frames = {
+            "invalid json": (4).to_bytes(4, "little") + b"{id:",
+            "missing id": self.make_frame({"responses": []}),
+            "missing responses": self.make_frame({"id": 1}),
+            "short binary data": len(header).to_bytes(4, "little") + header + b"\x00",
+        }
+        for name, frame in frames.items():
+            with self.subTest(name):
+                self.connector.malformed_frame = frame
+                with self.assertLogs("Client", "ERROR"), self.assertRaises(RequestFailedError):
+                    await asyncio.wait_for(read(self.ctx, [(0, 4, "RAM")]), 1)
+                self.assertEqual(ConnectionStatus.NOT_CONNECTED, self.ctx.connection_status)
+                self.connector.drop_client()
+                await self.connect()
+
+    @staticmethod
+    def make_frame(message: Dict[str, Any]) -> bytes:
+        header = json.dumps(message).encode("utf-8")
+        return len(header).to_bytes(4, "little") + header
+
+    async def test_reconnect(self) -> None:
+        """Tests that a lost connection fails waiting requests and that watches are registered again on reconnect."""
+        memory_watch = await watch(self.ctx, 0, 16, "RAM")
+        self.connector.drop_client()
+        with self.assertRaises((RequestFailedError, NotConnectedError)):
+            await read(self.ctx, [(0, 1, "RAM")])
+        self.assertEqual(ConnectionStatus.NOT_CONNECTED, self.ctx.connection_status)
+
+        self.connector.memory[0] = 0xee
+        await self.connect()
+        self.assertIn(memory_watch.watch_id, self.connector.watches)
+        self.assertEqual(0xee, memory_watch.data[0])
+
+
+del TestBizHawkConnector
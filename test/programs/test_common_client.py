@@ -93,3 +93,13 @@ class TestCommonContext(unittest.IsolatedAsyncioTestCase):
         assert self.ctx.item_names.lookup_in_slot(-1, 3) == "Nothing"
         assert self.ctx.item_names.lookup_in_game(-1, "__TestGame1") == "Nothing"
         assert self.ctx.item_names.lookup_in_game(-1, "__TestGame2") == "Nothing"
+
+    async def test_resume_opt_in(self):
+        """Tests that only clients opting in offer the state of their last connection."""
+        self.ctx.previous_items_received = [NetUtils.NetworkItem(1, 1, 1, 0)]
+        self.assertIsNone(self.ctx.get_resume_info())
+
+        self.ctx.resume_connection = True
+        resume = self.ctx.get_resume_info()
+        self.assertEqual(1, resume["items_index"])
+        self.assertEqual(NetUtils.get_items_checksum(self.ctx.previous_items_received), resume["items_checksum"])
@@ -39,8 +39,17 @@ class TestGenerateMain(unittest.TestCase):
         Generate.Utils.user_path.cached_path = Generate.Utils.local_path.cached_path = str(self.generate_dir)
         os.chdir(self.run_dir)
         self.output_tempdir = TemporaryDirectory(prefix='AP_out_')
+        # parsed yamls are cached, keep them out of the user's cache directory
+        self.cache_tempdir = TemporaryDirectory(prefix='AP_cache_')
+        self.original_cache_path = getattr(Generate.Utils.cache_path, "cached_path", None)
+        Generate.Utils.cache_path.cached_path = self.cache_tempdir.name
 
     def tearDown(self):
+        if self.original_cache_path is None:
+            del Generate.Utils.cache_path.cached_path
+        else:
+            Generate.Utils.cache_path.cached_path = self.original_cache_path
+        self.cache_tempdir.cleanup()
         self.output_tempdir.cleanup()
         os.chdir(self.original_cwd)
         sys.argv = self.original_argv
@@ -126,8 +135,8 @@ class TestGenerateWeights(TestGenerateMain):
 
         # there's likely a better way to do this, but hardcode the results from seed 1 to ensure they're always this
         expected_results = {
-            "accessibility": [0, 2, 0, 2, 2],
-            "progression_balancing": [0, 50, 99, 0, 50],
+            "accessibility": [0, 2, 0, 0, 2],
+            "progression_balancing": [0, 50, 0, 99, 0],
         }
 
         self.assertEqual(seed, 1)
@@ -137,3 +146,69 @@ class TestGenerateWeights(TestGenerateMain):
                     result, getattr(namespace, option_name)[player].value,
                     "Generated results from weights file did not match expected value."
                 )
+
+    def test_parallel_rolls(self):
+        """Tests that rolling options in a process pool gives the same results as rolling them in-process."""
+        from settings import get_settings
+        from Utils import user_path, local_path
+        settings = get_settings()
+        settings.generator.player_files_path = settings.generator.PlayerFilesPath(self.yaml_input_dir)
+        settings.generator.players = 5
+        settings._filename = None
+        user_path_backup = user_path.cached_path
+        user_path.cached_path = local_path()
+        try:
+            sys.argv = [sys.argv[0], "--seed", "1"]
+            sequential, _ = Generate.main()
+            sys.argv = [sys.argv[0], "--seed", "1", "--roll_workers", "2"]
+            parallel, _ = Generate.main()
+        finally:
+            user_path.cached_path = user_path_backup
+
+        for option_name in ("accessibility", "progression_balancing"):
+            for player in range(1, 6):
+                self.assertEqual(getattr(sequential, option_name)[player].value,
+                                 getattr(parallel, option_name)[player].value)
+
+
+class TestYamlCache(unittest.TestCase):
+    """Tests the cache of parsed player yamls."""
+
+    def setUp(self):
+        self.cache_tempdir = TemporaryDirectory(prefix='AP_cache_')
+        self.yaml_tempdir = TemporaryDirectory(prefix='AP_yaml_')
+        self.original_cache_path = getattr(Generate.Utils.cache_path, "cached_path", None)
+        Generate.Utils.cache_path.cached_path = self.cache_tempdir.name
+        self.original_cache_size = Generate.yaml_cache_size
+        Generate.yaml_cache_size = 2
+
+    def tearDown(self):
+        Generate.yaml_cache_size = self.original_cache_size
+        if self.original_cache_path is None:
+            del Generate.Utils.cache_path.cached_path
+        else:
+            Generate.Utils.cache_path.cached_path = self.original_cache_path
+        self.yaml_tempdir.cleanup()
+        self.cache_tempdir.cleanup()
+
+    def test_evicts_least_recently_used(self):
+        import hashlib
+        entries = []
+        paths = []
+        for i in range(3):
+            paths.append(os.path.join(self.yaml_tempdir.name, f"{i}.yaml"))
+            content = f"name: Player{i}\ngame: Archipelago\n".encode()
+            with open(paths[-1], "wb") as f:
+                f.write(content)
+            entries.append(f"{hashlib.sha256(content).hexdigest()}.pickle")
+        cache_folder = Generate.Utils.cache_path("yaml")
+
+        Generate.read_weights_yamls(paths[0], use_cache=True)
+        Generate.read_weights_yamls(paths[1], use_cache=True)
+        os.utime(os.path.join(cache_folder, entries[0]), (0, 0))
+        os.utime(os.path.join(cache_folder, entries[1]), (1, 1))
+        # reading the first yaml again makes the second one the least recently used
+        self.assertEqual("Player0", Generate.read_weights_yamls(paths[0], use_cache=True)[0]["name"])
+        Generate.read_weights_yamls(paths[2], use_cache=True)
+
+        self.assertEqual({entries[0], entries[2]}, set(os.listdir(cache_folder)))
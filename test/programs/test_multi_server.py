@@ -1,5 +1,13 @@
+import asyncio
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+
+from typing_extensions import override
+
+from MultiServer import Client, Context, ServerCommandProcessor, process_client_cmd, send_new_items
+from NetUtils import Endpoint, LocationStore, NetworkItem, NetworkSlot, SlotType, decode, get_items_checksum, \
+    get_locations_checksum
+from Utils import Version, version_tuple
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +46,115 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestConnection(unittest.IsolatedAsyncioTestCase):
+    @override
+    def setUp(self) -> None:
+        self.ctx = Context("", 0, "", "", 0, 0, False)
+        self.ctx.connect_names = {"Player": (0, 1)}
+        self.ctx.games = {1: "Archipelago"}
+        self.ctx.minimum_client_versions = {1: Version(0, 0, 0)}
+        self.ctx.slot_info = {1: NetworkSlot("Player", "Archipelago", SlotType.player)}
+        self.ctx.player_names = {(0, 1): "Player"}
+        self.ctx.slot_data = {1: typing.cast(typing.Mapping[str, typing.Any], {})}
+        self.ctx.clients = {0: {1: []}}
+        self.ctx.locations = LocationStore({1: {location: (location, 1, 0) for location in range(1, 11)}})
+        self.ctx.location_checks[0, 1] = {1, 2, 3}
+        self.items = [NetworkItem(item, item, 1, 0) for item in range(1, 6)]
+        self.ctx.received_items[0, 1, True] = self.items
+
+        self.sent: typing.List[typing.Dict[str, typing.Any]] = []
+
+        async def send_msgs(endpoint: Endpoint, msgs: typing.Iterable[typing.Dict[str, typing.Any]]) -> bool:
+            self.sent.extend(msgs)
+            return True
+
+        async def send_encoded_msgs(endpoint: Endpoint, msg: str) -> bool:
+            self.sent.extend(decode(msg))
+            return True
+
+        self.ctx.send_msgs = send_msgs
+        self.ctx.send_encoded_msgs = send_encoded_msgs
+        self.client = Client(typing.cast(typing.Any, None), self.ctx)  # no socket is used with the fake senders
+        self.client.auth = True  # skip the join messages
+
+    async def connect(self, **kwargs: typing.Any) -> typing.List[typing.Dict[str, typing.Any]]:
+        self.sent.clear()
+        await process_client_cmd(self.ctx, self.client, {
+            "cmd": "Connect", "password": None, "name": "Player", "game": "Archipelago", "version": version_tuple,
+            "tags": [], "items_handling": 0b011, "uuid": "test", **kwargs})
+        return list(self.sent)
+
+    async def test_full_sync(self) -> None:
+        """Tests that clients not resuming get everything."""
+        connected, received = await self.connect()
+        self.assertEqual([1, 2, 3], connected["checked_locations"])
+        self.assertEqual(list(range(4, 11)), connected["missing_locations"])
+        self.assertNotIn("resume", connected)
+        self.assertEqual({"cmd": "ReceivedItems", "index": 0, "items": self.items}, received)
+
+    async def test_resume(self) -> None:
+        """Tests that only the items after the ones the client has are sent, and locations only if they changed."""
+        resume = {"items_index": 3, "items_checksum": get_items_checksum(self.items[:3]),
+                  "locations_checksum": get_locations_checksum([3, 2, 1], range(4, 11))}
+        connected, received = await self.connect(resume=resume)
+        self.assertNotIn("checked_locations", connected)
+        self.assertNotIn("missing_locations", connected)
+        self.assertEqual({"locations": True, "items_index": 3}, connected["resume"])
+        self.assertEqual({"cmd": "ReceivedItems", "index": 3, "items": self.items[3:]}, received)
+        self.assertEqual(5, self.client.send_index)
+
+        resume["items_index"] = 5
+        resume["items_checksum"] = get_items_checksum(self.items)
+        self.assertEqual(1, len(await self.connect(resume=resume)))
+
+        self.ctx.location_checks[0, 1].add(4)
+        connected, = await self.connect(resume=resume)
+        self.assertEqual({"locations": False, "items_index": 5}, connected["resume"])
+        self.assertEqual([1, 2, 3, 4], connected["checked_locations"])
+
+    async def test_resume_mismatch(self) -> None:
+        """Tests that items differing from the server's, or more of them than the server has, are sent again."""
+        for resume in ({"items_index": 3, "items_checksum": get_items_checksum(self.items[1:4])},
+                       {"items_index": 6, "items_checksum": get_items_checksum(self.items + self.items[:1])},
+                       {"items_index": "3"}):
+            with self.subTest(resume=resume):
+                connected, received = await self.connect(resume=resume)
+                self.assertEqual({"locations": False, "items_index": 0}, connected["resume"])
+                self.assertIn("checked_locations", connected)
+                self.assertEqual(0, received["index"])
+
+    async def test_sync(self) -> None:
+        await self.connect()
+        self.sent.clear()
+        await process_client_cmd(self.ctx, self.client, {"cmd": "Sync", "items_index": 2,
+                                                          "items_checksum": get_items_checksum(self.items[:2])})
+        self.assertEqual([{"cmd": "ReceivedItems", "index": 2, "items": self.items[2:]}], self.sent)
+        self.sent.clear()
+        await process_client_cmd(self.ctx, self.client, {"cmd": "Sync"})
+        self.assertEqual([{"cmd": "ReceivedItems", "index": 0, "items": self.items}], self.sent)
+
+    async def test_packed_items(self) -> None:
+        """Tests that clients with the PackedItems tag get the same items, encoded once for the same range."""
+        await self.connect(tags=["PackedItems"])
+        self.assertEqual([{"cmd": "ReceivedItems", "index": 0, "items": self.items}], self.sent[1:])
+        self.assertIn('"class":"NetworkItems"', self.ctx.received_items_packets[0, 1, True, False, True, 0, 5])
+
+        self.items.append(NetworkItem(6, 6, 1, 0))
+        self.sent.clear()
+        send_new_items(self.ctx)
+        await asyncio.sleep(0)
+        self.assertEqual([{"cmd": "ReceivedItems", "index": 5, "items": self.items[5:]}], self.sent)
+
+        self.sent.clear()
+        await process_client_cmd(self.ctx, self.client, {"cmd": "LocationScouts", "locations": [4, 5]})
+        self.assertEqual({"class": "NetworkItems", "item": (4, 5), "location": (4, 5), "player": (1, 1),
+                          "flags": (0, 0)}, self.sent[0]["locations"])
+
+    async def test_encoded_once(self) -> None:
+        await self.connect()
+        packet = self.ctx.received_items_packets[0, 1, True, False, False, 0, 5]
+        await self.connect()
+        self.assertIs(packet, self.ctx.received_items_packets[0, 1, True, False, False, 0, 5])
+        self.assertEqual(1, len(self.ctx.received_items_packets))
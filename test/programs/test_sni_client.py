@@ -0,0 +1,178 @@
+import asyncio
+import json
+import time
+import unittest
+from typing import List, Optional
+
+from websockets.server import serve, WebSocketServerProtocol
+from websockets.client import connect
+
+import SNIClient
+from SNIClient import SNIContext, SNESState, merge_ranges, snes_read, snes_read_multi, snes_recv_loop
+
+
+class FakeSNI:
+    """Local stand-in for SNI, answering GetAddress and PutAddress requests from a memory buffer and counting them."""
+    memory: bytearray
+    requests: List[dict]
+    chunk_size: int
+    """answers are sent in chunks of this size, like SNI does for large reads"""
+    multi_operand: bool
+    """if False, only the first range of a GetAddress request is answered, like older SNI versions and connectors"""
+    rest_delay: float
+    """seconds before the ranges after the first one of a GetAddress request are answered, like a slow device"""
+
+    def __init__(self, chunk_size: int = 1024, multi_operand: bool = True) -> None:
+        self.memory = bytearray(0x1000000)
+        self.requests = []
+        self.chunk_size = chunk_size
+        self.multi_operand = multi_operand
+        self.rest_delay = 0
+        self.server = None
+
+    async def send(self, socket: WebSocketServerProtocol, data: bytes) -> None:
+        for start in range(0, len(data), self.chunk_size):
+            await socket.send(data[start:start + self.chunk_size])
+
+    async def handler(self, socket: WebSocketServerProtocol) -> None:
+        pending_write: Optional[int] = None
+        async for message in socket:
+            if isinstance(message, bytes):
+                assert pending_write is not None, "received data without a PutAddress request"
+                self.memory[pending_write:pending_write + len(message)] = message
+                pending_write = None
+                continue
+            request = json.loads(message)
+            self.requests.append(request)
+            operands = [int(operand, 16) for operand in request["Operands"]]
+            if not self.multi_operand:
+                operands = operands[:2]
+            if request["Opcode"] == "GetAddress":
+                ranges = list(zip(operands[::2], operands[1::2]))
+                await self.send(socket, self.memory[ranges[0][0]:ranges[0][0] + ranges[0][1]])
+                if len(ranges) > 1:
+                    await asyncio.sleep(self.rest_delay)
+                    await self.send(socket, b"".join(self.memory[address:address + size]
+                                                     for address, size in ranges[1:]))
+            elif request["Opcode"] == "PutAddress":
+                pending_write = operands[0]
+
+    async def start(self) -> str:
+        self.server = await serve(self.handler, "localhost", 0)
+        port = next(iter(self.server.sockets)).getsockname()[1]
+        return f"ws://localhost:{port}"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+
+class TestSNESReadMulti(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.sni = FakeSNI(chunk_size=64)
+        address = await self.sni.start()
+        self.ctx = SNIContext(address, None, None)
+        self.ctx.snes_socket = await connect(address, max_size=None)
+        self.ctx.snes_state = SNESState.SNES_ATTACHED
+        self.recv_task = asyncio.create_task(snes_recv_loop(self.ctx))
+        self.sni.memory[0x7E0000:0x7E0100] = bytes(range(256))
+        self.sni.memory[0xF50000:0xF50010] = bytes(range(100, 116))
+
+    async def asyncTearDown(self) -> None:
+        if self.ctx.snes_socket is not None:
+            await self.ctx.snes_socket.close()
+        await self.recv_task
+        await self.sni.stop()
+
+    def test_merge_ranges(self) -> None:
+        self.assertEqual([(0, 10), (20, 5)], merge_ranges([(5, 5), (0, 6), (20, 5)]))
+        self.assertEqual([(0, 10)], merge_ranges([(0, 4), (4, 6)]))
+        self.assertEqual([(0, 25)], merge_ranges([(0, 10), (20, 5)], max_gap=10))
+        self.assertEqual([(0, 10)], merge_ranges([(0, 10), (2, 3)]))
+
+    async def test_matches_single_reads(self) -> None:
+        """Tests that reading several ranges at once returns the same data as reading them one by one."""
+        ranges = [(0x7E0010, 4), (0x7E0012, 8), (0xF50002, 3), (0x7E00F0, 16)]
+        memory = await snes_read_multi(self.ctx, ranges)
+        for address, size in ranges:
+            self.assertEqual(await snes_read(self.ctx, address, size), bytes(memory.read(address, size)))
+        self.assertEqual(0x12, memory[0x7E0012])
+        self.assertEqual(bytes(range(0x10, 0x14)), bytes(memory[0x7E0010:0x7E0014]))
+        self.assertEqual(0x13121110, memory.read_int(0x7E0010, 4))
+        self.assertIsInstance(memory.read(0x7E0010, 4), memoryview)
+        with self.assertRaises(KeyError):
+            memory.read(0x7E0020, 1)
+        with self.assertRaises(KeyError):
+            memory.read(0xF50004, 2)
+
+    async def test_round_trips(self) -> None:
+        """Tests that adjacent ranges are merged and the remaining ranges are batched into few requests."""
+        await snes_read_multi(self.ctx, [(0x7E0000 + offset, 1) for offset in range(64)])
+        self.assertEqual(1, len(self.sni.requests))
+        self.assertEqual(["7e0000", "40"], self.sni.requests[0]["Operands"])
+
+        self.sni.requests.clear()
+        spread = [(0x7E0000 + offset, 2) for offset in range(0, 200, 10)]
+        memory = await snes_read_multi(self.ctx, spread)
+        self.assertEqual(3, len(self.sni.requests))  # 20 ranges in batches of 8
+        for address, size in spread:
+            self.assertEqual(self.sni.memory[address:address + size], memory.read(address, size))
+
+        self.sni.requests.clear()
+        for address, size in spread:
+            await snes_read(self.ctx, address, size)
+        self.assertEqual(len(spread), len(self.sni.requests))
+
+    async def test_operand_limit(self) -> None:
+        """Tests that a limit of one range per request still returns every range."""
+        old_limit = SNIClient.snes_read_multi_operands
+        SNIClient.snes_read_multi_operands = 1
+        try:
+            memory = await snes_read_multi(self.ctx, [(0x7E0000, 2), (0xF50000, 2)])
+        finally:
+            SNIClient.snes_read_multi_operands = old_limit
+        self.assertEqual(2, len(self.sni.requests))
+        self.assertEqual(b"\x00\x01", bytes(memory.read(0x7E0000, 2)))
+        self.assertEqual(b"\x64\x65", bytes(memory.read(0xF50000, 2)))
+
+    async def test_not_attached(self) -> None:
+        self.ctx.snes_state = SNESState.SNES_DISCONNECTED
+        self.assertIsNone(await snes_read_multi(self.ctx, [(0x7E0000, 1)]))
+        self.assertEqual([], self.sni.requests)
+
+    async def test_single_operand_fallback(self) -> None:
+        """Tests that devices only answering the first range of a request get one request per range."""
+        self.sni.multi_operand = False
+        ranges = [(0x7E0000, 2), (0x7E0010, 2), (0xF50000, 2)]
+        start = time.perf_counter()
+        with self.assertLogs(SNIClient.snes_logger, "INFO"):
+            memory = await snes_read_multi(self.ctx, ranges)
+        self.assertLess(time.perf_counter() - start, 5)  # the check doesn't wait the full timeout
+        self.assertFalse(self.ctx.snes_multi_read)
+        for address, size in ranges:
+            self.assertEqual(self.sni.memory[address:address + size], memory.read(address, size))
+
+        self.sni.requests.clear()
+        memory = await snes_read_multi(self.ctx, ranges)
+        self.assertEqual(3, len(self.sni.requests))
+        self.assertEqual(b"\x64\x65", bytes(memory.read(0xF50000, 2)))
+
+    async def test_multi_operand_detected(self) -> None:
+        await snes_read_multi(self.ctx, [(0x7E0000, 2), (0xF50000, 2)])
+        self.assertTrue(self.ctx.snes_multi_read)
+
+    async def test_late_answer(self) -> None:
+        """Tests that a device answering the check too slowly is read one by one, and its late answer is not used."""
+        self.sni.rest_delay = SNIClient.snes_multi_read_probe_timeout * 2
+        ranges = [(0x7E0000, 2), (0x7E0010, 2), (0xF50000, 2)]
+        with self.assertLogs(SNIClient.snes_logger, "INFO"):
+            memory = await snes_read_multi(self.ctx, ranges)
+        self.assertFalse(self.ctx.snes_multi_read)
+        for address, size in ranges:
+            self.assertEqual(self.sni.memory[address:address + size], memory.read(address, size))
+
+        await asyncio.sleep(0.1)  # the answers to the one by one requests arrive after the late answer
+        with self.assertLogs(SNIClient.snes_logger, "WARNING"):
+            self.assertIsNone(await snes_read_multi(self.ctx, ranges))
+        await self.recv_task
+        self.assertIsNone(self.ctx.snes_socket)
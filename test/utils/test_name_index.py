@@ -0,0 +1,58 @@
+# Tests for NameIndex in Utils.py
+
+import random
+import string
+import unittest
+
+from Utils import NameIndex, get_fuzzy_results, get_intended_text, get_name_index
+
+
+class TestNameIndex(unittest.TestCase):
+    names = ["Progressive Sword", "Master Sword", "Bow", "Silver Arrows", "Sword and Shield", "Bombos", "Bow"]
+
+    def setUp(self) -> None:
+        self.index = NameIndex(self.names)
+
+    def test_deduplicated(self) -> None:
+        self.assertEqual(("Progressive Sword", "Master Sword", "Bow", "Silver Arrows", "Sword and Shield", "Bombos"),
+                         self.index.names)
+
+    def test_find_substring(self) -> None:
+        """Tests that substring searches ignore case and return the same as checking every name, in order."""
+        for text in ("sword", "SWORD", "s", "bo", "ow", "Arrows", "rd an", "xyz", "swordx", ""):
+            with self.subTest(text):
+                expected = [(name, name.lower().index(text.lower())) for name in self.index.names
+                            if text.lower() in name.lower()]
+                self.assertEqual(expected, self.index.find_substring(text))
+
+    def test_trigrams_prefilter(self) -> None:
+        """Tests that names sharing trigrams with the text, but not containing it, are not matched."""
+        index = NameIndex(["abcxbcd", "abcd"])
+        self.assertEqual([("abcd", 0)], index.find_substring("abcd"))
+
+    def test_fuzzy_results(self) -> None:
+        """Tests that fuzzy searches return the same as checking every name, in the same order on ties."""
+        rng = random.Random(0)
+        words = ["Sword", "Shield", "Bow", "Arrow", "Key", "Small", "Big", "Heart", "Piece", "Bottle", "Fire", "Ice"]
+        names = list(dict.fromkeys(" ".join(rng.choices(words, k=rng.randint(1, 3))) for _ in range(300)))
+        names += ["bow", "BOW", "ab", ""]
+        index = NameIndex(names)
+        for _ in range(200):
+            text = list(rng.choice(names))
+            for _ in range(rng.randint(0, 3)):
+                position = rng.randint(0, len(text))
+                text[position:position + rng.randint(0, 1)] = rng.choice(string.ascii_letters)
+            text = "".join(text)
+            for limit in (1, 2, 5):
+                with self.subTest(text=text, limit=limit):
+                    self.assertEqual(get_fuzzy_results(text, names, limit), index.get_fuzzy_results(text, limit))
+            self.assertEqual(get_intended_text(text, names), get_intended_text(text, index))
+        for text in ("bow", "Bow", "BOW", "bOw", "ab", ""):
+            with self.subTest(text=text):
+                self.assertEqual(get_intended_text(text, names), get_intended_text(text, index))
+
+    def test_shared_by_checksum(self) -> None:
+        self.assertIs(get_name_index("test checksum", "items", self.names),
+                      get_name_index("test checksum", "items", self.names))
+        self.assertIsNot(get_name_index("test checksum", "items", self.names),
+                         get_name_index("test checksum", "locations", self.names))
@@ -0,0 +1,54 @@
+# Tests for load_cached_world_data in Utils.py
+
+import os
+import tempfile
+import unittest
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List
+
+import Utils
+from Utils import load_cached_world_data
+
+
+@dataclass
+class CachedData:
+    names: List[str]
+    groups: Dict[str, FrozenSet[str]]
+
+
+class TestWorldDataCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.old_cache_path = getattr(Utils.cache_path, "cached_path", None)
+        Utils.cache_path.cached_path = self.directory.name
+        self.builds = 0
+
+    def tearDown(self) -> None:
+        if self.old_cache_path is None:
+            del Utils.cache_path.cached_path
+        else:
+            Utils.cache_path.cached_path = self.old_cache_path
+        self.directory.cleanup()
+
+    def build(self) -> CachedData:
+        self.builds += 1
+        return CachedData(["a", "b"], {"group": frozenset({"a", "b"})})
+
+    def load(self, sources: List[bytes], modules: List[str]) -> CachedData:
+        return load_cached_world_data("Test World", sources, self.build, modules)
+
+    def test_cached(self) -> None:
+        """Tests that data is only built again once its sources change, and older caches are removed."""
+        data = self.load([b"source"], [__name__])
+        self.assertEqual(data, self.load([b"source"], [__name__]))
+        self.assertEqual(1, self.builds)
+        self.assertEqual(data, self.load([b"changed source"], [__name__]))
+        self.assertEqual(2, self.builds)
+        self.assertEqual(1, len(os.listdir(Utils.cache_path("world_data", "Test World"))))
+
+    def test_forbidden_class(self) -> None:
+        """Tests that a cache containing classes from other modules is built again instead of loaded."""
+        self.load([b"source"], [__name__])
+        with self.assertLogs(level="DEBUG"):
+            self.load([b"source"], ["BaseClasses"])
+        self.assertEqual(2, self.builds)
@@ -0,0 +1,261 @@
+import io
+import os
+import pickle
+import tempfile
+import tracemalloc
+import typing
+import zipfile
+import zlib
+from uuid import uuid4
+
+from . import TestBase
+
+
+class TestUpload(TestBase):
+    players = 200
+    slot_file_size = 256 * 1024
+    memory_ceiling = 16 * 1024 * 1024  # the slot files add up to 50 MiB
+
+    @staticmethod
+    def make_multidata(players: int) -> bytes:
+        from NetUtils import NetworkSlot, SlotType
+
+        multidata = {
+            "slot_info": {player: NetworkSlot(f"Player{player}", "Archipelago", SlotType.player)
+                          for player in range(1, players + 1)},
+            "datapackage": {},
+        }
+        return bytes((3,)) + zlib.compress(pickle.dumps(multidata), 9)
+
+    def setUp(self) -> None:
+        super().setUp()
+        handle, self.zip_path = tempfile.mkstemp(suffix=".zip")
+        os.close(handle)
+        with zipfile.ZipFile(self.zip_path, "w", zipfile.ZIP_STORED) as zfile:
+            zfile.writestr("AP_12345.archipelago", self.make_multidata(self.players))
+            zfile.writestr("AP_12345_Spoiler.txt", "spoiler")
+            for player in range(1, self.players + 1):
+                zfile.writestr(f"AP_12345_P{player}_Player{player}.bin",
+                               player.to_bytes(4, "little") * (self.slot_file_size // 4))
+
+    def tearDown(self) -> None:
+        os.unlink(self.zip_path)
+
+    def test_large_seed_memory(self) -> None:
+        """Verify that uploading a large seed does not hold all slot files in memory at once."""
+        from pony.orm import db_session, rollback
+        from WebHostLib.models import Seed, Slot
+        from WebHostLib.upload import upload_zip_to_db
+
+        progress = []
+        with self.app.app_context(), self.app.test_request_context(), db_session:
+            with zipfile.ZipFile(self.zip_path) as zfile:
+                tracemalloc.start()
+                try:
+                    seed = upload_zip_to_db(zfile, uuid4(), progress=lambda done, total: progress.append(done))
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+            seed_id = seed.id
+            self.assertLess(peak, self.memory_ceiling)
+            self.assertEqual(progress[-1], self.players)
+            rollback()
+
+        with db_session:
+            seed = Seed.get(id=seed_id)
+            self.assertIsNone(seed)  # transaction was rolled back
+
+    def test_slots_stored(self) -> None:
+        """Verify that slot files end up in the database attached to the right seed and player."""
+        from pony.orm import db_session, select
+        from WebHostLib.models import Seed, Slot
+        from WebHostLib.upload import upload_zip_to_db
+
+        with self.app.app_context(), self.app.test_request_context():
+            with db_session:
+                with zipfile.ZipFile(self.zip_path) as zfile:
+                    seed_id = upload_zip_to_db(zfile, uuid4()).id
+            with db_session:
+                seed = Seed.get(id=seed_id)
+                self.assertEqual(seed.spoiler, "spoiler")
+                self.assertEqual(len(seed.slots), self.players)
+                for slot in select(slot for slot in Slot if slot.seed == seed and slot.player_id in (1, self.players)):
+                    self.assertEqual(slot.player_name, f"Player{slot.player_id}")
+                    self.assertEqual(slot.data[:4], slot.player_id.to_bytes(4, "little"))
+                    self.assertEqual(len(slot.data), self.slot_file_size)
+                for slot in seed.slots:
+                    slot.delete()
+                seed.delete()
+
+    def test_slots_in_session(self) -> None:
+        """Verify that the stored slots and their data can be used in the session that uploaded them."""
+        from pony.orm import db_session, rollback
+        from NetUtils import NetworkSlot, SlotType
+        from WebHostLib.models import Slot
+        from WebHostLib.upload import store_slots, upload_zip_to_db
+
+        with self.app.app_context(), self.app.test_request_context(), db_session:
+            with zipfile.ZipFile(self.zip_path) as zfile:
+                seed = upload_zip_to_db(zfile, uuid4())
+            self.assertEqual(sorted(slot.player_id for slot in seed.slots), list(range(1, self.players + 1)))
+            for slot in seed.slots:
+                self.assertEqual(slot.player_name, f"Player{slot.player_id}")
+                self.assertEqual(slot.data, slot.player_id.to_bytes(4, "little") * (self.slot_file_size // 4))
+
+            # slots without a file, like games without a patch, keep no data
+            players = self.players
+            slot_infos = {players + extra: NetworkSlot(f"Extra{extra}", "Archipelago", SlotType.player)
+                          for extra in range(1, 4)}
+            self.assertEqual(store_slots(seed, slot_infos, {players + 2: lambda: b"extra"}), 3)
+            self.assertEqual(len(seed.slots), players + 3)
+            extra_data = {slot.player_name: slot.data
+                          for slot in Slot.select(lambda slot: slot.seed == seed and slot.player_id > players)}
+            self.assertEqual(extra_data, {"Extra1": None, "Extra2": b"extra", "Extra3": None})
+            rollback()
+
+
+class TestSharedFiles(TestBase):
+    players = 3
+    shared_data = bytes(range(256)) * 64
+
+    def setUp(self) -> None:
+        super().setUp()
+        handle, self.zip_path = tempfile.mkstemp(suffix=".zip")
+        os.close(handle)
+        self.write_upload(self.zip_path)
+
+    def tearDown(self) -> None:
+        os.unlink(self.zip_path)
+
+    def write_upload(self, zip_path: str, split_players: typing.Iterable[int] = (1,),
+                     include_shared_files: bool = True) -> None:
+        """Writes an output zip, in which the patches of split_players are split from the files they share."""
+        from worlds.Files import AutoPatchRegister, split_shared_files, shared_file_ending
+
+        patch_type = AutoPatchRegister.patch_types["Pokemon Emerald"]
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zfile:
+            zfile.writestr("AP_12345.archipelago", TestUpload.make_multidata(self.players))
+            for player in range(1, self.players + 1):
+                patch = patch_type(player=player, player_name=f"Player{player}")
+                patch.write_file("base_patch.bsdiff4", self.shared_data, shared=True)
+                patch.write_file("token_data.bin", player.to_bytes(4, "little"))
+                container = io.BytesIO()
+                patch.write(container)
+                container_data = container.getvalue()
+                if player in split_players:  # like an output zip generated with --share_output_files
+                    container_data, shared_files = split_shared_files(container_data)
+                    for shared_hash, data in shared_files.items():
+                        if include_shared_files and shared_hash + shared_file_ending not in zfile.namelist():
+                            zfile.writestr(shared_hash + shared_file_ending, data)
+                zfile.writestr(f"AP_12345_P{player}_Player{player}{patch_type.patch_file_ending}", container_data)
+
+    def test_stored_once(self) -> None:
+        """Verify that shared files are stored once, left out of slot files and put back into downloaded patches."""
+        from flask import url_for
+        from pony.orm import db_session
+        from WebHostLib.models import Room, Seed, SharedFile
+        from WebHostLib.upload import upload_zip_to_db
+
+        with self.app.app_context(), self.app.test_request_context():
+            with db_session:
+                with zipfile.ZipFile(self.zip_path) as zfile:
+                    seed = upload_zip_to_db(zfile, uuid4())
+                room = Room(seed=seed, owner=seed.owner, tracker=uuid4())
+                self.assertEqual([self.shared_data], [shared_file.data for shared_file in SharedFile.select()])
+                slots = {slot.player_id: slot.id for slot in seed.slots}
+                for slot in seed.slots:
+                    with zipfile.ZipFile(io.BytesIO(slot.data)) as container:
+                        self.assertEqual(["archipelago.json", "token_data.bin"], sorted(container.namelist()))
+                room_id = room.id
+
+            for player, slot_id in slots.items():
+                response = self.client.get(url_for("download_patch", room_id=room_id, patch_id=slot_id))
+                with zipfile.ZipFile(io.BytesIO(response.data)) as container:
+                    self.assertEqual(self.shared_data, container.read("base_patch.bsdiff4"))
+                    self.assertEqual(player.to_bytes(4, "little"), container.read("token_data.bin"))
+
+            with db_session:
+                room = Room.get(id=room_id)
+                seed = room.seed
+                room.delete()
+                for slot in seed.slots:
+                    slot.delete()
+                seed.delete()
+                SharedFile.select().delete(bulk=True)
+
+    def test_part_of_upload(self) -> None:
+        """Verify that shared files are only stored with the upload that needs them, and are linked to its seed."""
+        from pony.orm import db_session, rollback
+        from WebHostLib.models import SharedFile
+        from WebHostLib.upload import upload_zip_to_db
+
+        with self.app.app_context(), self.app.test_request_context():
+            with db_session:
+                with zipfile.ZipFile(self.zip_path) as zfile:
+                    seed = upload_zip_to_db(zfile, uuid4())
+                self.assertEqual([self.shared_data], [shared_file.data for shared_file in seed.shared_files])
+                rollback()
+            with db_session:
+                self.assertFalse(SharedFile.select().exists())
+
+    def test_missing(self) -> None:
+        """Verify that an upload with patches needing a shared file that is not uploaded or stored is refused."""
+        from flask import get_flashed_messages
+        from pony.orm import db_session
+        from WebHostLib.models import Seed, SharedFile
+        from WebHostLib.upload import upload_zip_to_db
+
+        handle, zip_path = tempfile.mkstemp(suffix=".zip")
+        os.close(handle)
+        self.addCleanup(os.unlink, zip_path)
+        self.write_upload(zip_path, range(1, self.players + 1), include_shared_files=False)
+
+        seed_id = uuid4()
+        with self.app.app_context(), self.app.test_request_context():
+            with db_session:
+                shared_files = SharedFile.select().count()
+                with zipfile.ZipFile(zip_path) as zfile:
+                    self.assertIsNone(upload_zip_to_db(zfile, uuid4(), sid=seed_id))
+                self.assertIn("was not uploaded", get_flashed_messages()[0])
+            with db_session:
+                self.assertIsNone(Seed.get(id=seed_id))
+                self.assertEqual(shared_files, SharedFile.select().count())
+
+    def test_cleanup(self) -> None:
+        """Verify that shared files are deleted with the last seed needing them, and downloads can't miss them."""
+        from uuid import UUID
+        from flask import url_for
+        from pony.orm import db_session
+        from WebHostLib.autolauncher import cleanup
+        from WebHostLib.models import Room, Seed, SharedFile
+        from WebHostLib.upload import upload_zip_to_db
+
+        with self.app.app_context(), self.app.test_request_context():
+            with db_session:
+                seed_ids = []
+                for _ in range(2):
+                    with zipfile.ZipFile(self.zip_path) as zfile:
+                        seed_ids.append(upload_zip_to_db(zfile, uuid4()).id)
+                self.assertEqual(1, SharedFile.select().count())
+
+            for seed_id in seed_ids:
+                with db_session:
+                    Seed[seed_id].owner = UUID(int=0)
+                cleanup()
+                with db_session:
+                    self.assertEqual(seed_id != seed_ids[-1], SharedFile.select().exists())
+
+            with db_session:
+                with zipfile.ZipFile(self.zip_path) as zfile:
+                    seed = upload_zip_to_db(zfile, uuid4())
+                room = Room(seed=seed, owner=seed.owner, tracker=uuid4())
+                room_id, slot_id = room.id, next(iter(seed.slots)).id
+                SharedFile.select().delete(bulk=True)
+            response = self.client.get(url_for("download_patch", room_id=room_id, patch_id=slot_id))
+            self.assertEqual(500, response.status_code)
+            self.assertIn(b"base_patch.bsdiff4 is missing", response.data)
+
+            with db_session:
+                Room[room_id].owner = UUID(int=0)
+                Room[room_id].seed.owner = UUID(int=0)
+            cleanup()
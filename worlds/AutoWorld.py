@@ -6,13 +6,14 @@ import pathlib
 import sys
 import time
 from random import Random
-from dataclasses import make_dataclass
-from typing import (Any, Callable, ClassVar, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, TextIO, Tuple,
-                    TYPE_CHECKING, Type, Union)
+from dataclasses import dataclass, make_dataclass
+from typing import (Any, Callable, ClassVar, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Set,
+                    TextIO, Tuple, TYPE_CHECKING, Type, Union)
 
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
 from BaseClasses import CollectionState
 from Utils import deprecate
+import GenerationProfiler
 
 if TYPE_CHECKING:
     from BaseClasses import MultiWorld, Item, Location, Tutorial, Region, Entrance
@@ -151,9 +152,18 @@ class WebWorldRegister(type):
 
 
 def _timed_call(method: Callable[..., Any], *args: Any,
-                multiworld: Optional["MultiWorld"] = None, player: Optional[int] = None) -> Any:
+                multiworld: Optional["MultiWorld"] = None, player: Optional[int] = None,
+                step: Optional[str] = None) -> Any:
     start = time.perf_counter()
-    ret = method(*args)
+    if GenerationProfiler.active:
+        # stage methods are bound to the world class, which knows its game
+        game = multiworld.game[player] if player and multiworld else getattr(getattr(method, "__self__", None),
+                                                                             "game", None)
+        with GenerationProfiler.section("world_calls", step or method.__qualname__, function=method.__qualname__,
+                               player=player, game=game):
+            ret = method(*args)
+    else:
+        ret = method(*args)
     taken = time.perf_counter() - start
     if taken > 1.0:
         if player and multiworld:
@@ -167,7 +177,7 @@ def _timed_call(method: Callable[..., Any], *args: Any,
 def call_single(multiworld: "MultiWorld", method_name: str, player: int, *args: Any) -> Any:
     method = getattr(multiworld.worlds[player], method_name)
     try:
-        ret = _timed_call(method, *args, multiworld=multiworld, player=player)
+        ret = _timed_call(method, *args, multiworld=multiworld, player=player, step=method_name)
     except Exception as e:
         message = f"Exception in {method} for player {player}, named {multiworld.player_name[player]}."
         if sys.version_info >= (3, 11, 0):
@@ -179,29 +189,93 @@ def call_single(multiworld: "MultiWorld", method_name: str, player: int, *args:
         return ret
 
 
-def call_all(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
-    world_types: Set[AutoWorldRegister] = set()
-    for player in multiworld.player_ids:
-        prev_item_count = len(multiworld.itempool)
-        world_types.add(multiworld.worlds[player].__class__)
-        call_single(multiworld, method_name, player, *args)
-        if __debug__:
-            new_items = multiworld.itempool[prev_item_count:]
-            for i, item in enumerate(new_items):
-                for other in new_items[i+1:]:
-                    assert item is not other, (
-                        f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
-                        f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+parallel_stages: Tuple[str, ...] = ("generate_early", "create_regions", "create_items", "set_rules", "generate_basic")
+"""the steps that worlds declaring parallel_safe can be called for at the same time"""
+
+
+def call_all(multiworld: "MultiWorld", method_name: str, *args: Any, threads: int = 0) -> None:
+    """
+    Calls method_name of every world, then the stage method of every world type.
+    With more than one thread, consecutive players with a parallel_safe world are called at the same time for the
+    parallel_stages. The items they add to the item pool are ordered by player afterward, as if called one by one.
+    """
+    if threads > 1 and method_name in parallel_stages:
+        parallel_players: List[int] = []
+        for player in multiworld.player_ids:
+            if multiworld.worlds[player].parallel_safe:
+                parallel_players.append(player)
+            else:
+                _call_parallel(multiworld, method_name, parallel_players, threads, *args)
+                parallel_players = []
+                _call_checked(multiworld, method_name, player, *args)
+        _call_parallel(multiworld, method_name, parallel_players, threads, *args)
+    else:
+        for player in multiworld.player_ids:
+            _call_checked(multiworld, method_name, player, *args)
 
     call_stage(multiworld, method_name, *args)
 
 
+def _call_checked(multiworld: "MultiWorld", method_name: str, player: int, *args: Any) -> None:
+    prev_item_count = len(multiworld.itempool)
+    call_single(multiworld, method_name, player, *args)
+    if __debug__:
+        _check_new_items(multiworld, player, multiworld.itempool[prev_item_count:])
+
+
+def _check_new_items(multiworld: "MultiWorld", player: int, new_items: List["Item"]) -> None:
+    for i, item in enumerate(new_items):
+        for other in new_items[i+1:]:
+            assert item is not other, (
+                f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
+                f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+
+
+def _call_parallel(multiworld: "MultiWorld", method_name: str, players: List[int], threads: int, *args: Any) -> None:
+    if len(players) < 2:
+        for player in players:
+            _call_checked(multiworld, method_name, player, *args)
+        return
+
+    import concurrent.futures
+
+    # keeps the previous items alive, so their ids can't be reused by new items
+    previous_items = multiworld.itempool.copy()
+    previous_ids = {id(item) for item in previous_items}
+    with concurrent.futures.ThreadPoolExecutor(min(threads, len(players))) as pool:
+        futures = [pool.submit(call_single, multiworld, method_name, player, *args) for player in players]
+    for future in futures:
+        future.result()
+
+    # parallel_safe worlds only add items of their own player
+    new_items = sorted((item for item in multiworld.itempool if id(item) not in previous_ids),
+                       key=lambda item: item.player)
+    multiworld.itempool[:] = [item for item in multiworld.itempool if id(item) in previous_ids] + new_items
+    if __debug__:
+        for player in players:
+            _check_new_items(multiworld, player, [item for item in new_items if item.player == player])
+
+
 def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     world_types = {multiworld.worlds[player].__class__ for player in multiworld.player_ids}
     for world_type in sorted(world_types, key=lambda world: world.__name__):
         stage_callable = getattr(world_type, f"stage_{method_name}", None)
         if stage_callable:
-            _timed_call(stage_callable, multiworld, *args)
+            _timed_call(stage_callable, multiworld, *args, step=f"stage_{method_name}")
+
+
+def call_from_snapshot(snapshot: "OutputSnapshot", output_directory: str) -> None:
+    """Process pool entry point for output, looks up the world type by game so only the snapshot has to be sent."""
+    method = AutoWorldRegister.world_types[snapshot.game].generate_output_from_snapshot
+    try:
+        _timed_call(method, snapshot, output_directory)
+    except Exception as e:
+        message = f"Exception in {method} for player {snapshot.player}, named {snapshot.player_name}."
+        if sys.version_info >= (3, 11, 0):
+            e.add_note(message)  # PEP 678
+        else:
+            logging.error(message)
+        raise e
 
 
 class WebWorld(metaclass=WebWorldRegister):
@@ -251,6 +325,45 @@ class WebWorld(metaclass=WebWorldRegister):
     """An optional map from item names (or item group names) to brief descriptions for users."""
 
 
+class SnapshotLocation(NamedTuple):
+    """Read-only copy of a filled Location, as seen by generate_output_from_snapshot."""
+    name: str
+    address: Optional[int]
+    locked: bool
+    item_name: str
+    item_code: Optional[int]
+    item_player: int
+    item_flags: int
+
+
+@dataclass(frozen=True)
+class OutputSnapshot:
+    """
+    Everything a world's generate_output_from_snapshot gets to see of the finished multiworld.
+    It has to be picklable, as it is sent to another process.
+    """
+    game: str
+    player: int
+    player_name: str
+    seed: int
+    seed_name: str
+    out_file_name_base: str
+    options: PerGameCommonOptions
+    random_state: Any
+    """state of the world's random at the start of the output stage, see `Random.setstate`"""
+    locations: Tuple[SnapshotLocation, ...]
+    """the player's locations that have an item"""
+    data: Any = None
+    """additional world-specific data, set by overriding World.get_output_snapshot"""
+
+    @property
+    def random(self) -> Random:
+        """A new Random continuing from the world's random"""
+        random = Random()
+        random.setstate(self.random_state)
+        return random
+
+
 class World(metaclass=AutoWorldRegister):
     """A World object encompasses a game's Items, Locations, Rules and additional data or functionality required.
     A Game should have its own subclass of World in which it defines the required data structures."""
@@ -331,6 +444,17 @@ class World(metaclass=AutoWorldRegister):
 
     zip_path: ClassVar[Optional[pathlib.Path]] = None
     """If loaded from a .apworld, this is the Path to it."""
+
+    parallel_safe: ClassVar[bool] = False
+    """If True, generate_early, create_regions, create_items, set_rules and generate_basic of this world can be called
+    in a thread, at the same time as those of other worlds, when generating with stage threads. Such a world only uses
+    its own random, only adds items of its own player to the item pool and only changes the multiworld's data of its
+    own player in those steps, so results are the same as calling the worlds one by one."""
+
+    output_in_process: ClassVar[bool] = False
+    """If True, the output of this world can be generated in a separate process by generate_output_from_snapshot,
+    using only the data of get_output_snapshot. Worlds that need the live multiworld for output leave this False
+    and have generate_output called from a thread."""
     __file__: ClassVar[str]
     """path it was loaded from"""
 
@@ -417,6 +541,34 @@ class World(metaclass=AutoWorldRegister):
         """
         pass
 
+    def get_output_snapshot(self) -> OutputSnapshot:
+        """
+        Collects the data needed by generate_output_from_snapshot. Gets called in the main process after fill.
+        Override to add world-specific data, i.e. `dataclasses.replace(super().get_output_snapshot(), data=...)`.
+        """
+        return OutputSnapshot(
+            game=self.game,
+            player=self.player,
+            player_name=self.multiworld.player_name[self.player],
+            seed=self.multiworld.seed,
+            seed_name=self.multiworld.seed_name,
+            out_file_name_base=self.multiworld.get_out_file_name_base(self.player),
+            options=self.options,
+            random_state=self.random.getstate(),
+            locations=tuple(SnapshotLocation(location.name, location.address, location.locked, location.item.name,
+                                             location.item.code, location.item.player, location.item.flags)
+                            for location in self.multiworld.get_filled_locations(self.player)),
+        )
+
+    @classmethod
+    def generate_output_from_snapshot(cls, snapshot: OutputSnapshot, output_directory: str) -> None:
+        """
+        Output counterpart of generate_output for worlds with output_in_process.
+        May get called in a worker process, so only snapshot and module-level data can be relied on.
+        """
+        raise NotImplementedError(f"{cls.__name__} sets output_in_process without implementing "
+                                  f"generate_output_from_snapshot.")
+
     def fill_slot_data(self) -> Mapping[str, Any]:  # json of WebHostLib.models.Slot
         """
         What is returned from this function will be in the `slot_data` field
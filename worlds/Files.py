@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import abc
+import hashlib
 import json
 import zipfile
 from enum import IntEnum
 import os
+import struct
 import threading
 from io import BytesIO
 
-from typing import ClassVar, Dict, List, Literal, Tuple, Any, Optional, Union, BinaryIO, overload, Sequence
+from typing import ClassVar, Dict, List, Literal, Tuple, Any, Optional, Union, BinaryIO, overload, Sequence, Set, \
+    Callable, TypeVar
 
 import bsdiff4
 
@@ -80,6 +83,34 @@ def is_ap_player_container(game: str, data: bytes, player: int):
     return False
 
 
+shared_file_ending: str = ".apshared"
+"""file ending of files that are stored once for all containers referencing them, named by their sha256 hash"""
+
+
+def split_shared_files(container: bytes) -> Tuple[bytes, Dict[str, bytes]]:
+    """
+    Returns the container without the files its manifest marks as shared, and those files by their hash.
+    Containers without shared files are returned unchanged.
+    """
+    shared_files: Dict[str, bytes] = {}
+    with zipfile.ZipFile(BytesIO(container), "r") as zf:
+        if "archipelago.json" not in zf.namelist():
+            return container, shared_files
+        shared_hashes: Dict[str, str] = json.loads(zf.read("archipelago.json")).get("shared_files", {})
+        if not shared_hashes.keys() & set(zf.namelist()):
+            return container, shared_files
+        split_container = BytesIO()
+        with zipfile.ZipFile(split_container, "w", zipfile.ZIP_DEFLATED, True, 9) as new_zf:
+            for info in zf.infolist():
+                data = zf.read(info)
+                # a file that doesn't match its hash stays in the container, so the hash can't point to other data
+                if info.filename in shared_hashes and hashlib.sha256(data).hexdigest() == shared_hashes[info.filename]:
+                    shared_files[shared_hashes[info.filename]] = data
+                else:
+                    new_zf.writestr(info, data)
+    return split_container.getvalue(), shared_files
+
+
 class InvalidDataError(Exception):
     """
     Since games can override `read_contents` in APContainer,
@@ -223,6 +254,10 @@ class APProcedurePatch(APAutoPatchInterface):
     hash: Optional[str]  # base checksum of source file
     source_data: bytes
     files: Dict[str, bytes]
+    shared_files: Dict[str, str]
+    """sha256 hashes of files that may be stored once for all containers, outside of this one"""
+    _unread_files: Set[str]
+    """files in the container at path that are read into files once needed"""
 
     @classmethod
     def get_source_data(cls) -> bytes:
@@ -238,12 +273,16 @@ class APProcedurePatch(APAutoPatchInterface):
     def __init__(self, *args: Any, **kwargs: Any):
         super(APProcedurePatch, self).__init__(*args, **kwargs)
         self.files = {}
+        self.shared_files = {}
+        self._unread_files = set()
 
     def get_manifest(self) -> Dict[str, Any]:
         manifest = super(APProcedurePatch, self).get_manifest()
         manifest["base_checksum"] = self.hash
         manifest["result_file_ending"] = self.result_file_ending
         manifest["procedure"] = self.procedure
+        if self.shared_files:
+            manifest["shared_files"] = self.shared_files
         if self.procedure == APDeltaPatch.procedure:
             manifest["compatible_version"] = 5
         return manifest
@@ -257,10 +296,21 @@ class APProcedurePatch(APAutoPatchInterface):
             self.procedure = [("apply_bsdiff4", ["delta.bsdiff4"])]
         else:
             self.procedure = manifest["procedure"]
-        for file in opened_zipfile.namelist():
-            if file not in ["archipelago.json"]:
+        self.shared_files = manifest.get("shared_files", {})
+        files = [file for file in opened_zipfile.namelist() if file not in ["archipelago.json"]]
+        if self.path and os.path.isfile(self.path):
+            # read when needed, which may not be all of them
+            self._unread_files = set(files).difference(self.files)
+        else:
+            for file in files:
                 self.files[file] = opened_zipfile.read(file)
 
+    def write(self, file: Optional[Union[str, BinaryIO]] = None) -> None:
+        # the container may be written over the one the unread files are in
+        for file_name in tuple(self._unread_files):
+            self.get_file(file_name)
+        super(APProcedurePatch, self).write(file)
+
     def write_contents(self, opened_zipfile: zipfile.ZipFile) -> None:
         super(APProcedurePatch, self).write_contents(opened_zipfile)
         for file in self.files:
@@ -270,16 +320,44 @@ class APProcedurePatch(APAutoPatchInterface):
     def get_file(self, file: str) -> bytes:
         """ Retrieves a file from the patch container."""
         if file not in self.files:
-            self.read()
+            if file not in self._unread_files:
+                self.read()
+            if file in self._unread_files:
+                with zipfile.ZipFile(self.path, "r") as zf:
+                    self.files[file] = zf.read(file)
+                self._unread_files.discard(file)
+            if file not in self.files and file in self.shared_files:
+                self.files[file] = self.get_shared_file(file)
         return self.files[file]
 
-    def write_file(self, file_name: str, file: bytes) -> None:
-        """ Writes a file to the patch container, to be retrieved upon patching. """
+    def get_shared_file(self, file: str) -> bytes:
+        """Retrieves a shared file that was split from the container, from the directory the container is in."""
+        shared_name = self.shared_files[file] + shared_file_ending
+        shared_path = os.path.join(os.path.dirname(self.path), shared_name) if isinstance(self.path, str) else None
+        if not shared_path or not os.path.isfile(shared_path):
+            raise FileNotFoundError(f"{file} is shared between patches and was not included in {self.path}. "
+                                    f"Place {shared_name} from the multiworld's output next to it.")
+        with open(shared_path, "rb") as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != self.shared_files[file]:
+            raise InvalidDataError(f"{shared_name} does not match its hash.")
+        return data
+
+    def write_file(self, file_name: str, file: bytes, shared: bool = False) -> None:
+        """
+        Writes a file to the patch container, to be retrieved upon patching.
+        Shared files, like a base patch every container of a world gets, may be stored once for the whole multiworld.
+        """
         self.files[file_name] = file
+        self._unread_files.discard(file_name)
+        if shared:
+            self.shared_files[file_name] = hashlib.sha256(file).hexdigest()
+        else:
+            self.shared_files.pop(file_name, None)
 
     def patch(self, target: str) -> None:
         self.read()
-        base_data = self.get_source_data_with_cache()
+        base_data: Union[bytes, bytearray] = self.get_source_data_with_cache()
         patch_extender = AutoPatchExtensionRegister.get_handler(self.game)
         assert not isinstance(self.procedure, str), f"{type(self)} must define procedures"
         for step, args in self.procedure:
@@ -289,6 +367,12 @@ class APProcedurePatch(APAutoPatchInterface):
             else:
                 extension = getattr(patch_extender, step, None)
             if extension is not None:
+                # consecutive in place steps share one buffer, only switching between them and other steps copies
+                if getattr(extension, "in_place", False):
+                    if not isinstance(base_data, bytearray):
+                        base_data = bytearray(base_data)
+                elif not isinstance(base_data, bytes):
+                    base_data = bytes(base_data)
                 base_data = extension(self, base_data, *args)
             else:
                 raise NotImplementedError(f"Unknown procedure {step} for {self.game}.")
@@ -323,6 +407,12 @@ class APTokenTypes(IntEnum):
     XOR_8 = 5
 
 
+token_header = struct.Struct("<BII")
+"""token type, offset and size of the arguments, in front of every token of a token binary"""
+token_range = struct.Struct("<II")
+"""arguments of COPY and RLE tokens"""
+
+
 class APTokenMixin:
     """
     A class that defines functions for generating a token binary, for use in patches.
@@ -333,33 +423,32 @@ class APTokenMixin:
             Tuple[int, int],  # COPY, RLE
             int  # AND_8, OR_8, XOR_8
         ]]] = ()
+    _merged_write: Optional[bytearray] = None
+    """data of the last WRITE token, if it was merged from several writes"""
 
     def get_token_binary(self) -> bytes:
         """
         Returns the token binary created from stored tokens.
         :return: A bytes object representing the token data.
         """
-        data = bytearray()
-        data.extend(len(self._tokens).to_bytes(4, "little"))
+        data: List[bytes] = [len(self._tokens).to_bytes(4, "little")]
         for token_type, offset, args in self._tokens:
-            data.append(token_type)
-            data.extend(offset.to_bytes(4, "little"))
-            if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
-                assert isinstance(args, int), f"Arguments to AND/OR/XOR must be of type int, not {type(args)}"
-                data.extend(int.to_bytes(1, 4, "little"))
+            if token_type == APTokenTypes.WRITE:
+                assert isinstance(args, (bytes, bytearray)), \
+                    f"Arguments to WRITE must be of type bytes, not {type(args)}"
+                data.append(token_header.pack(token_type, offset, len(args)))
                 data.append(args)
+            elif token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
+                assert isinstance(args, int), f"Arguments to AND/OR/XOR must be of type int, not {type(args)}"
+                data.append(token_header.pack(token_type, offset, 1))
+                data.append(bytes((args,)))
             elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
                 assert isinstance(args, tuple), f"Arguments to COPY/RLE must be of type tuple, not {type(args)}"
-                data.extend(int.to_bytes(8, 4, "little"))
-                data.extend(args[0].to_bytes(4, "little"))
-                data.extend(args[1].to_bytes(4, "little"))
-            elif token_type == APTokenTypes.WRITE:
-                assert isinstance(args, bytes), f"Arguments to WRITE must be of type bytes, not {type(args)}"
-                data.extend(len(args).to_bytes(4, "little"))
-                data.extend(args)
+                data.append(token_header.pack(token_type, offset, 8))
+                data.append(token_range.pack(*args))
             else:
                 raise ValueError(f"Unknown token type {token_type}")
-        return bytes(data)
+        return b"".join(data)
 
     @overload
     def write_token(self,
@@ -385,20 +474,42 @@ class APTokenMixin:
     def write_token(self, token_type: APTokenTypes, offset: int, data: Union[bytes, Tuple[int, int], int]) -> None:
         """
         Stores a token to be used by patching.
+        A WRITE that starts inside or right after the previous WRITE is merged into it, as the result is the same.
         """
         if not isinstance(self._tokens, list):
             assert len(self._tokens) == 0, f"{type(self)}._tokens was tampered with."
             self._tokens = []
+        if token_type == APTokenTypes.WRITE and self._tokens:
+            last_type, last_offset, last_data = self._tokens[-1]
+            if last_type == APTokenTypes.WRITE and last_offset <= offset <= last_offset + len(last_data):
+                if last_data is not self._merged_write:
+                    self._merged_write = bytearray(last_data)
+                    self._tokens[-1] = (last_type, last_offset, self._merged_write)
+                start = offset - last_offset
+                self._merged_write[start:start + len(data)] = data
+                return
         self._tokens.append((token_type, offset, data))
 
 
+PatchExtensionFunction = TypeVar("PatchExtensionFunction", bound=Callable[..., Union[bytes, bytearray]])
+
+
+def in_place(function: PatchExtensionFunction) -> PatchExtensionFunction:
+    """
+    Marks a patch extension function as changing the data in place. It gets the data as a bytearray, which it can
+    change and return instead of a copy. Goes below @staticmethod.
+    """
+    function.in_place = True  # type: ignore[attr-defined]
+    return function
+
+
 class APPatchExtension(metaclass=AutoPatchExtensionRegister):
     """Class that defines patch extension functions for a given game.
     Patch extension functions must have the following two arguments in the following order:
 
     caller: APProcedurePatch (used to retrieve files from the patch container)
 
-    rom: bytes (the data to patch)
+    rom: bytes (the data to patch), or a bytearray for functions marked with @in_place
 
     Further arguments are passed in from the procedure as defined.
 
@@ -413,44 +524,42 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
         return bsdiff4.patch(rom, caller.get_file(patch))
 
     @staticmethod
-    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytes:
+    @in_place
+    def apply_tokens(caller: APProcedurePatch, rom: bytearray, token_file: str) -> bytearray:
         """Applies the given token file from the patch onto the current file."""
-        token_data = caller.get_file(token_file)
-        rom_data = bytearray(rom)
+        token_data = memoryview(caller.get_file(token_file))
         token_count = int.from_bytes(token_data[0:4], "little")
         bpr = 4
         for _ in range(token_count):
-            token_type = token_data[bpr:bpr + 1][0]
-            offset = int.from_bytes(token_data[bpr + 1:bpr + 5], "little")
-            size = int.from_bytes(token_data[bpr + 5:bpr + 9], "little")
-            data = token_data[bpr + 9:bpr + 9 + size]
+            token_type, offset, size = token_header.unpack_from(token_data, bpr)
+            bpr += token_header.size
             if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
-                arg = data[0]
+                arg = token_data[bpr]
                 if token_type == APTokenTypes.AND_8:
-                    rom_data[offset] = rom_data[offset] & arg
+                    rom[offset] = rom[offset] & arg
                 elif token_type == APTokenTypes.OR_8:
-                    rom_data[offset] = rom_data[offset] | arg
+                    rom[offset] = rom[offset] | arg
                 else:
-                    rom_data[offset] = rom_data[offset] ^ arg
+                    rom[offset] = rom[offset] ^ arg
             elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
-                length = int.from_bytes(data[:4], "little")
-                value = int.from_bytes(data[4:], "little")
+                length, value = token_range.unpack_from(token_data, bpr)
                 if token_type == APTokenTypes.COPY:
-                    rom_data[offset: offset + length] = rom_data[value: value + length]
+                    rom[offset: offset + length] = rom[value: value + length]
                 else:
-                    rom_data[offset: offset + length] = bytes([value] * length)
+                    rom[offset: offset + length] = bytes((value,)) * length
             else:
-                rom_data[offset:offset + len(data)] = data
-            bpr += 9 + size
-        return bytes(rom_data)
+                rom[offset:offset + size] = token_data[bpr:bpr + size]
+            bpr += size
+        return rom
 
     @staticmethod
-    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytes:
+    @in_place
+    def calc_snes_crc(caller: APProcedurePatch, rom: bytearray) -> bytearray:
         """Calculates and applies a valid CRC for the SNES rom header."""
-        rom_data = bytearray(rom)
         if len(rom) < 0x8000:
             raise Exception("Tried to calculate SNES CRC on file too small to be a SNES ROM.")
-        crc = (sum(rom_data[:0x7FDC] + rom_data[0x7FE0:]) + 0x01FE) & 0xFFFF
+        with memoryview(rom) as view:
+            crc = (sum(view[:0x7FDC]) + sum(view[0x7FE0:]) + 0x01FE) & 0xFFFF
         inv = crc ^ 0xFFFF
-        rom_data[0x7FDC:0x7FE0] = [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF]
-        return bytes(rom_data)
+        rom[0x7FDC:0x7FE0] = [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF]
+        return rom
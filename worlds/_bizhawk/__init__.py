@@ -9,13 +9,21 @@ import asyncio
 import base64
 import enum
 import json
+import logging
 import sys
-from typing import Any, Sequence
+from typing import Any, Callable, Sequence
 
 
+logger = logging.getLogger("Client")
+
 BIZHAWK_SOCKET_PORT_RANGE_START = 43055
 BIZHAWK_SOCKET_PORT_RANGE_SIZE = 5
 
+PROTOCOL_VERSION = 2
+"""The newest connector protocol this module speaks. Version 1 sends one JSON line per request list and waits for the
+reply. Version 2 sends length-prefixed frames tagged with an id, so several request lists can be in flight at once,
+returns read data as raw bytes instead of base64, and supports memory watches pushed by the connector script."""
+
 
 class ConnectionStatus(enum.IntEnum):
     NOT_CONNECTED = 1
@@ -43,17 +51,65 @@ class SyncError(Exception):
     pass
 
 
+class MemoryWatch:
+    """A range of memory the connector script sends updates for whenever it changes. Created by `watch`."""
+    watch_id: int
+    address: int
+    size: int
+    domain: str
+    data: bytearray
+    """The latest known contents of the range"""
+    version: int
+    """Increased every time an update changes `data`"""
+
+    def __init__(self, watch_id: int, address: int, size: int, domain: str) -> None:
+        self.watch_id = watch_id
+        self.address = address
+        self.size = size
+        self.domain = domain
+        self.data = bytearray(size)
+        self.version = 0
+
+
 class BizHawkContext:
     streams: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None
     connection_status: ConnectionStatus
+    protocol_version: int
+    watches: dict[int, MemoryWatch]
+    on_watch_update: Callable[[], None] | None
+    """Called after pushed watch updates were applied"""
     _lock: asyncio.Lock
     _port: int | None
+    _pending: dict[int, asyncio.Future[list[dict[str, Any]]]]
+    _next_id: int
+    _reader_task: asyncio.Task[None] | None
 
     def __init__(self) -> None:
         self.streams = None
         self.connection_status = ConnectionStatus.NOT_CONNECTED
+        self.protocol_version = 1
+        self.watches = {}
+        self.on_watch_update = None
         self._lock = asyncio.Lock()
         self._port = None
+        self._pending = {}
+        self._next_id = 1
+        self._reader_task = None
+
+    def _close(self, reason: str) -> None:
+        """Closes the connection and fails every request still waiting for a response"""
+        if self.streams is not None:
+            self.streams[1].close()
+            self.streams = None
+        self.connection_status = ConnectionStatus.NOT_CONNECTED
+        self.protocol_version = 1
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RequestFailedError(reason))
+        self._pending.clear()
+        if self._reader_task is not None and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+        self._reader_task = None
 
     async def _send_message(self, message: str):
         async with self._lock:
@@ -68,9 +124,7 @@ class BizHawkContext:
                 res = await asyncio.wait_for(reader.readline(), timeout=5)
 
                 if res == b"":
-                    writer.close()
-                    self.streams = None
-                    self.connection_status = ConnectionStatus.NOT_CONNECTED
+                    self._close("Connection closed")
                     raise RequestFailedError("Connection closed")
 
                 if self.connection_status == ConnectionStatus.TENTATIVE:
@@ -78,16 +132,94 @@ class BizHawkContext:
 
                 return res.decode("utf-8")
             except asyncio.TimeoutError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
+                self._close("Connection timed out")
                 raise RequestFailedError("Connection timed out") from exc
             except ConnectionResetError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
+                self._close("Connection reset")
                 raise RequestFailedError("Connection reset") from exc
 
+    async def _send_frame(self, req_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Sends a list of requests as a protocol 2 frame and waits for the responses. Other frames may be sent while
+        waiting; the responses are matched to their requests by id."""
+        if self.streams is None:
+            raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
+
+        request_id = self._next_id
+        self._next_id += 1
+        future: asyncio.Future[list[dict[str, Any]]] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        payload = json.dumps({"id": request_id, "requests": req_list}).encode("utf-8")
+        writer = self.streams[1]
+        try:
+            writer.write(len(payload).to_bytes(4, "little") + payload)
+            await asyncio.wait_for(writer.drain(), timeout=5)
+            return await asyncio.wait_for(future, timeout=5)
+        except asyncio.TimeoutError as exc:
+            self._close("Connection timed out")
+            raise RequestFailedError("Connection timed out") from exc
+        except ConnectionResetError as exc:
+            self._close("Connection reset")
+            raise RequestFailedError("Connection reset") from exc
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_frames(self) -> None:
+        """Receives protocol 2 frames until the connection closes, resolving pending requests and applying watch
+        updates, which arrive with id 0"""
+        assert self.streams is not None
+        reader = self.streams[0]
+        try:
+            while True:
+                frame_size = int.from_bytes(await reader.readexactly(4), "little")
+                frame = await reader.readexactly(frame_size)
+                header_size = int.from_bytes(frame[:4], "little")
+                message = json.loads(frame[4:4 + header_size])
+                responses: list[dict[str, Any]] = message["responses"]
+                _attach_binary_data(responses, memoryview(frame)[4 + header_size:])
+
+                if self.connection_status == ConnectionStatus.TENTATIVE:
+                    self.connection_status = ConnectionStatus.CONNECTED
+
+                if message["id"] == 0:
+                    self._apply_watch_updates(responses)
+                else:
+                    future = self._pending.get(message["id"])
+                    if future is not None and not future.done():
+                        future.set_result(responses)
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            self._close("Connection closed")
+        except Exception as exc:
+            # a frame that can't be read leaves the stream out of sync, so the connection can't be used anymore
+            logger.exception("Received a malformed frame from the connector script")
+            self._close(f"Malformed frame: {exc!r}")
+
+    def _apply_watch_updates(self, updates: list[dict[str, Any]]) -> None:
+        for update in updates:
+            memory_watch = self.watches.get(update["watch"])
+            if memory_watch is None:
+                continue
+            for (offset, size), data in zip(update["changes"], update["data"]):
+                memory_watch.data[offset:offset + size] = data
+            memory_watch.version += 1
+        if self.on_watch_update is not None:
+            self.on_watch_update()
+
+
+def _attach_binary_data(responses: list[dict[str, Any]], blob: memoryview) -> None:
+    """Splits the binary part of a protocol 2 frame among the responses it belongs to, in order"""
+    position = 0
+    for response in responses:
+        if response["type"] in ("READ_RESPONSE", "WATCH_RESPONSE"):
+            response["data"] = bytes(blob[position:position + response["size"]])
+            position += response["size"]
+        elif response["type"] == "WATCH_UPDATE":
+            response["data"] = []
+            for _, size in response["changes"]:
+                response["data"].append(bytes(blob[position:position + size]))
+                position += size
+    if position != len(blob):
+        raise ValueError(f"Frame has {len(blob)} bytes of binary data, but its responses describe {position}")
+
 
 async def connect(ctx: BizHawkContext) -> bool:
     """Attempts to establish a connection with a connector script. Returns True if successful."""
@@ -112,21 +244,40 @@ async def connect(ctx: BizHawkContext) -> bool:
 
 def disconnect(ctx: BizHawkContext) -> None:
     """Closes the connection to the connector script."""
-    if ctx.streams is not None:
-        ctx.streams[1].close()
-        ctx.streams = None
-    ctx.connection_status = ConnectionStatus.NOT_CONNECTED
+    ctx._close("Disconnected")
 
 
 async def get_script_version(ctx: BizHawkContext) -> int:
     return int(await ctx._send_message("VERSION"))
 
 
-async def send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Sends a list of requests to the BizHawk connector and returns their responses.
-
-    It's likely you want to use the wrapper functions instead of this."""
-    responses = json.loads(await ctx._send_message(json.dumps(req_list)))
+async def upgrade_protocol(ctx: BizHawkContext, script_version: int) -> int:
+    """Switches the connection to the newest protocol both this module and the connector script support and returns
+    its version. Watches registered on a previous connection are registered again."""
+    version = min(script_version, PROTOCOL_VERSION)
+    if version >= 2:
+        if int(await ctx._send_message(f"PROTOCOL {version}")) != version:
+            raise SyncError(f"Connector script did not switch to protocol {version}")
+        ctx.protocol_version = version
+        ctx._reader_task = asyncio.create_task(ctx._read_frames(), name="BizHawkReader")
+        if ctx.watches:
+            responses = await _send_requests(ctx, [_watch_request(memory_watch)
+                                                   for memory_watch in ctx.watches.values()])
+            for memory_watch, response in zip(ctx.watches.values(), responses):
+                memory_watch.data[:] = response["data"]
+                memory_watch.version += 1
+    return version
+
+
+async def _send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Like `send_requests`, but the data of `READ_RESPONSE`s and `WATCH_RESPONSE`s is returned as bytes in `data`"""
+    if ctx.protocol_version >= 2:
+        responses = await ctx._send_frame(req_list)
+    else:
+        responses = json.loads(await ctx._send_message(json.dumps(req_list)))
+        for response in responses:
+            if response["type"] == "READ_RESPONSE":
+                response["data"] = base64.b64decode(response["value"])
     errors: list[ConnectorError] = []
 
     for response in responses:
@@ -142,6 +293,17 @@ async def send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) ->
     return responses
 
 
+async def send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Sends a list of requests to the BizHawk connector and returns their responses.
+
+    It's likely you want to use the wrapper functions instead of this."""
+    responses = await _send_requests(ctx, req_list)
+    for response in responses:
+        if "data" in response:
+            response["value"] = base64.b64encode(response.pop("data")).decode("ascii")
+    return responses
+
+
 async def ping(ctx: BizHawkContext) -> None:
     """Sends a PING request and receives a PONG response."""
     res = (await send_requests(ctx, [{"type": "PING"}]))[0]
@@ -250,7 +412,7 @@ async def guarded_read(ctx: BizHawkContext, read_list: Sequence[tuple[int, int,
 
     Returns None if any item in guard_list failed to validate. Otherwise returns a list of bytes in the order they
     were requested."""
-    res = await send_requests(ctx, [{
+    res = await _send_requests(ctx, [{
         "type": "GUARD",
         "address": address,
         "expected_data": base64.b64encode(bytes(expected_data)).decode("ascii"),
@@ -271,7 +433,7 @@ async def guarded_read(ctx: BizHawkContext, read_list: Sequence[tuple[int, int,
             if item["type"] != "READ_RESPONSE":
                 raise SyncError(f"Expected response of type READ_RESPONSE or GUARD_RESPONSE but got {item['type']}")
 
-            ret.append(base64.b64decode(item["value"]))
+            ret.append(item["data"])
 
     return ret
 
@@ -334,3 +496,42 @@ async def write(ctx: BizHawkContext, write_list: Sequence[tuple[int, Sequence[in
     - `value` is a list of bytes to write, in order, starting at `address`
     - `domain` is the name of the region of memory the address corresponds to"""
     await guarded_write(ctx, write_list, [])
+
+
+def _watch_request(memory_watch: MemoryWatch) -> dict[str, Any]:
+    return {
+        "type": "WATCH",
+        "watch": memory_watch.watch_id,
+        "address": memory_watch.address,
+        "size": memory_watch.size,
+        "domain": memory_watch.domain
+    }
+
+
+async def watch(ctx: BizHawkContext, address: int, size: int, domain: str) -> MemoryWatch:
+    """Asks the connector script to send the contents of a range of memory now and the changed bytes of it at the end
+    of every frame they change on, instead of reading the range on every cycle. Needs protocol 2.
+
+    The returned `MemoryWatch` keeps the latest contents in `data`. Watches stay registered across reconnects until
+    `unwatch` is called."""
+    if ctx.protocol_version < 2:
+        raise NotImplementedError("Memory watches need connector protocol 2")
+
+    memory_watch = MemoryWatch(max(ctx.watches, default=0) + 1, address, size, domain)
+    res = (await _send_requests(ctx, [_watch_request(memory_watch)]))[0]
+
+    if res["type"] != "WATCH_RESPONSE":
+        raise SyncError(f"Expected response of type WATCH_RESPONSE but got {res['type']}")
+
+    memory_watch.data[:] = res["data"]
+    ctx.watches[memory_watch.watch_id] = memory_watch
+    return memory_watch
+
+
+async def unwatch(ctx: BizHawkContext, memory_watch: MemoryWatch) -> None:
+    """Stops the updates of a watch created by `watch`."""
+    ctx.watches.pop(memory_watch.watch_id, None)
+    res = (await _send_requests(ctx, [{"type": "UNWATCH", "watch": memory_watch.watch_id}]))[0]
+
+    if res["type"] != "UNWATCH_RESPONSE":
+        raise SyncError(f"Expected response of type UNWATCH_RESPONSE but got {res['type']}")
@@ -15,11 +15,11 @@ import Patch
 import Utils
 
 from . import BizHawkContext, ConnectionStatus, NotConnectedError, RequestFailedError, connect, disconnect, get_hash, \
-    get_script_version, get_system, ping, display_message
+    get_script_version, get_system, display_message, upgrade_protocol
 from .client import BizHawkClient, AutoBizHawkClientRegister
 
 
-EXPECTED_SCRIPT_VERSION = 1
+SUPPORTED_SCRIPT_VERSIONS = (1, 2)
 
 
 class AuthStatus(enum.IntEnum):
@@ -138,6 +138,8 @@ class BizHawkClientContext(CommonContext):
         self.password_requested = False
         self.client_handler = None
         self.bizhawk_ctx = BizHawkContext()
+        # changes of watched memory are handled right away instead of at the next timeout
+        self.bizhawk_ctx.on_watch_update = self.watcher_event.set
         self.watcher_timeout = 0.5
 
     def _categorize_text(self, args: dict) -> TextCategory:
@@ -246,21 +248,24 @@ async def _game_watcher(ctx: BizHawkClientContext):
 
                 script_version = await get_script_version(ctx.bizhawk_ctx)
 
-                if script_version != EXPECTED_SCRIPT_VERSION:
-                    logger.info(f"Connector script is incompatible. Expected version {EXPECTED_SCRIPT_VERSION} but "
-                                f"got {script_version}. Disconnecting.")
+                if script_version not in SUPPORTED_SCRIPT_VERSIONS:
+                    logger.info(f"Connector script is incompatible. Expected one of versions "
+                                f"{', '.join(map(str, SUPPORTED_SCRIPT_VERSIONS))} but got {script_version}. "
+                                f"Disconnecting.")
                     disconnect(ctx.bizhawk_ctx)
                     continue
 
+                await upgrade_protocol(ctx.bizhawk_ctx, script_version)
+
             showed_connecting_message = False
 
-            await ping(ctx.bizhawk_ctx)
+            # also serves as the keepalive, any request resets the connector script's timeout
+            rom_hash = await get_hash(ctx.bizhawk_ctx)
 
             if not showed_connected_message:
                 showed_connected_message = True
                 logger.info("Connected to BizHawk")
 
-            rom_hash = await get_hash(ctx.bizhawk_ctx)
             if ctx.rom_hash is not None and ctx.rom_hash != rom_hash:
                 if ctx.server is not None and not ctx.server.socket.closed:
                     logger.info(f"ROM changed. Disconnecting from server.")
@@ -1,6 +1,6 @@
-from typing import Dict, List, Set, Any
+from typing import Any, Callable, Dict, List, Optional, Set
 from collections import Counter
-from BaseClasses import Region, Location, Item, Tutorial, ItemClassification
+from BaseClasses import CollectionState, Region, Location, Item, Tutorial, ItemClassification
 from Options import OptionError
 from worlds.AutoWorld import World, WebWorld
 from .Items import base_id, item_table, group_table, tears_list, reliquary_set
@@ -221,36 +221,47 @@ class BlasphemousWorld(World):
         multiworld = self.multiworld
         player = self.player
 
-        created_regions: List[str] = []
-
+        # regions created by transitions come after all the other regions
+        region_indexes: Dict[str, int] = {r["name"]: index for index, r in enumerate(regions)}
         for r in regions:
-            multiworld.regions.append(Region(r["name"], player, multiworld))
-            created_regions.append(r["name"])
-
-        self.get_region("Menu").add_exits({self.start_room: "New Game"})
+            for t in r["transitions"]:
+                region_indexes.setdefault(t, len(region_indexes))
 
         blas_logic = BlasRules(self)
 
-        for r in regions:
-            region = self.get_region(r["name"])
+        exit_names: List[str] = ["New Game"]
+        exit_regions: List[int] = [region_indexes["Menu"]]
+        exit_targets: List[int] = [region_indexes[self.start_room]]
+        exit_rules: List[Optional[Callable[[CollectionState], bool]]] = [None]
+        region_location_names: List[str] = []
+        region_location_ids: List[int] = []
+        location_regions: List[int] = []
 
+        for index, r in enumerate(regions):
             for e in r["exits"]:
-                region.add_exits({e["target"]}, {e["target"]: blas_logic.load_rule(True, r["name"], e)})
-
-            for l in [l for l in r["locations"] if l not in self.disabled_locations]:
-                region.add_locations({location_names[l]: self.location_name_to_id[location_names[l]]}, BlasphemousLocation)
+                exit_names.append(f"{r['name']} -> {e['target']}")
+                exit_regions.append(index)
+                exit_targets.append(region_indexes[e["target"]])
+                exit_rules.append(blas_logic.load_rule(True, r["name"], e))
 
             for t in r["transitions"]:
                 if t == r["name"]:
                     continue
-                
-                if t in created_regions:
-                    region.add_exits({t})
-                else:
-                    multiworld.regions.append(Region(t, player, multiworld))
-                    created_regions.append(t)
-                    region.add_exits({t})
 
+                exit_names.append(f"{r['name']} -> {t}")
+                exit_regions.append(index)
+                exit_targets.append(region_indexes[t])
+                exit_rules.append(None)
+
+            for l in r["locations"]:
+                if l not in self.disabled_locations:
+                    region_location_names.append(location_names[l])
+                    region_location_ids.append(self.location_name_to_id[location_names[l]])
+                    location_regions.append(index)
+
+        multiworld.regions.add_region_table(multiworld, player, list(region_indexes), region_location_names,
+                                            region_location_ids, location_regions, exit_regions, exit_targets,
+                                            exit_names, exit_rules, location_type=BlasphemousLocation)
 
         for l in [l for l in locations if l["name"] not in self.disabled_locations]:
             location = self.get_location(location_names[l["name"]])
@@ -2,6 +2,7 @@ import os
 import typing
 import settings
 import base64
+import dataclasses
 import logging
 
 from BaseClasses import Item, Region, Tutorial, ItemClassification
@@ -14,11 +15,11 @@ from .stages import get_locations_from_stage, get_normal_stage_exits, vanilla_st
 from .regions import get_region_info
 from .rules import CV64Rules
 from .data import iname, rname, ename
-from worlds.AutoWorld import WebWorld, World
+from worlds.AutoWorld import OutputSnapshot, WebWorld, World
 from .aesthetics import randomize_lighting, shuffle_sub_weapons, rom_empty_breakables_flags, rom_sub_weapon_flags, \
     randomize_music, get_start_inventory_data, get_location_data, randomize_shop_prices, get_loading_zone_bytes, \
-    get_countdown_numbers
-from .rom import RomData, write_patch, get_base_rom_path, CV64ProcedurePatch, CV64_US_10_HASH
+    get_countdown_numbers, get_item_text_color
+from .rom import RomData, write_patch, get_base_rom_path, CV64ProcedurePatch, CV64OutputData, CV64_US_10_HASH
 from .client import Castlevania64Client
 
 
@@ -64,6 +65,7 @@ class CV64World(World):
     options: CV64Options
     settings: typing.ClassVar[CV64Settings]
     topology_present = True
+    output_in_process = True
 
     item_name_to_id = get_item_names_to_ids()
     location_name_to_id = get_location_names_to_ids()
@@ -239,7 +241,8 @@ class CV64World(World):
                     not self.options.multi_hit_breakables:
                 self.multiworld.local_early_items[self.player][iname.left_tower_key] = 1
 
-    def generate_output(self, output_directory: str) -> None:
+    def get_output_snapshot(self) -> OutputSnapshot:
+        snapshot = super().get_output_snapshot()
         active_locations = self.multiworld.get_locations(self.player)
 
         # Location data and shop names, descriptions, and colors
@@ -271,14 +274,28 @@ class CV64World(World):
         offset_data.update(get_start_inventory_data(self.player, self.options,
                                                     self.multiworld.precollected_items[self.player]))
 
-        patch = CV64ProcedurePatch(player=self.player, player_name=self.multiworld.player_name[self.player])
-        write_patch(self, patch, offset_data, shop_name_list, shop_desc_list, shop_colors_list, active_locations)
+        # Item and player names for other game items
+        other_game_items = [(loc.address, loc.item.name, self.multiworld.get_player_name(loc.item.player),
+                             get_item_text_color(loc)) for loc in active_locations
+                            if loc.address is not None and get_location_info(loc.name, "type") != "shop"
+                            and loc.item.player != self.player]
+
+        return dataclasses.replace(snapshot, data=CV64OutputData(
+            offset_data, shop_name_list, shop_desc_list, shop_colors_list, self.active_warp_list, self.s1s_per_warp,
+            self.active_stage_exits, self.required_s2s, self.total_s2s, self.auth, other_game_items))
+
+    @classmethod
+    def generate_output_from_snapshot(cls, snapshot: OutputSnapshot, output_directory: str) -> None:
+        patch = CV64ProcedurePatch(player=snapshot.player, player_name=snapshot.player_name)
+        write_patch(snapshot, patch)
 
-        rom_path = os.path.join(output_directory, f"{self.multiworld.get_out_file_name_base(self.player)}"
-                                                  f"{patch.patch_file_ending}")
+        rom_path = os.path.join(output_directory, f"{snapshot.out_file_name_base}{patch.patch_file_ending}")
 
         patch.write(rom_path)
 
+    def generate_output(self, output_directory: str) -> None:
+        self.generate_output_from_snapshot(self.get_output_snapshot(), output_directory)
+
     def get_filler_item_name(self) -> str:
         return self.random.choice(filler_item_names)
 
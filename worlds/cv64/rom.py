@@ -1,9 +1,8 @@
 import json
 import Utils
 
-from BaseClasses import Location
 from worlds.Files import APProcedurePatch, APTokenMixin, APTokenTypes, APPatchExtension
-from typing import List, Dict, Union, Iterable, Collection, Optional, TYPE_CHECKING
+from typing import List, Dict, Union, Collection, NamedTuple, Optional, Tuple, TYPE_CHECKING
 
 import hashlib
 import os
@@ -13,14 +12,13 @@ from . import lzkn64
 from .data import patches
 from .stages import get_stage_info
 from .text import cv64_string_to_bytearray, cv64_text_truncate, cv64_text_wrap
-from .aesthetics import renon_item_dialogue, get_item_text_color
-from .locations import get_location_info
+from .aesthetics import renon_item_dialogue
 from .options import CharacterStages, VincentFightCondition, RenonFightCondition, PostBehemothBoss, RoomOfClocksBoss, \
     BadEndingCondition, CV64DeathLink, DraculasCondition, InvisibleItems, Countdown, PantherDash
 from settings import get_settings
 
 if TYPE_CHECKING:
-    from . import CV64World
+    from worlds.AutoWorld import OutputSnapshot
 
 CV64_US_10_HASH = "1cc5cf3b4d29d8c3ade957648b529dc1"
 
@@ -894,11 +892,31 @@ class CV64ProcedurePatch(APProcedurePatch, APTokenMixin):
         return get_base_rom_bytes()
 
 
-def write_patch(world: "CV64World", patch: CV64ProcedurePatch, offset_data: Dict[int, bytes], shop_name_list: List[str],
-                shop_desc_list: List[List[Union[int, str, None]]], shop_colors_list: List[bytearray],
-                active_locations: Iterable[Location]) -> None:
-    active_warp_list = world.active_warp_list
-    s1s_per_warp = world.s1s_per_warp
+class CV64OutputData(NamedTuple):
+    """The data of a CV64World that write_patch needs on top of the OutputSnapshot."""
+    offset_data: Dict[int, bytes]
+    shop_name_list: List[str]
+    shop_desc_list: List[List[Union[int, str, None]]]
+    shop_colors_list: List[bytearray]
+    active_warp_list: List[str]
+    s1s_per_warp: int
+    active_stage_exits: Dict[str, Dict]
+    required_s2s: int
+    total_s2s: int
+    auth: bytearray
+    other_game_items: List[Tuple[int, str, str, bytearray]]
+    """address, item name, player name and text color of the items for other players"""
+
+
+def write_patch(snapshot: "OutputSnapshot", patch: CV64ProcedurePatch) -> None:
+    output_data: CV64OutputData = snapshot.data
+    options = snapshot.options
+    offset_data = output_data.offset_data
+    shop_name_list = output_data.shop_name_list
+    shop_desc_list = output_data.shop_desc_list
+    shop_colors_list = output_data.shop_colors_list
+    active_warp_list = output_data.active_warp_list
+    s1s_per_warp = output_data.s1s_per_warp
 
     # Write all the new item/loading zone/shop/lighting/music/etc. values.
     for offset, data in offset_data.items():
@@ -929,12 +947,12 @@ def write_patch(world: "CV64World", patch: CV64ProcedurePatch, offset_data: Dict
                                  f"`{str(s1s_per_warp * 7).zfill(2)} {active_warp_list[7]}")))
 
     # Write the new File Select stage numbers.
-    for stage in world.active_stage_exits:
+    for stage in output_data.active_stage_exits:
         for offset in get_stage_info(stage, "save number offsets"):
-            patch.write_token(APTokenTypes.WRITE, offset, bytes([world.active_stage_exits[stage]["position"]]))
+            patch.write_token(APTokenTypes.WRITE, offset, bytes([output_data.active_stage_exits[stage]["position"]]))
 
     # Write all the shop text.
-    if world.options.shopsanity:
+    if options.shopsanity:
         patch.write_token(APTokenTypes.WRITE, 0x103868, bytes(cv64_string_to_bytearray("Not obtained. ")))
 
         shopsanity_name_text = bytearray(0)
@@ -952,70 +970,65 @@ def write_patch(world: "CV64World", patch: CV64ProcedurePatch, offset_data: Dict
         patch.write_token(APTokenTypes.WRITE, 0x1A800, bytes(shopsanity_desc_text))
 
     # Write the item/player names for other game items.
-    for loc in active_locations:
-        if loc.address is None or get_location_info(loc.name, "type") == "shop" or loc.item.player == world.player:
-            continue
+    for address, item_name, player_name, text_color in output_data.other_game_items:
         # If the Item's name is longer than 104 characters, truncate the name to inject at 104.
-        if len(loc.item.name) > 104:
-            item_name = loc.item.name[0:104]
-        else:
-            item_name = loc.item.name
-        # Get the item's player's name. If it's longer than 16 characters (which can happen if it's an ItemLinked item),
+        if len(item_name) > 104:
+            item_name = item_name[0:104]
+        # If the item's player's name is longer than 16 characters (which can happen if it's an ItemLinked item),
         # truncate it at 16.
-        player_name = world.multiworld.get_player_name(loc.item.player)
         if len(player_name) > 16:
             player_name = player_name[0:16]
 
-        inject_address = 0xBB7164 + (256 * (loc.address & 0xFFF))
+        inject_address = 0xBB7164 + (256 * (address & 0xFFF))
         wrapped_name, num_lines = cv64_text_wrap(item_name + "\nfor " + player_name, 96)
-        patch.write_token(APTokenTypes.WRITE, inject_address, bytes(get_item_text_color(loc) +
+        patch.write_token(APTokenTypes.WRITE, inject_address, bytes(text_color +
                                                                     cv64_string_to_bytearray(wrapped_name)))
         patch.write_token(APTokenTypes.WRITE, inject_address + 255, bytes([num_lines]))
 
     # Write the secondary name the client will use to distinguish a vanilla ROM from an AP one.
     patch.write_token(APTokenTypes.WRITE, 0xBFBFD0, "ARCHIPELAGO1".encode("utf-8"))
     # Write the slot authentication
-    patch.write_token(APTokenTypes.WRITE, 0xBFBFE0, bytes(world.auth))
+    patch.write_token(APTokenTypes.WRITE, 0xBFBFE0, bytes(output_data.auth))
 
     patch.write_file("token_data.bin", patch.get_token_binary())
 
     # Write these slot options to a JSON.
     options_dict = {
-        "character_stages": world.options.character_stages.value,
-        "vincent_fight_condition": world.options.vincent_fight_condition.value,
-        "renon_fight_condition": world.options.renon_fight_condition.value,
-        "bad_ending_condition": world.options.bad_ending_condition.value,
-        "increase_item_limit": world.options.increase_item_limit.value,
-        "nerf_healing_items": world.options.nerf_healing_items.value,
-        "loading_zone_heals": world.options.loading_zone_heals.value,
-        "disable_time_restrictions": world.options.disable_time_restrictions.value,
-        "death_link": world.options.death_link.value,
-        "draculas_condition": world.options.draculas_condition.value,
-        "invisible_items": world.options.invisible_items.value,
-        "post_behemoth_boss": world.options.post_behemoth_boss.value,
-        "room_of_clocks_boss": world.options.room_of_clocks_boss.value,
-        "skip_gondolas": world.options.skip_gondolas.value,
-        "skip_waterway_blocks": world.options.skip_waterway_blocks.value,
-        "s1s_per_warp": world.options.special1s_per_warp.value,
-        "required_s2s": world.required_s2s,
-        "total_s2s": world.total_s2s,
-        "total_special1s": world.options.total_special1s.value,
-        "increase_shimmy_speed": world.options.increase_shimmy_speed.value,
-        "fall_guard": world.options.fall_guard.value,
-        "cinematic_experience": world.options.cinematic_experience.value,
-        "permanent_powerups": world.options.permanent_powerups.value,
-        "background_music": world.options.background_music.value,
-        "multi_hit_breakables": world.options.multi_hit_breakables.value,
-        "drop_previous_sub_weapon": world.options.drop_previous_sub_weapon.value,
-        "countdown": world.options.countdown.value,
-        "lizard_locker_items": world.options.lizard_locker_items.value,
-        "shopsanity": world.options.shopsanity.value,
-        "panther_dash": world.options.panther_dash.value,
-        "big_toss": world.options.big_toss.value,
-        "window_color_r": world.options.window_color_r.value,
-        "window_color_g": world.options.window_color_g.value,
-        "window_color_b": world.options.window_color_b.value,
-        "window_color_a": world.options.window_color_a.value,
+        "character_stages": options.character_stages.value,
+        "vincent_fight_condition": options.vincent_fight_condition.value,
+        "renon_fight_condition": options.renon_fight_condition.value,
+        "bad_ending_condition": options.bad_ending_condition.value,
+        "increase_item_limit": options.increase_item_limit.value,
+        "nerf_healing_items": options.nerf_healing_items.value,
+        "loading_zone_heals": options.loading_zone_heals.value,
+        "disable_time_restrictions": options.disable_time_restrictions.value,
+        "death_link": options.death_link.value,
+        "draculas_condition": options.draculas_condition.value,
+        "invisible_items": options.invisible_items.value,
+        "post_behemoth_boss": options.post_behemoth_boss.value,
+        "room_of_clocks_boss": options.room_of_clocks_boss.value,
+        "skip_gondolas": options.skip_gondolas.value,
+        "skip_waterway_blocks": options.skip_waterway_blocks.value,
+        "s1s_per_warp": options.special1s_per_warp.value,
+        "required_s2s": output_data.required_s2s,
+        "total_s2s": output_data.total_s2s,
+        "total_special1s": options.total_special1s.value,
+        "increase_shimmy_speed": options.increase_shimmy_speed.value,
+        "fall_guard": options.fall_guard.value,
+        "cinematic_experience": options.cinematic_experience.value,
+        "permanent_powerups": options.permanent_powerups.value,
+        "background_music": options.background_music.value,
+        "multi_hit_breakables": options.multi_hit_breakables.value,
+        "drop_previous_sub_weapon": options.drop_previous_sub_weapon.value,
+        "countdown": options.countdown.value,
+        "lizard_locker_items": options.lizard_locker_items.value,
+        "shopsanity": options.shopsanity.value,
+        "panther_dash": options.panther_dash.value,
+        "big_toss": options.big_toss.value,
+        "window_color_r": options.window_color_r.value,
+        "window_color_g": options.window_color_g.value,
+        "window_color_b": options.window_color_b.value,
+        "window_color_a": options.window_color_a.value,
     }
 
     patch.write_file("options.json", json.dumps(options_dict).encode('utf-8'))
@@ -2,7 +2,7 @@ import functools
 import logging
 from typing import Any, Dict, List
 
-from BaseClasses import Entrance, CollectionState, Item, Location, MultiWorld, Region, Tutorial
+from BaseClasses import CollectionState, Item, Location, MultiWorld, Tutorial
 from worlds.AutoWorld import WebWorld, World
 from . import Items, Locations, Maps, Regions, Rules
 from .Options import DOOM2Options
@@ -107,49 +107,45 @@ class DOOM2World(World):
     def create_regions(self):
         pro = self.options.pro.value
 
-        # Main regions
-        menu_region = Region("Menu", self.player, self.multiworld)
-        hub_region = Region("Hub", self.player, self.multiworld)
-        self.multiworld.regions += [menu_region, hub_region]
-        menu_region.add_exits(["Hub"])
-
-        # Create regions and locations
-        main_regions = []
+        # Main regions, then the regions of the included episodes
+        region_names = ["Menu", "Hub"]
+        exit_regions = [0]
+        exit_targets = [1]
         connections = []
         for region_dict in Regions.regions:
             if not self.included_episodes[region_dict["episode"] - 1]:
                 continue
 
-            region_name = region_dict["name"]
+            # Connect main regions to Hub
             if region_dict["connects_to_hub"]:
-                main_regions.append(region_name)
-
-            region = Region(region_name, self.player, self.multiworld)
-            region.add_locations({
-                loc["name"]: loc_id
-                for loc_id, loc in Locations.location_table.items()
-                if loc["region"] == region_name and self.included_episodes[loc["episode"] - 1]
-            }, DOOM2Location)
-
-            self.multiworld.regions.append(region)
+                exit_regions.append(1)
+                exit_targets.append(len(region_names))
 
             for connection_dict in region_dict["connections"]:
                 # Check if it's a pro-only connection
                 if connection_dict["pro"] and not pro:
                     continue
-                connections.append((region, connection_dict["target"]))
-        
-        # Connect main regions to Hub
-        hub_region.add_exits(main_regions)
+                connections.append((len(region_names), connection_dict["target"]))
+            region_names.append(region_dict["name"])
+        region_indexes = {region_name: index for index, region_name in enumerate(region_names)}
 
         # Do the other connections between regions (They are not all both ways)
-        for connection in connections:
-            source = connection[0]
-            target = self.multiworld.get_region(connection[1], self.player)
-
-            entrance = Entrance(self.player, f"{source.name} -> {target.name}", source)
-            source.exits.append(entrance)
-            entrance.connect(target)
+        for source, target in connections:
+            exit_regions.append(source)
+            exit_targets.append(region_indexes[target])
+
+        # Locations, grouped by region
+        locations = [(region_indexes[loc["region"]], loc["name"], loc_id)
+                     for loc_id, loc in Locations.location_table.items()
+                     if loc["region"] in region_indexes and self.included_episodes[loc["episode"] - 1]]
+        locations.sort(key=lambda location: location[0])
+
+        self.multiworld.regions.add_region_table(
+            self.multiworld, self.player, region_names,
+            location_names=[name for _, name, _ in locations],
+            location_ids=[loc_id for _, _, loc_id in locations],
+            location_regions=[region_index for region_index, _, _ in locations],
+            exit_regions=exit_regions, exit_targets=exit_targets, location_type=DOOM2Location)
 
         # Sum locations for items creation
         self.location_count = len(self.multiworld.get_locations(self.player))
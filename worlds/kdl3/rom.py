@@ -379,7 +379,7 @@ class KDL3ProcedurePatch(APProcedurePatch, APTokenMixin):
 
 def patch_rom(world: "KDL3World", patch: KDL3ProcedurePatch) -> None:
     patch.write_file("kdl3_basepatch.bsdiff4",
-                     get_data(__name__, "data/kdl3_basepatch.bsdiff4"))
+                     get_data(__name__, "data/kdl3_basepatch.bsdiff4"), shared=True)
 
     # Write open world patch
     if world.options.open_world:
@@ -27,7 +27,7 @@ def generate_output(self, output_directory: str):
 
     patch = SuperMarioLand2ProcedurePatch(player=self.player, player_name=self.player_name)
 
-    patch.write_file("basepatch.bsdiff4", pkgutil.get_data(__name__, "basepatch.bsdiff4"))
+    patch.write_file("basepatch.bsdiff4", pkgutil.get_data(__name__, "basepatch.bsdiff4"), shared=True)
     random = self.random
 
     if self.options.marios_castle_midway_bell:
@@ -30,8 +30,21 @@ kwarg_defaults = {
 
 allowed_globals = {'TimeOfDay': TimeOfDay}
 
+# Compiled rules are shared by all players, and all multiworlds generated in this process.
+# The rule lambdas take the player as keyword argument, so the compiled code doesn't depend on it.
+# ast dump of a rule body -> compiled lambda expression
+compiled_rules = {}
+# rule string -> list of (settings and current spot attributes read while parsing it, ast dump, events)
+parsed_rules = defaultdict(list)
+# Both caches are cleared when a player's parser is created and they hold more entries than this,
+# so a process generating many seeds with different settings doesn't keep growing them.
+rule_cache_limit = 8192
+current_spot_region = ('current spot', 'region')
+current_spot_type = ('current spot', 'type')
+
 rule_aliases = {}
 nonaliases = set()
+missing_setting = object()
 
 def load_aliases():
     j = read_json(data_path('LogicHelpers.json'))
@@ -63,8 +76,16 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         # lazy load aliases
         if not rule_aliases:
             load_aliases()
+        # parsed rules refer to compiled rules, so they are always cleared together
+        if len(compiled_rules) + sum(map(len, parsed_rules.values())) > rule_cache_limit:
+            compiled_rules.clear()
+            parsed_rules.clear()
         # final rule cache
         self.rule_cache = {}
+        # settings and current spot attributes the rule being parsed depends on, and the events it added
+        self.reads = {}
+        self.new_events = set()
+        self.cacheable = False
         self.kwarg_defaults = kwarg_defaults.copy()  # otherwise this gets contaminated between players
         self.kwarg_defaults['player'] = self.player
 
@@ -84,23 +105,23 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has',
                     ctx=ast.Load()),
-                args=[ast.Str(escaped_items[node.id]), ast.Constant(self.player)],
+                args=[ast.Str(escaped_items[node.id]), ast.Name(id='player', ctx=ast.Load())],
                 keywords=[])
-        elif node.id in self.world.__dict__:
+        elif self.has_setting(node.id):
             # Settings are constant
-            return ast.parse('%r' % self.world.__dict__[node.id], mode='eval').body
+            return ast.parse('%r' % self.get_setting(node.id), mode='eval').body
         elif node.id in State.__dict__:
             return self.make_call(node, node.id, [], [])
         elif node.id in self.kwarg_defaults or node.id in allowed_globals:
             return node
         elif event_name.match(node.id):
-            self.events.add(node.id.replace('_', ' '))
+            self.add_event(node.id.replace('_', ' '))
             return ast.Call(
                 func=ast.Attribute(
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has',
                     ctx=ast.Load()),
-                args=[ast.Str(node.id.replace('_', ' ')), ast.Constant(self.player)],
+                args=[ast.Str(node.id.replace('_', ' ')), ast.Name(id='player', ctx=ast.Load())],
                 keywords=[])
         else:
             raise Exception('Parse Error: invalid node name %s' % node.id, self.current_spot.name, ast.dump(node, False))
@@ -111,7 +132,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(node.s), ast.Constant(self.player)],
+            args=[ast.Str(node.s), ast.Name(id='player', ctx=ast.Load())],
             keywords=[])
 
     # python 3.8 compatibility: ast walking now uses visit_Constant for Constant subclasses
@@ -137,20 +158,20 @@ class Rule_AST_Transformer(ast.NodeTransformer):
 
         if isinstance(count, ast.Name):
             # Must be a settings constant
-            count = ast.parse('%r' % self.world.__dict__[count.id], mode='eval').body
+            count = ast.parse('%r' % self.get_setting(count.id), mode='eval').body
 
         if iname in escaped_items:
             iname = escaped_items[iname]
 
         if iname not in item_table:
-            self.events.add(iname)
+            self.add_event(iname)
 
         return ast.Call(
             func=ast.Attribute(
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(iname), ast.Constant(self.player), count],
+            args=[ast.Str(iname), ast.Name(id='player', ctx=ast.Load()), count],
             keywords=[])
 
 
@@ -182,7 +203,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         new_args = []
         for child in node.args:
             if isinstance(child, ast.Name):
-                if child.id in self.world.__dict__:
+                if self.has_setting(child.id):
                     # child = ast.Attribute(
                     #     value=ast.Attribute(
                     #         value=ast.Name(id='state', ctx=ast.Load()),
@@ -190,7 +211,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     #         ctx=ast.Load()),
                     #     attr=child.id,
                     #     ctx=ast.Load())
-                    child = ast.Constant(getattr(self.world, child.id))
+                    child = ast.Constant(self.get_setting(child.id))
                 elif child.id in rule_aliases:
                     child = self.visit(child)
                 elif child.id in escaped_items:
@@ -221,7 +242,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                                 ctx=ast.Load()),
                             attr='worlds',
                             ctx=ast.Load()),
-                        slice=ast.Index(value=ast.Constant(self.player)),
+                        slice=ast.Index(value=ast.Name(id='player', ctx=ast.Load())),
                         ctx=ast.Load()),
                     attr=node.value.id,
                     ctx=ast.Load()),
@@ -242,7 +263,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         # Fast check for json can_use
         if (len(node.ops) == 1 and isinstance(node.ops[0], ast.Eq)
                 and isinstance(node.left, ast.Name) and isinstance(node.comparators[0], ast.Name)
-                and node.left.id not in self.world.__dict__ and node.comparators[0].id not in self.world.__dict__):
+                and not self.has_setting(node.left.id) and not self.has_setting(node.comparators[0].id)):
             return ast.NameConstant(node.left.id == node.comparators[0].id)
 
         node.left = escape_or_string(node.left)
@@ -325,7 +346,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has_any' if early_return else 'has_all',
                     ctx=ast.Load()),
-                args=[ast.Tuple(elts=[ast.Str(i) for i in items], ctx=ast.Load()), ast.Constant(self.player)],
+                args=[ast.Tuple(elts=[ast.Str(i) for i in items], ctx=ast.Load()), ast.Name(id='player', ctx=ast.Load())],
                 keywords=[])] + new_values
         else:
             node.values = new_values
@@ -341,8 +362,8 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         if not hasattr(State, name):
             raise Exception('Parse Error: No such function State.%s' % name, self.current_spot.name, ast.dump(node, False))
 
-        for (k, v) in self.kwarg_defaults.items():
-            keywords.append(ast.keyword(arg=f'{k}', value=ast.Constant(v)))
+        for k in self.kwarg_defaults.keys():
+            keywords.append(ast.keyword(arg=f'{k}', value=ast.Name(id=k, ctx=ast.Load())))
 
         return ast.Call(
             func=ast.Attribute(
@@ -354,6 +375,8 @@ class Rule_AST_Transformer(ast.NodeTransformer):
 
 
     def replace_subrule(self, target, node):
+        # subrules are named and created per player
+        self.cacheable = False
         rule = ast.dump(node, False)
         if rule in self.replaced_rules[target]:
             return self.replaced_rules[target][rule]
@@ -367,7 +390,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(subrule_name), ast.Constant(self.player)],
+            args=[ast.Str(subrule_name), ast.Name(id='player', ctx=ast.Load())],
             keywords=[])
         # Cache the subrule for any others in this region
         # (and reserve the item name in the process)
@@ -402,12 +425,12 @@ class Rule_AST_Transformer(ast.NodeTransformer):
 
     def make_access_rule(self, body):
         rule_str = ast.dump(body, False)
-        if rule_str not in self.rule_cache:
+        if rule_str not in compiled_rules:
             # requires consistent iteration on dicts
             kwargs = [ast.arg(arg=k) for k in self.kwarg_defaults.keys()]
-            kwd = list(map(ast.Constant, self.kwarg_defaults.values()))
+            kwd = [ast.Constant(None) for _ in self.kwarg_defaults]
             try:
-                self.rule_cache[rule_str] = eval(compile(
+                compiled_rules[rule_str] = compile(
                     ast.fix_missing_locations(
                         ast.Expression(ast.Lambda(
                             args=ast.arguments(
@@ -417,14 +440,53 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                                 kwonlyargs=kwargs,
                                 kw_defaults=kwd),
                             body=body))),
-                    '<string>', 'eval'),
-                    # globals/locals. if undefined, everything in the namespace *now* would be allowed
-                    allowed_globals)
+                    '<string>', 'eval')
             except TypeError as e:
                 raise Exception('Parse Error: %s' % e, self.current_spot.name, ast.dump(body, False))
+        return self.get_compiled_rule(rule_str)
+
+
+    # Returns this player's lambda for a compiled rule, with the keyword arguments defaulting to this player's.
+    def get_compiled_rule(self, rule_str):
+        if rule_str not in self.rule_cache:
+            # globals/locals. if undefined, everything in the namespace *now* would be allowed
+            rule = eval(compiled_rules[rule_str], allowed_globals)
+            rule.__kwdefaults__ = self.kwarg_defaults.copy()
+            self.rule_cache[rule_str] = rule
         return self.rule_cache[rule_str]
 
 
+    ## Dependencies of parsed rules, recorded so the rules can be shared with other players that match them.
+
+    def has_setting(self, name):
+        return self.get_setting(name) is not missing_setting
+
+    def get_setting(self, name):
+        value = self.world.__dict__.get(name, missing_setting)
+        self.reads[name] = repr(value)
+        return value
+
+    def get_current_region(self):
+        r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
+        self.reads[current_spot_region] = repr(r.name)
+        return r
+
+    def get_current_spot_type(self):
+        self.reads[current_spot_type] = repr(self.current_spot.type)
+        return self.current_spot.type
+
+    def read(self, key):
+        if key == current_spot_region:
+            return self.get_current_region().name
+        if key == current_spot_type:
+            return self.get_current_spot_type()
+        return self.get_setting(key)
+
+    def add_event(self, event):
+        self.events.add(event)
+        self.new_events.add(event)
+
+
     ## Handlers for specific internal functions used in the json logic.
 
     # at(region_name, rule)
@@ -448,38 +510,52 @@ class Rule_AST_Transformer(ast.NodeTransformer):
     ## Handlers for compile-time optimizations (former State functions)
 
     def at_day(self, node):
-        if self.world.ensure_tod_access:
+        if self.get_setting('ensure_tod_access'):
             # tod has DAY or (tod == NONE and (ss or find a path from a provider))
             # parsing is better than constructing this expression by hand
-            r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
+            r = self.get_current_region()
             return ast.parse(f"(state.has('Ocarina', player) and state.has('Suns Song', player)) or state._oot_reach_at_time('{r.name}', TimeOfDay.DAY, [], player)", mode='eval').body
         return ast.NameConstant(True)
 
     def at_dampe_time(self, node):
-        if self.world.ensure_tod_access:
+        if self.get_setting('ensure_tod_access'):
             # tod has DAMPE or (tod == NONE and (find a path from a provider))
             # parsing is better than constructing this expression by hand
-            r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
+            r = self.get_current_region()
             return ast.parse(f"state._oot_reach_at_time('{r.name}', TimeOfDay.DAMPE, [], player)", mode='eval').body
         return ast.NameConstant(True)
 
     def at_night(self, node):
-        if self.current_spot.type == 'GS Token' and self.world.logic_no_night_tokens_without_suns_song:
+        if self.get_current_spot_type() == 'GS Token' and self.get_setting('logic_no_night_tokens_without_suns_song'):
             # Using visit here to resolve 'can_play' rule
             return self.visit(ast.parse('can_play(Suns_Song)', mode='eval').body)
-        if self.world.ensure_tod_access:
+        if self.get_setting('ensure_tod_access'):
             # tod has DAMPE or (tod == NONE and (ss or find a path from a provider))
             # parsing is better than constructing this expression by hand
-            r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
+            r = self.get_current_region()
             return ast.parse(f"(state.has('Ocarina', player) and state.has('Suns Song', player)) or state._oot_reach_at_time('{r.name}', TimeOfDay.DAMPE, [], player)", mode='eval').body
         return ast.NameConstant(True)
 
 
     # Parse entry point
     # If spot is None, here() rules won't work.
+    # Rules parsed before, by any player, are reused if the settings and current spot attributes they read match.
     def parse_rule(self, rule_string, spot=None):
         self.current_spot = spot
-        return self.make_access_rule(self.visit(ast.parse(rule_string, mode='eval').body))
+        for reads, rule_str, events in parsed_rules[rule_string]:
+            if all(repr(self.read(key)) == value for key, value in reads.items()):
+                self.events.update(events)
+                return self.get_compiled_rule(rule_str)
+
+        self.reads = {}
+        self.new_events = set()
+        self.cacheable = True
+        body = self.visit(ast.parse(rule_string, mode='eval').body)
+        access_rule = self.make_access_rule(body)
+        if self.cacheable:
+            parsed_rules[rule_string].append((self.reads, ast.dump(body, False), frozenset(self.new_events)))
+        self.reads = {}
+        return access_rule
 
     def parse_spot_rule(self, spot):
         rule = spot.rule_string.split('#', 1)[0].strip()
@@ -493,21 +569,21 @@ class Rule_AST_Transformer(ast.NodeTransformer):
 
     # Hijacking functions
     def current_spot_child_access(self, node): 
-        r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'child', {self.player})", mode='eval').body
+        r = self.get_current_region()
+        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'child', player)", mode='eval').body
 
     def current_spot_adult_access(self, node): 
-        r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'adult', {self.player})", mode='eval').body
+        r = self.get_current_region()
+        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'adult', player)", mode='eval').body
 
     def current_spot_starting_age_access(self, node): 
-        return self.current_spot_child_access(node) if self.world.starting_age == 'child' else self.current_spot_adult_access(node)
+        return self.current_spot_child_access(node) if self.get_setting('starting_age') == 'child' else self.current_spot_adult_access(node)
 
     def has_bottle(self, node): 
-        return ast.parse(f"state._oot_has_bottle({self.player})", mode='eval').body
+        return ast.parse(f"state._oot_has_bottle(player)", mode='eval').body
 
     def can_live_dmg(self, node):
-        return ast.parse(f"state._oot_can_live_dmg({self.player}, {node.args[0].value})", mode='eval').body
+        return ast.parse(f"state._oot_can_live_dmg(player, {node.args[0].value})", mode='eval').body
 
     def region_has_shortcuts(self, node):
-        return ast.parse(f"state._oot_region_has_shortcuts({self.player}, '{node.args[0].value}')", mode='eval').body
+        return ast.parse(f"state._oot_region_has_shortcuts(player, '{node.args[0].value}')", mode='eval').body
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+
+from test.general import setup_multiworld
+from worlds.AutoWorld import call_all
+from .. import OOTWorld, RuleParser
+from ..RuleParser import compiled_rules, parsed_rules
+
+
+class TestRuleParser(unittest.TestCase):
+    steps = ("generate_early", "create_regions", "create_items", "set_rules")
+
+    def setup_multiworld(self):
+        multiworld = setup_multiworld([OOTWorld, OOTWorld, OOTWorld], (), seed=0)
+        multiworld.worlds[3].options.open_forest.value = 2
+        return multiworld
+
+    def generate(self, multiworld):
+        for step in self.steps:
+            call_all(multiworld, step)
+
+    def get_cache_size(self):
+        return len(compiled_rules), sum(map(len, parsed_rules.values()))
+
+    def get_rules(self, multiworld, player):
+        spots = [*multiworld.get_locations(player), *multiworld.get_entrances(player)]
+        return {spot.name: spot.access_rule for spot in spots if getattr(spot.access_rule, "__kwdefaults__", None)}
+
+    def test_shared_between_players(self) -> None:
+        """Tests that players with the same settings get the same compiled rules, with their own player."""
+        multiworld = self.setup_multiworld()
+        for step in self.steps:
+            call_all(multiworld, step)
+        rules_1, rules_2 = self.get_rules(multiworld, 1), self.get_rules(multiworld, 2)
+        shared = [name for name in rules_1 if rules_1[name].__code__ is rules_2[name].__code__]
+        self.assertGreater(len(shared), len(rules_1) // 2)
+        for name in shared:
+            self.assertEqual(1, rules_1[name].__kwdefaults__["player"])
+            self.assertEqual(2, rules_2[name].__kwdefaults__["player"])
+
+    def test_same_as_uncached(self) -> None:
+        """Tests that each player gets the rules it would have gotten from parsing them without the cache."""
+        cached = self.setup_multiworld()
+        for step in self.steps:
+            call_all(cached, step)
+
+        uncached = self.setup_multiworld()
+        for step in self.steps:
+            if step == "create_regions":
+                for world in uncached.worlds.values():
+                    compiled_rules.clear()
+                    parsed_rules.clear()
+                    world.create_regions()
+            else:
+                call_all(uncached, step)
+
+        for player in cached.player_ids:
+            cached_rules, uncached_rules = self.get_rules(cached, player), self.get_rules(uncached, player)
+            self.assertEqual(uncached_rules.keys(), cached_rules.keys())
+            for name, rule in cached_rules.items():
+                with self.subTest(player=player, spot=name):
+                    self.assertEqual(uncached_rules[name].__code__, rule.__code__)
+                    self.assertEqual(uncached_rules[name].__kwdefaults__, rule.__kwdefaults__)
+
+    def test_bounded(self) -> None:
+        """Tests that the caches only hold the rules of the current multiworld once they went over the limit."""
+        compiled_rules.clear()
+        parsed_rules.clear()
+        self.generate(self.setup_multiworld())
+        size = self.get_cache_size()
+
+        other = setup_multiworld([OOTWorld], (), seed=0)
+        other.worlds[1].options.zora_fountain.value = 0
+        self.generate(other)
+        self.assertGreater(self.get_cache_size(), size)
+
+        with mock.patch.object(RuleParser, "rule_cache_limit", size[0] + size[1]):
+            self.generate(self.setup_multiworld())
+        self.assertEqual(size, self.get_cache_size())
@@ -12,6 +12,7 @@ import pkgutil
 import pkg_resources
 
 from BaseClasses import ItemClassification
+from Utils import load_cached_world_data
 
 
 BASE_OFFSET = 3860000
@@ -1471,8 +1472,24 @@ def _init() -> None:
         ))
 
 
-data = PokemonEmeraldData()
-_init()
+def _get_sources() -> List[bytes]:
+    """Returns everything _init depends on, for the world data cache."""
+    sources = [pkgutil.get_data(__name__, path) for path in
+               ["data.py", "data/extracted_data.json", "data/locations.json", "data/items.json"]]
+    for file in sorted(pkg_resources.resource_listdir(__name__, "data/regions")):
+        if not pkg_resources.resource_isdir(__name__, "data/regions/" + file):
+            sources.append(file.encode("utf-8") + pkgutil.get_data(__name__, "data/regions/" + file))
+    return sources
+
+
+def _build() -> PokemonEmeraldData:
+    global data
+    data = PokemonEmeraldData()
+    _init()
+    return data
+
+
+data = load_cached_world_data("pokemon_emerald", _get_sources(), _build, [__name__, "BaseClasses"])
 
 LEGENDARY_POKEMON = frozenset([data.constants[species] for species in [
     "SPECIES_ARTICUNO",
@@ -284,7 +284,8 @@ def generate_output(world: "PokemonRedBlueWorld", output_directory: str):
 
     patch_type = PokemonBlueProcedurePatch if game_version == "blue" else PokemonRedProcedurePatch
     patch = patch_type(player=world.player, player_name=world.player_name)
-    patch.write_file("base_patch.bsdiff4", pkgutil.get_data(__name__, f"basepatch_{game_version}.bsdiff4"))
+    patch.write_file("base_patch.bsdiff4", pkgutil.get_data(__name__, f"basepatch_{game_version}.bsdiff4"),
+                     shared=True)
 
     def write_bytes(address: int, data: typing.Sequence[int] | int):
         if isinstance(data, int):
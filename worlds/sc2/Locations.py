@@ -6,7 +6,7 @@ from .Options import get_option_value, kerrigan_unit_available, RequiredTactics,
     EnableHotsMissions
 from .Rules import SC2Logic
 
-from BaseClasses import Location
+from BaseClasses import Location, always_accessible
 from worlds.AutoWorld import World
 
 SC2WOL_LOC_ID_OFFSET = 1000
@@ -32,7 +32,7 @@ class LocationData(NamedTuple):
     name: str
     code: Optional[int]
     type: LocationType
-    rule: Optional[Callable[[Any], bool]] = Location.access_rule
+    rule: Optional[Callable[[Any], bool]] = always_accessible
 
 
 def get_location_types(world: World, inclusion_type: LocationInclusion) -> Set[LocationType]:
@@ -1623,7 +1623,7 @@ def get_locations(world: Optional[World]) -> Tuple[LocationData, ...]:
     for i, location_data in enumerate(location_table):
         # Removing all item-based logic on No Logic
         if logic_level == RequiredTactics.option_no_logic:
-            location_data = location_data._replace(rule=Location.access_rule)
+            location_data = location_data._replace(rule=always_accessible)
             location_table[i] = location_data
         # Generating Beat event locations
         if location_data.name.endswith((": Victory", ": Defeat")):
@@ -3,7 +3,7 @@ from dataclasses import fields
 
 from typing import List, Set, Iterable, Sequence, Dict, Callable, Union
 from math import floor, ceil
-from BaseClasses import Item, MultiWorld, Location, Tutorial, ItemClassification
+from BaseClasses import Item, MultiWorld, Location, Tutorial, ItemClassification, always_accessible
 from worlds.AutoWorld import WebWorld, World
 from . import ItemNames
 from .Items import StarcraftItem, filler_items, get_item_table, get_full_item_list, \
@@ -222,7 +222,7 @@ def assign_starter_items(world: World, excluded_items: Set[str], locked_location
     if starter_unit == StarterUnit.option_off:
         starter_mission_locations = [location.name for location in location_cache
                                      if location.parent_region.name == first_mission
-                                     and location.access_rule == Location.access_rule]
+                                     and location.access_rule == always_accessible]
         if not starter_mission_locations:
             # Force early unit if first mission is impossible without one
             starter_unit = StarterUnit.option_any_starter_unit
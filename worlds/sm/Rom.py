@@ -5,7 +5,7 @@ import settings
 import json
 import Utils
 from Utils import read_snes_rom
-from worlds.Files import APPatchExtension, APProcedurePatch, APTokenMixin, APTokenTypes
+from worlds.Files import APPatchExtension, APProcedurePatch, APTokenMixin, APTokenTypes, in_place
 from .variaRandomizer.utils.utils import openFile
 
 SMJUHASH = '21f3e98df4780ee1c667b84e57d88675'
@@ -16,7 +16,8 @@ class SMPatchExtensions(APPatchExtension):
     game = "Super Metroid"
 
     @staticmethod
-    def write_crc(caller: APProcedurePatch, rom: bytes) -> bytes:
+    @in_place
+    def write_crc(caller: APProcedurePatch, rom: bytearray) -> bytearray:
         def checksum_mirror_sum(start, length, mask = 0x800000):
             while not(length & mask) and mask:
                 mask >>= 1
@@ -37,11 +38,11 @@ class SMPatchExtensions(APPatchExtension):
         def write_bytes(buffer, startaddress: int, values):
             buffer[startaddress:startaddress + len(values)] = values
 
-        buffer = bytearray(rom)
-        crc = checksum_mirror_sum(buffer, len(buffer))
+        with memoryview(rom) as view:
+            crc = checksum_mirror_sum(view, len(rom))
         inv = crc ^ 0xFFFF
-        write_bytes(buffer, 0x7FDC, [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF])
-        return bytes(buffer)
+        write_bytes(rom, 0x7FDC, [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF])
+        return rom
 
 class SMProcedurePatch(APProcedurePatch, APTokenMixin):
     hash = SMJUHASH
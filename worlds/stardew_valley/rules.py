@@ -21,7 +21,7 @@ from .logic.tool_logic import tool_upgrade_prices
 from .mods.mod_data import ModNames
 from .options import ExcludeGingerIsland, SpecialOrderLocations, Museumsanity, BackpackProgression, Shipsanity, \
     Monstersanity, Chefsanity, Craftsanity, ArcadeMachineLocations, Cooksanity, StardewValleyOptions, Walnutsanity
-from .stardew_rule import And, StardewRule, true_
+from .stardew_rule import And, StardewRule, true_, memoize_shared_rules
 from .stardew_rule.indirect_connection import look_for_indirect_connection
 from .stardew_rule.rule_explain import explain
 from .strings.ap_names.ap_option_names import WalnutsanityOptionName
@@ -96,6 +96,9 @@ def set_rules(world):
     set_magic_spell_rules(logic, multiworld, player, world_options)
     set_sve_rules(logic, multiworld, player, world_options)
 
+    memoize_shared_rules(spot.access_rule for spot in
+                         itertools.chain(multiworld.get_locations(player), multiworld.get_entrances(player)))
+
 
 def set_isolated_locations_rules(logic: StardewLogic, multiworld, player):
     set_rule(multiworld.get_location("Old Master Cannoli", player),
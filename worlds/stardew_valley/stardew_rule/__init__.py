@@ -1,4 +1,5 @@
 from .base import *
 from .literal import *
+from .memo import *
 from .protocol import *
 from .state import *
@@ -10,9 +10,21 @@ from typing import Iterable, Dict, List, Union, Sized, Hashable, Callable, Tuple
 
 from BaseClasses import CollectionState
 from .literal import true_, false_, LiteralStardewRule
+from .memo import get_rule_memo
 from .protocol import StardewRule
 
 MISSING_ITEM = "THIS ITEM IS MISSING"
+# Looking a rule up in the memo costs about as much as evaluating a small rule, so only the rules used by many others
+# are worth memoizing.
+MEMOIZED_RULE_MIN_USES = 8
+
+
+def find_player(rules: Iterable[StardewRule]) -> Optional[int]:
+    for rule in rules:
+        player = getattr(rule, "player", None)
+        if player is not None:
+            return player
+    return None
 
 
 class BaseStardewRule(StardewRule, ABC):
@@ -205,6 +217,28 @@ class AggregatingStardewRule(BaseStardewRule, ABC):
         self._last_short_circuiting_rule = rule
         return self, self.complement.value
 
+    @cached_property
+    def player(self) -> Optional[int]:
+        return find_player(self.original_rules)
+
+    def memoize(self):
+        self.evaluate_while_simplifying = self.evaluate_while_simplifying_memoized
+
+    def evaluate_while_simplifying_memoized(self, state: CollectionState) -> Tuple[StardewRule, bool]:
+        memo = get_rule_memo(state, self.player)
+        if memo is None:
+            return AggregatingStardewRule.evaluate_while_simplifying(self, state)
+
+        memoized = memo.get(id(self))
+        if memoized is not None:
+            return memoized[1], memoized[2]
+
+        simplified, value = AggregatingStardewRule.evaluate_while_simplifying(self, state)
+        # Evaluating can update the reachable regions, then the value might not be the one of the new reachable regions.
+        if memo is get_rule_memo(state, self.player):
+            memo[id(self)] = self, simplified, value
+        return simplified, value
+
     def evaluate_while_simplifying(self, state: CollectionState) -> Tuple[StardewRule, bool]:
         """
         The global idea here is the same as short-circuiting operators, applied to evaluation and rule simplification.
@@ -361,6 +395,7 @@ class Count(BaseStardewRule):
     rules: List[StardewRule]
     counter: Counter[StardewRule]
     evaluate: Callable[[CollectionState], bool]
+    evaluate_unmemoized: Callable[[CollectionState], bool]
 
     total: Optional[int]
     rule_mapping: Optional[Dict[StardewRule, StardewRule]]
@@ -382,6 +417,24 @@ class Count(BaseStardewRule):
     def __call__(self, state: CollectionState) -> bool:
         return self.evaluate(state)
 
+    def memoize(self):
+        self.evaluate_unmemoized = self.evaluate
+        self.evaluate = self.evaluate_memoized
+
+    def evaluate_memoized(self, state: CollectionState) -> bool:
+        memo = get_rule_memo(state, self.player)
+        if memo is None:
+            return self.evaluate_unmemoized(state)
+
+        memoized = memo.get(id(self))
+        if memoized is not None:
+            return memoized[2]
+
+        value = self.evaluate_unmemoized(state)
+        if memo is get_rule_memo(state, self.player):
+            memo[id(self)] = self, self, value
+        return value
+
     def evaluate_without_shortcircuit(self, state: CollectionState) -> bool:
         c = 0
         for i in range(self.rules_count):
@@ -432,6 +485,10 @@ class Count(BaseStardewRule):
     def rules_count(self):
         return len(self.rules)
 
+    @cached_property
+    def player(self) -> Optional[int]:
+        return find_player(self.counter)
+
     def __repr__(self):
         return f"Received {self.count} [{', '.join(f'{value}x {repr(rule)}' for rule, value in self.counter.items())}]"
 
@@ -449,6 +506,10 @@ class Has(BaseStardewRule):
     def evaluate_while_simplifying(self, state: CollectionState) -> Tuple[StardewRule, bool]:
         return self.other_rules[self.item].evaluate_while_simplifying(state)
 
+    @property
+    def player(self) -> Optional[int]:
+        return getattr(self.other_rules.get(self.item), "player", None)
+
     def __str__(self):
         if self.item not in self.other_rules:
             return f"Has {self.item} ({self.group}) -> {MISSING_ITEM}"
@@ -479,3 +540,30 @@ class RepeatableChain(Iterable, Sized):
 
     def __contains__(self, item):
         return any(item in it for it in self.iterables)
+
+
+def memoize_shared_rules(rules: Iterable[StardewRule]) -> None:
+    """
+    Marks the rules used by at least MEMOIZED_RULE_MIN_USES of these rules or their sub-rules to be memoized, so they
+    are only evaluated once per state until the player's items or reachable regions change.
+    """
+    uses: Counter[int] = Counter()
+    rules_by_id: Dict[int, StardewRule] = {}
+    rules_to_visit = list(rules)
+    while rules_to_visit:
+        rule = rules_to_visit.pop()
+        uses[id(rule)] += 1
+        if id(rule) in rules_by_id:
+            continue
+        rules_by_id[id(rule)] = rule
+
+        if isinstance(rule, AggregatingStardewRule):
+            rules_to_visit.extend(rule.original_rules)
+        elif isinstance(rule, Count):
+            rules_to_visit.extend(rule.counter)
+        elif isinstance(rule, Has) and rule.item in rule.other_rules:
+            rules_to_visit.append(rule.other_rules[rule.item])
+
+    for rule_id, rule in rules_by_id.items():
+        if uses[rule_id] >= MEMOIZED_RULE_MIN_USES and isinstance(rule, (AggregatingStardewRule, Count)):
+            rule.memoize()
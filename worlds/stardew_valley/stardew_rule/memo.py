@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+
+from BaseClasses import CollectionState, MultiWorld
+from worlds.AutoWorld import LogicMixin
+
+if TYPE_CHECKING:
+    from .protocol import StardewRule
+
+GAME_NAME = "Stardew Valley"
+
+
+class VersionedCounter(Counter):
+    """
+    Counter of the items of a player, counting the changes to its content in version.
+    Collecting, removing and the add_item, remove_item and set_item helpers of CollectionState all change it item by
+    item, the methods setting many items at once are counted as one change.
+    """
+    version: int
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.version = 0
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key: str, value: int) -> None:
+        self.version += 1
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.version += 1
+        super().__delitem__(key)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self.version += 1
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key: str, default: int = 0) -> int:
+        self.version += 1
+        return super().setdefault(key, default)
+
+    def pop(self, *args: Any) -> int:
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[str, int]:
+        self.version += 1
+        return super().popitem()
+
+    def clear(self) -> None:
+        self.version += 1
+        super().clear()
+
+
+class RuleMemo:
+    """
+    Values of the rules of a player evaluated against a state, so rules shared by many locations are only evaluated once.
+    The values stay valid while the player's items and reachable regions don't change. The items change when their
+    counter is replaced, or when its version changes.
+    """
+    prog_items: Optional[VersionedCounter]
+    items_version: int
+    reachable_regions: int
+    values: Dict[int, Tuple[StardewRule, StardewRule, bool]]
+    """rule id -> (rule, simplified rule, value), the rule is kept so its id can't be reused"""
+
+    def __init__(self):
+        self.prog_items = None
+        self.items_version = -1
+        self.reachable_regions = -1
+        self.values = {}
+
+
+class StardewRuleMemoState(LogicMixin):
+    stardew_rule_memos: Dict[int, RuleMemo]
+
+    def init_mixin(self, multiworld: MultiWorld) -> None:
+        players = multiworld.get_game_players(GAME_NAME)
+        self.stardew_rule_memos = {player: RuleMemo() for player in players}
+        for player in players:
+            self.prog_items[player] = VersionedCounter(self.prog_items[player])
+        # a copy_mixin is intentionally excluded, a copied state starts with empty memos and copies of the counters
+
+
+def get_rule_memo(state: CollectionState, player: Optional[int]) \
+        -> Optional[Dict[int, Tuple[StardewRule, StardewRule, bool]]]:
+    """Returns the values of the player's rules evaluated against this state, or None if there is no memo for them."""
+    memo = state.stardew_rule_memos.get(player)
+    if memo is None:
+        return None
+    prog_items = state.prog_items[player]
+    if not isinstance(prog_items, VersionedCounter):
+        # items replaced by a plain Counter can't tell when they change
+        return None
+    reachable_regions = len(state.reachable_regions[player])
+    if (memo.reachable_regions != reachable_regions or memo.prog_items is not prog_items
+            or memo.items_version != prog_items.version):
+        memo.prog_items = prog_items
+        memo.items_version = prog_items.version
+        memo.reachable_regions = reachable_regions
+        memo.values = {}
+    return memo.values
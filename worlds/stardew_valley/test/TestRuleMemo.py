@@ -0,0 +1,67 @@
+from BaseClasses import CollectionState, ItemClassification
+from .bases import SVTestBase
+from ..stardew_rule import get_rule_memo
+
+
+class TestRuleMemo(SVTestBase):
+    skip_default_tests = True
+
+    def test_shared_rules_are_memoized(self):
+        memoized_rules = [rule for rule in self.get_all_rules()
+                          if "evaluate_while_simplifying" in vars(rule) or "evaluate_unmemoized" in vars(rule)]
+        self.assertTrue(memoized_rules)
+
+    def test_collect_invalidates_memo(self):
+        state = self.multiworld.state
+        for change in (lambda: self.collect("Progressive Pickaxe"),
+                       lambda: self.remove_one_by_name("Progressive Pickaxe")):
+            memo = get_rule_memo(state, self.player)
+            memo[0] = None
+            change()
+            self.assertEqual({}, get_rule_memo(state, self.player))
+
+    def test_item_helpers_invalidate_memo(self):
+        state = self.multiworld.state
+        for change in (lambda: state.add_item("Progressive Pickaxe", self.player),
+                       lambda: state.set_item("Progressive Pickaxe", self.player, 3),
+                       lambda: state.remove_item("Progressive Pickaxe", self.player, 3)):
+            memo = get_rule_memo(state, self.player)
+            memo[0] = None
+            change()
+            self.assertEqual({}, get_rule_memo(state, self.player))
+
+    def test_copy_starts_with_empty_memo(self):
+        self.multiworld.state.can_reach_location(self.get_real_location_names()[0], self.player)
+        copy = self.multiworld.state.copy()
+        self.assertIsNot(self.multiworld.state.stardew_rule_memos[self.player], copy.stardew_rule_memos[self.player])
+        self.assertEqual({}, copy.stardew_rule_memos[self.player].values)
+
+    def test_memoized_values_match_new_state(self):
+        """Tests that collecting items one by one gives the same reachable locations as collecting them in a new state."""
+        items = [item for item in self.multiworld.get_items()
+                 if item.code is not None and item.classification & ItemClassification.progression]
+        locations = self.get_real_locations()
+        collected = []
+        for item in items[:len(items) // 2:10]:
+            self.multiworld.state.collect(item)
+            collected.append(item)
+            new_state = CollectionState(self.multiworld)
+            for collected_item in collected:
+                new_state.collect(collected_item)
+            with self.subTest(items=len(collected)):
+                self.assertEqual([location.name for location in locations if new_state.can_reach(location)],
+                                 [location.name for location in locations if self.multiworld.state.can_reach(location)])
+
+    def get_all_rules(self):
+        rules = []
+        rules_to_visit = [location.access_rule for location in self.multiworld.get_locations(self.player)]
+        visited = set()
+        while rules_to_visit:
+            rule = rules_to_visit.pop()
+            if id(rule) in visited:
+                continue
+            visited.add(id(rule))
+            rules.append(rule)
+            rules_to_visit.extend(getattr(rule, "original_rules", ()))
+            rules_to_visit.extend(getattr(rule, "counter", ()))
+        return rules
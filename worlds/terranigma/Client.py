@@ -5,13 +5,16 @@ from NetUtils import ClientStatus, color, NetworkItem
 from worlds.AutoSNIClient import SNIClient
 from typing import TYPE_CHECKING
 from .Items import BASE_ID, item_table
-from .client_data import (
+from .Client_data import (
     # Game state addresses
     ARK_HP, ARK_MAX_HP, ARK_LEVEL, CURRENT_MAP, GAME_STATE_FLAGS,
     
     # AP-specific addresses
     AP_RECEIVED_ITEMS, AP_SENT_LOCATIONS, AP_ITEM_QUEUE, AP_DEATH_LINK, AP_CLIENT_STATE,
     
+    # Bulk read blocks and their flag bit tables
+    STATE_BLOCK, CHEST_BLOCK, AP_BLOCK, state_bit_locations, chest_bit_locations,
+    
     # Flag mappings
     chest_id_to_flag, boss_flags, event_flags, game_to_ap_item, ap_to_game_item,
     
@@ -29,6 +32,38 @@ snes_logger = logging.getLogger("SNES")
 ROM_START = 0x000000
 SRAM_START = 0x700000
 
+
+class FlagBlockDiff:
+    """
+    Keeps the previous snapshot of a block of flag bytes and turns the XOR diff against a new snapshot into
+    the locations whose flag got set or cleared, using a table from bit index to location id.
+    """
+    def __init__(self, bit_locations: typing.Dict[int, int]):
+        self.bit_locations = bit_locations
+        self.previous = 0
+
+    def reset(self) -> None:
+        self.previous = 0
+
+    def update(self, data: typing.Union[bytes, memoryview]) -> typing.Tuple[typing.List[int], typing.List[int]]:
+        """Returns the location ids of newly set and newly cleared flags since the last snapshot"""
+        current = int.from_bytes(data, "little")
+        diff = current ^ self.previous
+        self.previous = current
+        set_locations = []
+        cleared_locations = []
+        while diff:
+            lowest_bit = diff & -diff
+            diff ^= lowest_bit
+            location_id = self.bit_locations.get(lowest_bit.bit_length() - 1)
+            if location_id is not None:
+                if current & lowest_bit:
+                    set_locations.append(location_id)
+                else:
+                    cleared_locations.append(location_id)
+        return set_locations, cleared_locations
+
+
 class TerranigmaSNIClient(SNIClient):
     game = "Terranigma"
     patch_suffix = ".apterranigma"
@@ -36,6 +71,17 @@ class TerranigmaSNIClient(SNIClient):
     item_queue: typing.List[NetworkItem] = []
     death_link_enabled = False
 
+    def __init__(self) -> None:
+        self.chest_diff = FlagBlockDiff(chest_bit_locations)
+        self.state_diff = FlagBlockDiff(state_bit_locations)
+        # locations whose flag is set in SRAM, sent until the server confirms them
+        self.flagged_locations: typing.Set[int] = set()
+
+    def reset_snapshots(self) -> None:
+        self.chest_diff.reset()
+        self.state_diff.reset()
+        self.flagged_locations.clear()
+
     async def deathlink_kill_player(self, ctx: "SNIContext") -> None:
         """Kill the player for death link"""
         from SNIClient import DeathState, snes_buffered_write, snes_read, snes_flush_writes
@@ -64,6 +110,8 @@ class TerranigmaSNIClient(SNIClient):
             return False
 
         ctx.game = self.game
+        if ctx.rom != rom_name:
+            self.reset_snapshots()
         ctx.rom = rom_name
         ctx.items_handling = 0b111  # full remote
         ctx.allow_collect = True
@@ -76,16 +124,13 @@ class TerranigmaSNIClient(SNIClient):
         
         return True
 
-    async def pop_item(self, ctx: "SNIContext"):
+    async def pop_item(self, ctx: "SNIContext", game_state: int):
         """Give queued items to the player"""
-        from SNIClient import snes_read, snes_buffered_write
+        from SNIClient import snes_buffered_write
         
         if not self.item_queue:
             return
             
-        # Check if we can give items (not in cutscene, menu, etc.)
-        game_state = int.from_bytes(await snes_read(ctx, GAME_STATE_FLAGS, 1), "little")
-        
         # Only give items during normal gameplay (adjust conditions as needed)
         if game_state & 0x80:  # In cutscene or menu
             return
@@ -137,23 +182,30 @@ class TerranigmaSNIClient(SNIClient):
 
     async def game_watcher(self, ctx: "SNIContext") -> None:
         """Main game watching loop"""
-        from SNIClient import snes_read, snes_buffered_write, snes_flush_writes, DeathState
+        from SNIClient import snes_read_multi, snes_buffered_write, snes_flush_writes, DeathState
+
+        # Read everything this tick needs in one round trip, instead of one round trip per flag
+        memory = await snes_read_multi(ctx, (STATE_BLOCK, CHEST_BLOCK, AP_BLOCK))
+        if memory is None:
+            return
+        state_block = memory.read(*STATE_BLOCK)
+        chest_block = memory.read(*CHEST_BLOCK)
 
         # Check if we're connected and the ROM is valid
-        game_state = int.from_bytes(await snes_read(ctx, GAME_STATE_FLAGS, 1), "little")
+        game_state = memory[GAME_STATE_FLAGS]
         if not game_state:
             return
 
         # Handle death link
         if self.death_link_enabled:
-            current_hp = int.from_bytes(await snes_read(ctx, ARK_HP, 2), "little")
+            current_hp = memory.read_int(ARK_HP, 2)
             if current_hp == 0 and ctx.death_state == DeathState.alive and ctx.last_death_link + 1 < time.time():
                 await ctx.handle_deathlink_state(True, f"Ark died in the world of {ctx.player_names[ctx.slot]}.")
             elif current_hp > 0:
                 ctx.death_state = DeathState.alive
 
         # Handle received items
-        recv_count = int.from_bytes(await snes_read(ctx, AP_RECEIVED_ITEMS, 2), "little")
+        recv_count = memory.read_int(*AP_BLOCK)
         if recv_count < len(ctx.items_received):
             item = ctx.items_received[recv_count]
             recv_count += 1
@@ -170,38 +222,20 @@ class TerranigmaSNIClient(SNIClient):
             self.item_queue.append(item)
 
         # Process item queue
-        await self.pop_item(ctx)
-
-        # Check for new locations (chests opened, bosses defeated, etc.)
-        new_checks = []
-
-        # Check chest flags
-        for chest_id, (flag_addr, flag_bit) in chest_id_to_flag.items():
-            chest_flags = int.from_bytes(await snes_read(ctx, flag_addr, 1), "little")
-            location_id = BASE_ID + chest_id
-            
-            if (chest_flags & flag_bit) and location_id not in ctx.checked_locations:
-                new_checks.append(location_id)
-
-        # Check boss flags
-        boss_flag_data = int.from_bytes(await snes_read(ctx, GAME_STATE_FLAGS + 50, 4), "little")
-        for flag, location_id in boss_flags.items():
-            if (boss_flag_data & flag) and location_id not in ctx.checked_locations:
-                new_checks.append(location_id)
+        await self.pop_item(ctx, game_state)
 
-        # Check event flags
-        event_flag_data = int.from_bytes(await snes_read(ctx, GAME_STATE_FLAGS + 60, 4), "little")
-        for flag, location_id in event_flags.items():
-            if (event_flag_data & flag) and location_id not in ctx.checked_locations:
-                new_checks.append(location_id)
+        # Check for new locations (chests opened, bosses defeated, etc.) from the flags that changed since last tick
+        for flag_diff, block in ((self.chest_diff, chest_block), (self.state_diff, state_block)):
+            set_locations, cleared_locations = flag_diff.update(block)
+            self.flagged_locations.update(set_locations)
+            self.flagged_locations.difference_update(cleared_locations)
+        new_checks = sorted(location_id for location_id in self.flagged_locations
+                            if location_id not in ctx.checked_locations)
 
         # Check victory condition
-        victory_flag = int.from_bytes(await snes_read(ctx, GAME_STATE_FLAGS + 100, 1), "little")
-        if victory_flag & 0x80:  # Dark Gaia defeated
-            if special_locations["Dark Gaia Defeated"] not in ctx.checked_locations:
-                new_checks.append(special_locations["Dark Gaia Defeated"])
-                await ctx.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}])
-                ctx.finished_game = True
+        if special_locations["Dark Gaia Defeated"] in new_checks:
+            await ctx.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}])
+            ctx.finished_game = True
 
         # Send all new checks to the server
         if new_checks:
@@ -213,4 +247,4 @@ class TerranigmaSNIClient(SNIClient):
                     f'New Check: {location} ({len(ctx.locations_checked)}/'
                     f'{len(ctx.missing_locations) + len(ctx.checked_locations)})')
 
-        await snes_flush_writes(ctx)
\ No newline at end of file
+        await snes_flush_writes(ctx)
@@ -1,6 +1,8 @@
 # Terranigma client_data.py - Memory addresses and data structures
 # Based on actual addresses from the Terranigma Randomizer project
 
+from typing import Dict, Iterable, Tuple
+
 from .Items import BASE_ID
 
 # SNES Memory Layout
@@ -35,6 +37,11 @@ LOURAN_FLAGS = SRAM_START + 0x0720     # Louran progression
 LOIRE_FLAGS = SRAM_START + 0x0730      # Loire progression
 FREEDOM_FLAGS = SRAM_START + 0x0740    # Freedom progression
 
+# Flag words inside the game state area
+BOSS_FLAGS = GAME_STATE_FLAGS + 50     # Boss defeated flags (4 bytes)
+EVENT_FLAGS = GAME_STATE_FLAGS + 60    # Story event flags (4 bytes)
+VICTORY_FLAG = GAME_STATE_FLAGS + 100  # Bit 0x80 is set once Dark Gaia is defeated
+
 # AP-specific Memory Locations (custom addresses in expanded SRAM)
 AP_SLOT_DATA = SRAM_START + 0x2000         # AP options and settings
 AP_RECEIVED_ITEMS = SRAM_START + 0x2100    # Counter of items received from AP
@@ -184,4 +191,33 @@ special_locations = {
 
 # Death link configuration
 DEATH_LINK_ENABLED = AP_DEATH_LINK
-ARK_DEATH_STATE = SRAM_START + 0x2401      # 0 = alive, 1 = dead
\ No newline at end of file
+ARK_DEATH_STATE = SRAM_START + 0x2401      # 0 = alive, 1 = dead
+
+# Contiguous SRAM blocks the client reads together each tick, as (start address, size in bytes)
+STATE_BLOCK = (ARK_HP, VICTORY_FLAG + 1 - ARK_HP)  # HP, game state, boss, event and victory flags
+CHEST_BLOCK = (CHEST_FLAGS_START, 0x20)            # All chest flag bytes used by chest_id_to_flag
+AP_BLOCK = (AP_RECEIVED_ITEMS, 2)                  # Received item counter
+
+
+def build_bit_locations(block: Tuple[int, int], flags: Iterable[Tuple[int, int, int]]) -> Dict[int, int]:
+    """
+    Builds a table from bit index inside a block (8 * byte offset + bit) to location id.
+    Flags are (address, mask, location id), where mask is a single bit of the little endian value at address.
+    """
+    start, size = block
+    table = {}
+    for address, mask, location_id in flags:
+        bit = (address - start) * 8 + mask.bit_length() - 1
+        assert 0 <= bit < size * 8 and mask == mask & -mask, f"Flag {address:X}/{mask:X} is not a bit of the block"
+        table[bit] = location_id
+    return table
+
+
+chest_bit_locations = build_bit_locations(
+    CHEST_BLOCK, ((address, mask, BASE_ID + chest_id) for chest_id, (address, mask) in chest_id_to_flag.items()))
+
+state_bit_locations = build_bit_locations(STATE_BLOCK, [
+    *((BOSS_FLAGS, mask, location_id) for mask, location_id in boss_flags.items()),
+    *((EVENT_FLAGS, mask, location_id) for mask, location_id in event_flags.items()),
+    (VICTORY_FLAG, 0x80, special_locations["Dark Gaia Defeated"]),
+])
@@ -1,7 +1,8 @@
 # Terranigma Locations.py - defines all check locations in the game
 # Based on actual chest data from the Terranigma Randomizer KNOWN_CHESTS
 
-from typing import Dict, TYPE_CHECKING
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple, TYPE_CHECKING
 import logging
 
 from .Types import LocData
@@ -10,13 +11,10 @@ if TYPE_CHECKING:
     from . import TerranigmaWorld
 
 def get_total_locations(world: "TerranigmaWorld") -> int:
-    """Get the total number of locations based on options"""
-    total = 0
-    for name in location_table:
-        if is_valid_location(world, name):
-            total += 1
-    
-    return total
+    """Get the total number of locations based on options, counted once per world"""
+    if world.total_locations is None:
+        world.total_locations = sum(1 for name in location_table if is_valid_location(world, name))
+    return world.total_locations
 
 def get_location_names() -> Dict[str, int]:
     """Get mapping of location names to their AP codes"""
@@ -188,4 +186,10 @@ location_table = {
     **chest_locations,
     **event_locations,
     **shop_locations,
-}
\ No newline at end of file
+}
+
+# Locations of each region in location_table order, built once so region creation doesn't rescan location_table
+locations_by_region: Mapping[str, Tuple[Tuple[str, LocData], ...]] = MappingProxyType({
+    region: tuple((name, data) for name, data in location_table.items() if data.region == region)
+    for region in dict.fromkeys(data.region for data in location_table.values())
+})
@@ -63,12 +63,12 @@ class BossDifficulty(Choice):
     Adjusts boss difficulty scaling.
     Normal: Vanilla boss difficulty.
     Buffed: Bosses have increased stats.
-    Random: Boss stats randomized.
+    Randomized: Boss stats randomized.
     """
     display_name = "Boss Difficulty"
     option_normal = 0
     option_buffed = 1
-    option_random = 2
+    option_randomized = 2
     default = 0
 
 class TrapChance(Range):
@@ -3,7 +3,7 @@
 
 from BaseClasses import Region
 from .Types import TerranigmaLocation
-from .Locations import location_table, is_valid_location
+from .Locations import locations_by_region, is_valid_location
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -65,12 +65,11 @@ def create_region(world: "TerranigmaWorld", name: str) -> Region:
     reg = Region(name, world.player, world.multiworld)
     
     # Add all locations that belong to this region
-    for (key, data) in location_table.items():
-        if data.region == name:
-            if not is_valid_location(world, key):
-                continue
-            location = TerranigmaLocation(world.player, key, data.ap_code, reg)
-            reg.locations.append(location)
+    for (key, data) in locations_by_region.get(name, ()):
+        if not is_valid_location(world, key):
+            continue
+        location = TerranigmaLocation(world.player, key, data.ap_code, reg)
+        reg.locations.append(location)
     
     world.multiworld.regions.append(reg)
     return reg
@@ -1,14 +1,15 @@
+import mmap
 import os
 import pkgutil
 import Utils
 import hashlib
 import settings
-from worlds.Files import APAutoPatchInterface, APTokenMixin, APTokenTypes
+from worlds.Files import APProcedurePatch, APTokenMixin, APTokenTypes
 from typing import Iterable, TYPE_CHECKING, Optional
 from struct import pack
 
 if TYPE_CHECKING:
-    from . import TerranigmaWorld
+    from worlds.AutoWorld import OutputSnapshot
 
 # You need to replace this with your actual ROM hash
 # Get it with: Get-FileHash "path_to_your_rom.sfc" -Algorithm MD5
@@ -20,38 +21,24 @@ AP_ITEM_QUEUE = 0x001400         # Matches ASM !AP_ITEM_QUEUE
 AP_LOCATION_FLAGS = 0x001200     # Matches ASM !AP_SENT_LOCATIONS
 AP_ROM_NAME = 0x001700           # Matches ASM !AP_ROM_NAME
 
-class TerranigmaProcedurePatch(APAutoPatchInterface, APTokenMixin):
+class TerranigmaProcedurePatch(APProcedurePatch, APTokenMixin):
     hash = [TERRANIGMA_HASH]
     game = "Terranigma" 
     patch_file_ending = ".apterranigma"
     result_file_ending = ".sfc"
     name: bytearray
+    procedure = [
+        ("apply_tokens", ["token_data.bin"])
+    ]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
     @classmethod
     def get_source_data(cls) -> bytes:
-        return get_base_rom_bytes()
-
-    def patch(self, target: str) -> None:
-        """Apply the basepatch and tokens to create the final ROM"""
-        # Get the basepatch data
-        basepatch_data = pkgutil.get_data(__name__, os.path.join("data", "terranigma_basepatch.bsdiff4"))
-        if not basepatch_data:
-            raise Exception("Could not find terranigma_basepatch.bsdiff4")
-        
-        # Apply bsdiff4 patch
-        import bsdiff4
-        source_data = self.get_source_data()
-        patched_data = bytearray(bsdiff4.patch(source_data, basepatch_data))
-        
-        # Apply token patches (additional modifications)
-        self.apply_tokens(patched_data)
-        
-        # Write final ROM
-        with open(target, 'wb') as f:
-            f.write(patched_data)
+        # The basepatch only depends on the base ROM, so it is applied once and reused from the cache
+        with get_base_patched_rom() as base_patched_data:
+            return bytes(base_patched_data)
 
     def write_byte(self, offset: int, value: int):
         self.write_token(APTokenTypes.WRITE, offset, value.to_bytes(1, "little"))
@@ -62,18 +49,18 @@ class TerranigmaProcedurePatch(APAutoPatchInterface, APTokenMixin):
     def write_int32(self, offset: int, value: int):
         self.write_token(APTokenTypes.WRITE, offset, value.to_bytes(4, "little"))
 
-def patch_rom(world: "TerranigmaWorld", patch: TerranigmaProcedurePatch):
+def patch_rom(snapshot: "OutputSnapshot", patch: TerranigmaProcedurePatch):
     """Apply all patches needed for Terranigma AP integration"""
     
     # APAutoPatchInterface handles the basepatch automatically
     # We just need to write our additional data
     
     # Write player options to ROM (at addresses matching ASM)
-    write_options_to_rom(world, patch)
+    write_options_to_rom(snapshot, patch)
     
     # Generate unique ROM name for client identification
     patch_name = bytearray(
-        f'TER{Utils.__version__.replace(".", "")[0:3]}_{world.player}_{world.multiworld.seed:11}\0', 'utf8')[:32]
+        f'TER{Utils.__version__.replace(".", "")[0:3]}_{snapshot.player}_{snapshot.seed:11}\0', 'utf8')[:32]
     patch_name.extend([0] * (32 - len(patch_name)))
     patch.name = bytes(patch_name)
     
@@ -81,36 +68,38 @@ def patch_rom(world: "TerranigmaWorld", patch: TerranigmaProcedurePatch):
     patch.write_bytes(0x7FC0, patch.name[:21])  # SNES ROM title (21 bytes max)
     patch.write_bytes(AP_ROM_NAME, patch.name)  # AP client identifier (32 bytes)
 
-def write_options_to_rom(world: "TerranigmaWorld", patch: TerranigmaProcedurePatch):
+    patch.write_file("token_data.bin", patch.get_token_binary())
+
+def write_options_to_rom(snapshot: "OutputSnapshot", patch: TerranigmaProcedurePatch):
     """Write player options to ROM at addresses matching the ASM"""
     
     # Write options to AP_SLOT_DATA (matches !AP_SLOT_DATA in ASM)
-    patch.write_byte(AP_SLOT_DATA, world.options.starting_region.value)
-    patch.write_byte(AP_SLOT_DATA + 1, world.options.key_item_placement.value)
-    patch.write_byte(AP_SLOT_DATA + 2, int(world.options.equipment_scaling.value))
-    patch.write_byte(AP_SLOT_DATA + 3, int(world.options.shop_randomization.value))
-    patch.write_byte(AP_SLOT_DATA + 4, int(world.options.magic_randomization.value))
-    patch.write_byte(AP_SLOT_DATA + 5, world.options.boss_difficulty.value)
-    patch.write_byte(AP_SLOT_DATA + 6, world.options.trap_chance.value)
-    patch.write_byte(AP_SLOT_DATA + 7, world.options.speed_trap_weight.value)
-    patch.write_byte(AP_SLOT_DATA + 8, world.options.damage_trap_weight.value)
-    patch.write_byte(AP_SLOT_DATA + 9, world.options.confusion_trap_weight.value)
+    patch.write_byte(AP_SLOT_DATA, snapshot.options.starting_region.value)
+    patch.write_byte(AP_SLOT_DATA + 1, snapshot.options.key_item_placement.value)
+    patch.write_byte(AP_SLOT_DATA + 2, int(snapshot.options.equipment_scaling.value))
+    patch.write_byte(AP_SLOT_DATA + 3, int(snapshot.options.shop_randomization.value))
+    patch.write_byte(AP_SLOT_DATA + 4, int(snapshot.options.magic_randomization.value))
+    patch.write_byte(AP_SLOT_DATA + 5, snapshot.options.boss_difficulty.value)
+    patch.write_byte(AP_SLOT_DATA + 6, snapshot.options.trap_chance.value)
+    patch.write_byte(AP_SLOT_DATA + 7, snapshot.options.speed_trap_weight.value)
+    patch.write_byte(AP_SLOT_DATA + 8, snapshot.options.damage_trap_weight.value)
+    patch.write_byte(AP_SLOT_DATA + 9, snapshot.options.confusion_trap_weight.value)
     
     # Death link option (if available)
-    if hasattr(world.options, 'death_link'):
-        patch.write_byte(AP_SLOT_DATA + 10, int(world.options.death_link.value))
+    if hasattr(snapshot.options, 'death_link'):
+        patch.write_byte(AP_SLOT_DATA + 10, int(snapshot.options.death_link.value))
     
     # Write slot data for client
-    patch.write_int32(AP_SLOT_DATA + 20, len([loc for loc in world.multiworld.get_locations(world.player) 
-                                             if not loc.event and not loc.locked]))
-    patch.write_int32(AP_SLOT_DATA + 24, world.player)
+    patch.write_int32(AP_SLOT_DATA + 20, len([loc for loc in snapshot.locations
+                                             if loc.address is not None and not loc.locked]))
+    patch.write_int32(AP_SLOT_DATA + 24, snapshot.player)
 
 def get_base_rom_bytes() -> bytes:
     """Get the base Terranigma ROM data"""
-    rom_file: str = get_base_rom_path()
     base_rom_bytes: Optional[bytes] = getattr(get_base_rom_bytes, "base_rom_bytes", None)
     
     if not base_rom_bytes:
+        rom_file: str = get_base_rom_path()
         base_rom_bytes = bytes(Utils.read_snes_rom(open(rom_file, "rb")))
 
         # Validate ROM hash
@@ -122,6 +111,34 @@ def get_base_rom_bytes() -> bytes:
         get_base_rom_bytes.base_rom_bytes = base_rom_bytes
     return base_rom_bytes
 
+def get_base_patched_rom() -> mmap.mmap:
+    """
+    Get the base ROM with terranigma_basepatch.bsdiff4 applied, memory mapped from Utils.cache_path.
+    The cache file is named after the hashes of the base ROM and the basepatch, so it is rebuilt if either changes.
+    """
+    basepatch_data = pkgutil.get_data(__name__, os.path.join("data", "terranigma_basepatch.bsdiff4"))
+    if not basepatch_data:
+        raise Exception("Could not find terranigma_basepatch.bsdiff4")
+    source_data = get_base_rom_bytes()
+    source_hash: Optional[str] = getattr(get_base_patched_rom, "source_hash", None)
+    if not source_hash:
+        source_hash = hashlib.sha256(source_data).hexdigest()
+        get_base_patched_rom.source_hash = source_hash
+    cache_file = Utils.cache_path("terranigma", f"{source_hash[:16]}_{hashlib.sha256(basepatch_data).hexdigest()[:16]}.sfc")
+
+    if not os.path.exists(cache_file):
+        import bsdiff4
+        patched_data = bsdiff4.patch(source_data, basepatch_data)
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        # write to a temporary file first, so other processes never map a partially written ROM
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, "wb") as f:
+            f.write(patched_data)
+        os.replace(temp_file, cache_file)
+
+    with open(cache_file, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
 def get_base_rom_path(file_name: str = "") -> str:
     """Get the path to the base Terranigma ROM"""
     options: settings.Settings = settings.get_settings()
@@ -4,8 +4,8 @@ import logging
 import os
 
 from BaseClasses import MultiWorld, Item, Tutorial
-from worlds.AutoWorld import World, CollectionState, WebWorld
-from typing import Dict
+from worlds.AutoWorld import World, CollectionState, OutputSnapshot, WebWorld
+from typing import Dict, Optional
 
 from .Locations import get_location_names, get_total_locations
 from .Items import create_item, create_itempool, item_table
@@ -14,6 +14,7 @@ from .Regions import create_regions
 from .Rules import set_rules
 from .Types import TerranigmaItem
 from .Rom import patch_rom, TerranigmaProcedurePatch  # Added ROM imports
+from .Client import TerranigmaSNIClient
 
 class TerranigmaWeb(WebWorld):
     theme = "grass"
@@ -40,7 +41,7 @@ class TerranigmaWorld(World):
     item_name_to_id = {name: data.ap_code for name, data in item_table.items()}
     location_name_to_id = get_location_names()
     options_dataclass = TerranigmaOptions
-    options = TerranigmaOptions
+    options: TerranigmaOptions
     web = TerranigmaWeb()
 
     required_client_version = (0, 4, 4)
@@ -49,6 +50,7 @@ class TerranigmaWorld(World):
         super().__init__(multiworld, player)
         self.locked_items = []
         self.victory_location = None
+        self.total_locations: Optional[int] = None
 
     def generate_early(self):
         starting_region = self.options.starting_region.value
@@ -90,15 +92,18 @@ class TerranigmaWorld(World):
     
     def generate_output(self, output_directory: str) -> None:
         """Generate the ROM patch for this world"""
+        self.generate_output_from_snapshot(self.get_output_snapshot(), output_directory)
+
+    @classmethod
+    def generate_output_from_snapshot(cls, snapshot: OutputSnapshot, output_directory: str) -> None:
+        """Generate the ROM patch from a snapshot, this can run in a separate process"""
         try:
             # Create the patch using our basepatch
-            patch = TerranigmaProcedurePatch(player=self.player, 
-                                           player_name=self.multiworld.player_name[self.player])
-            patch_rom(self, patch)
+            patch = TerranigmaProcedurePatch(player=snapshot.player, player_name=snapshot.player_name)
+            patch_rom(snapshot, patch)
             
             # Write the patch file
-            patch_path = os.path.join(output_directory,
-                                    f"{self.multiworld.get_out_file_name_base(self.player)}{patch.patch_file_ending}")
+            patch_path = os.path.join(output_directory, f"{snapshot.out_file_name_base}{patch.patch_file_ending}")
             patch.write(patch_path)
             
         except Exception as e:
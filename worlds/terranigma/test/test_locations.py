@@ -0,0 +1,21 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from .. import Locations
+from ..Locations import get_total_locations, location_table
+
+
+class TestTotalLocations(unittest.TestCase):
+    def test_counted_per_world(self) -> None:
+        """Tests that worlds whose options filter different locations don't share their location count."""
+        filtered_location = next(iter(location_table))
+        worlds = [SimpleNamespace(player=player, total_locations=None) for player in (1, 2)]
+        with mock.patch.object(Locations, "is_valid_location",
+                               lambda world, name: world.player == 1 or name != filtered_location):
+            counts = [get_total_locations(world) for world in worlds]
+        self.assertEqual([len(location_table), len(location_table) - 1], counts)
+
+        # the count is kept with the world, for the item pool and slot data
+        with mock.patch.object(Locations, "is_valid_location", side_effect=AssertionError):
+            self.assertEqual(counts, [get_total_locations(world) for world in worlds])
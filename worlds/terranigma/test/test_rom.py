@@ -0,0 +1,123 @@
+import hashlib
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import bsdiff4
+
+import Utils
+from .. import Rom
+from ..Rom import TerranigmaProcedurePatch, get_base_patched_rom, get_base_rom_bytes
+
+
+class TestBasePatchedRom(unittest.TestCase):
+    """Tests patching with the base-patched ROM from the cache, using a fake base ROM and basepatch."""
+
+    def setUp(self) -> None:
+        rng = random.Random(1)
+        self.base_rom = rng.randbytes(0x10000)
+        self.basepatch = self.make_basepatch(rng)
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache_tempdir = tempfile.TemporaryDirectory()
+        self.original_cache_path = getattr(Utils.cache_path, "cached_path", None)
+        Utils.cache_path.cached_path = self.cache_tempdir.name
+        self.original_base_rom_bytes = getattr(get_base_rom_bytes, "base_rom_bytes", None)
+        get_base_rom_bytes.base_rom_bytes = self.base_rom
+
+        get_data = mock.patch.object(Rom.pkgutil, "get_data", side_effect=lambda package, resource: self.basepatch)
+        get_data.start()
+        self.addCleanup(get_data.stop)
+        self.bsdiff4_patch = mock.patch.object(bsdiff4, "patch", wraps=bsdiff4.patch)
+        self.bsdiff4_patch.start()
+        self.addCleanup(self.bsdiff4_patch.stop)
+
+    def tearDown(self) -> None:
+        self.forget_in_process_data()
+        get_base_rom_bytes.base_rom_bytes = self.original_base_rom_bytes
+        if self.original_cache_path is None:
+            del Utils.cache_path.cached_path
+        else:
+            Utils.cache_path.cached_path = self.original_cache_path
+        self.cache_tempdir.cleanup()
+        self.tempdir.cleanup()
+
+    def make_basepatch(self, rng: random.Random) -> bytes:
+        base_patched_rom = bytearray(self.base_rom)
+        base_patched_rom[0x100:0x200] = rng.randbytes(0x100)
+        self.base_patched_rom = bytes(base_patched_rom)
+        return bsdiff4.diff(self.base_rom, self.base_patched_rom)
+
+    @staticmethod
+    def forget_in_process_data() -> None:
+        """Drops what a new process wouldn't have yet, so only the cache file is left."""
+        if hasattr(TerranigmaProcedurePatch, "source_data"):
+            del TerranigmaProcedurePatch.source_data
+        if hasattr(get_base_patched_rom, "source_hash"):
+            del get_base_patched_rom.source_hash
+
+    @property
+    def bsdiff4_calls(self) -> int:
+        return bsdiff4.patch.call_count  # type: ignore[attr-defined]
+
+    def cache_file(self) -> str:
+        return os.path.join(self.cache_tempdir.name, "terranigma",
+                            f"{hashlib.sha256(self.base_rom).hexdigest()[:16]}_"
+                            f"{hashlib.sha256(self.basepatch).hexdigest()[:16]}.sfc")
+
+    def patch(self) -> bytes:
+        """Writes a container with one token, then patches it like a fresh process would."""
+        self.forget_in_process_data()
+        patch = TerranigmaProcedurePatch(player=1, player_name="Player")
+        patch.write_byte(0x10, 0xAB)
+        patch.write_file("token_data.bin", patch.get_token_binary())
+        container_path = os.path.join(self.tempdir.name, "test.apterranigma")
+        patch.write(container_path)
+
+        target = os.path.join(self.tempdir.name, "test.sfc")
+        TerranigmaProcedurePatch(container_path).patch(target)
+        with open(target, "rb") as f:
+            return f.read()
+
+    def expected_rom(self) -> bytes:
+        rom = bytearray(self.base_patched_rom)
+        rom[0x10] = 0xAB
+        return bytes(rom)
+
+    def test_second_patch_skips_bsdiff4(self) -> None:
+        """Tests that only the first patch applies the basepatch, later ones map the cached result."""
+        self.assertEqual(self.patch(), self.expected_rom())
+        self.assertEqual(self.bsdiff4_calls, 1)
+        self.assertEqual(self.patch(), self.expected_rom())
+        self.assertEqual(self.bsdiff4_calls, 1)
+
+    def test_cache_file(self) -> None:
+        """Tests that the cache file is named after both hashes, and is renamed into place from a temporary file."""
+        with mock.patch.object(os, "replace", wraps=os.replace) as replace:
+            self.patch()
+        replace.assert_called_once_with(f"{self.cache_file()}.{os.getpid()}.tmp", self.cache_file())
+        self.assertEqual(os.listdir(os.path.dirname(self.cache_file())), [os.path.basename(self.cache_file())])
+        with open(self.cache_file(), "rb") as f:
+            self.assertEqual(f.read(), self.base_patched_rom)
+
+    def test_changed_basepatch(self) -> None:
+        """Tests that a different basepatch misses the cache, instead of reusing the other basepatch's ROM."""
+        self.patch()
+        old_cache_file = self.cache_file()
+        self.basepatch = self.make_basepatch(random.Random(2))
+        self.assertNotEqual(self.cache_file(), old_cache_file)
+        self.assertEqual(self.patch(), self.expected_rom())
+        self.assertEqual(self.bsdiff4_calls, 2)
+        self.assertTrue(os.path.isfile(self.cache_file()))
+
+    def test_changed_base_rom(self) -> None:
+        """Tests that a different base ROM misses the cache."""
+        self.patch()
+        old_cache_file = self.cache_file()
+        self.base_rom = get_base_rom_bytes.base_rom_bytes = random.Random(2).randbytes(0x10000)
+        self.basepatch = self.make_basepatch(random.Random(3))
+        self.assertNotEqual(self.cache_file(), old_cache_file)
+        self.assertEqual(self.patch(), self.expected_rom())
+        self.assertEqual(self.bsdiff4_calls, 2)
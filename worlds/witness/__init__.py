@@ -19,7 +19,7 @@ from .hints import CompactHintData, create_all_hints, make_compact_hint_data, ma
 from .locations import WitnessPlayerLocations
 from .options import TheWitnessOptions, witness_option_groups
 from .player_items import WitnessItem, WitnessPlayerItems
-from .player_logic import WitnessPlayerLogic
+from .player_logic import WitnessPlayerLogic, get_player_logic
 from .presets import witness_option_presets
 from .regions import WitnessPlayerRegions
 from .rules import set_rules
@@ -66,6 +66,7 @@ class WitnessWorld(World):
     """
     game = "The Witness"
     topology_present = False
+    parallel_safe = True
     web = WitnessWebWorld()
 
     origin_region_name = "Entry"
@@ -159,7 +160,7 @@ class WitnessWorld(World):
     def generate_early(self) -> None:
         disabled_locations = self.options.exclude_locations.value
 
-        self.player_logic = WitnessPlayerLogic(
+        self.player_logic = get_player_logic(
             self, disabled_locations, self.options.start_inventory.value
         )
 
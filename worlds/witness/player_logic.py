@@ -16,8 +16,9 @@ When the world has parsed its options, a second function is called to finalize t
 """
 
 import copy
-from collections import defaultdict
-from typing import TYPE_CHECKING, Dict, List, Set, Tuple, cast
+import threading
+from collections import OrderedDict, defaultdict
+from typing import TYPE_CHECKING, Any, Dict, List, Set, Tuple, cast
 
 from .data import static_logic as static_witness_logic
 from .data.definition_classes import ConnectionDefinition, WitnessRule
@@ -54,9 +55,40 @@ from .entity_hunt import EntityHuntPicker
 if TYPE_CHECKING:
     from . import WitnessWorld
 
+# The options the derivation of WitnessPlayerLogic depends on. Any option it reads has to be listed here.
+LOGIC_OPTIONS = (
+    "puzzle_randomization",
+    "victory_condition",
+    "shuffle_symbols",
+    "shuffle_doors",
+    "door_groupings",
+    "shuffle_lasers",
+    "shuffle_boat",
+    "shuffle_dog",
+    "shuffle_discarded_panels",
+    "shuffle_vault_boxes",
+    "shuffle_EPs",
+    "EP_difficulty",
+    "obelisk_keys",
+    "disable_non_randomized_puzzles",
+    "early_caves",
+    "elevators_come_to_you",
+    "shuffle_postgame",
+    "mountain_lasers",
+    "challenge_lasers",
+    "panel_hunt_postgame",
+    "easter_egg_hunt",
+)
+
 
 class WitnessPlayerLogic:
-    """WITNESS LOGIC CLASS"""
+    """
+    WITNESS LOGIC CLASS
+
+    The derived logic only depends on the options in LOGIC_OPTIONS, the disabled locations and the starting items,
+    so it is shared by all players with the same ones. Use get_player_logic to get the logic of a player.
+    Except for HUNT_ENTITIES and EVENT_ITEM_PAIRS, which are picked per player, it must not be modified.
+    """
 
     VICTORY_LOCATION: str
 
@@ -151,19 +183,27 @@ class WitnessPlayerLogic:
         # This will make the access conditions way faster, instead of recursively checking dependent entities each time.
         self.make_dependency_reduced_checklist()
 
-        if world.options.victory_condition == "panel_hunt":
-            picker = EntityHuntPicker(self, world, self.PRE_PICKED_HUNT_ENTITIES)
-            self.HUNT_ENTITIES = picker.pick_panel_hunt_panels(world.options.panel_hunt_total.value)
-
         if world.options.easter_egg_hunt:
             self.finalize_easter_eggs(world)
 
         # Finalize which items actually exist in the MultiWorld and which get grouped into progressive items.
         self.finalize_items()
 
-        # Create event-item pairs for specific panels in the game.
+        # Determine the events of specific panels in the game.
         self.make_event_panel_lists()
 
+    def pick_for_player(self, world: "WitnessWorld") -> None:
+        """
+        Makes the choices of a player that aren't shared with other players with the same logic:
+        Picks the panel hunt entities and creates the event-item pairs.
+        """
+
+        if world.options.victory_condition == "panel_hunt":
+            picker = EntityHuntPicker(self, world, self.PRE_PICKED_HUNT_ENTITIES)
+            self.HUNT_ENTITIES = picker.pick_panel_hunt_panels(world.options.panel_hunt_total.value)
+
+        self.make_event_item_pairs()
+
     def reduce_req_within_region(self, entity_hex: str) -> WitnessRule:
         """
         Panels in this game often only turn on when other panels are solved.
@@ -1056,7 +1096,7 @@ class WitnessPlayerLogic:
 
     def make_event_panel_lists(self) -> None:
         """
-        Makes event-item pairs for entities with associated events, unless these entities are disabled.
+        Determines the events of entities with associated events, unless these entities are disabled.
         """
 
         self.USED_EVENT_NAMES_BY_HEX[self.VICTORY_LOCATION].append("Victory")
@@ -1069,6 +1109,13 @@ class WitnessPlayerLogic:
             if self.solvability_guaranteed(event_hex)
         }
 
+    def make_event_item_pairs(self) -> None:
+        """
+        Makes event-item pairs for entities with associated events, hunt entities and regions with easter eggs.
+        """
+
+        self.EVENT_ITEM_PAIRS = {}
+
         for entity_hex, event_names in self.USED_EVENT_NAMES_BY_HEX.items():
             entity_obj = self.REFERENCE_LOGIC.ENTITIES_BY_HEX[entity_hex]
             entity_name = entity_obj["checkName"]
@@ -1098,4 +1145,44 @@ class WitnessPlayerLogic:
             event_name = f"+{easter_egg_count} Easter Egg{plural}"
             self.EVENT_ITEM_PAIRS[f"{region_name} Easter Egg{plural}"] = (event_name, region_name)
 
-        return
+
+derived_logic_cache: "OrderedDict[Tuple[Any, ...], WitnessPlayerLogic]" = OrderedDict()
+"""
+Derived logic by fingerprint, shared between players and between multiworlds generated in this process.
+Only the derived_logic_cache_size most recently used fingerprints are kept.
+"""
+
+derived_logic_cache_size = 16
+derived_logic_lock = threading.Lock()
+"""Guards derived_logic_cache, for worlds generating in parallel."""
+
+
+def get_logic_fingerprint(world: "WitnessWorld", disabled_locations: Set[str],
+                          start_inv: Dict[str, int]) -> Tuple[Any, ...]:
+    """Returns a canonical fingerprint of everything the derivation of WitnessPlayerLogic depends on."""
+    option_values = []
+    for option_name in LOGIC_OPTIONS:
+        value = getattr(world.options, option_name).value
+        option_values.append(frozenset(value) if isinstance(value, (set, frozenset)) else value)
+    return tuple(option_values), frozenset(disabled_locations), frozenset(start_inv)
+
+
+def get_player_logic(world: "WitnessWorld", disabled_locations: Set[str],
+                     start_inv: Dict[str, int]) -> WitnessPlayerLogic:
+    """
+    Returns the logic of a player, derived from the options only once for all players with the same fingerprint.
+    The derived logic is shared, the panel hunt entities and event-item pairs are the player's own.
+    """
+    fingerprint = get_logic_fingerprint(world, disabled_locations, start_inv)
+    with derived_logic_lock:
+        shared_logic = derived_logic_cache.get(fingerprint)
+        if shared_logic is None:
+            shared_logic = derived_logic_cache[fingerprint] = WitnessPlayerLogic(world, disabled_locations, start_inv)
+            if len(derived_logic_cache) > derived_logic_cache_size:
+                derived_logic_cache.popitem(last=False)
+        else:
+            derived_logic_cache.move_to_end(fingerprint)
+
+    player_logic = copy.copy(shared_logic)
+    player_logic.pick_for_player(world)
+    return player_logic
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from .. import player_logic
+from ..player_logic import derived_logic_cache, get_logic_fingerprint, get_player_logic
+from ..test.bases import WitnessMultiworldTestBase
+
+
+class TestSharedPlayerLogic(WitnessMultiworldTestBase):
+    options_per_world = [
+        {},
+        {},
+        {
+            "shuffle_doors": "doors",
+        },
+    ]
+
+    common_options = {
+        "victory_condition": "panel_hunt",
+        "panel_hunt_total": 40,
+    }
+
+    def test_shared_between_same_options(self) -> None:
+        logic_1, logic_2, logic_3 = (world.player_logic for world in self.multiworld.worlds.values())
+
+        with self.subTest("Check that players with the same options share the derived logic"):
+            self.assertIs(logic_1.REQUIREMENTS_BY_HEX, logic_2.REQUIREMENTS_BY_HEX)
+            self.assertIs(logic_1.CONNECTIONS_BY_REGION_NAME, logic_2.CONNECTIONS_BY_REGION_NAME)
+            self.assertIn(logic_1.REQUIREMENTS_BY_HEX,
+                          [shared_logic.REQUIREMENTS_BY_HEX for shared_logic in derived_logic_cache.values()])
+
+        with self.subTest("Check that players with different options don't share the derived logic"):
+            self.assertIsNot(logic_1.REQUIREMENTS_BY_HEX, logic_3.REQUIREMENTS_BY_HEX)
+            self.assertNotEqual(logic_1.REQUIREMENTS_BY_HEX, logic_3.REQUIREMENTS_BY_HEX)
+
+        with self.subTest("Check that players pick their own hunt entities"):
+            self.assertEqual(len(logic_1.HUNT_ENTITIES), 40)
+            self.assertEqual(len(logic_2.HUNT_ENTITIES), 40)
+            self.assertNotEqual(logic_1.HUNT_ENTITIES, logic_2.HUNT_ENTITIES)
+            self.assertIsNot(logic_1.EVENT_ITEM_PAIRS, logic_2.EVENT_ITEM_PAIRS)
+            hunt_events_1 = {entity for item, entity in logic_1.EVENT_ITEM_PAIRS.values() if item == "+1 Panel Hunt"}
+            self.assertEqual(logic_1.HUNT_ENTITIES, hunt_events_1)
+
+    def test_cache_bounded(self) -> None:
+        world_1, world_3 = self.multiworld.worlds[1], self.multiworld.worlds[3]
+        args_1 = (world_1, world_1.options.exclude_locations.value, world_1.options.start_inventory.value)
+        args_3 = (world_3, world_3.options.exclude_locations.value, world_3.options.start_inventory.value)
+
+        derived_logic_cache.clear()
+        with mock.patch.object(player_logic, "derived_logic_cache_size", 1):
+            get_player_logic(*args_1)
+            get_player_logic(*args_3)
+
+        self.assertEqual([get_logic_fingerprint(*args_3)], list(derived_logic_cache))
+
+    def test_parallel_players(self) -> None:
+        world_1 = self.multiworld.worlds[1]
+        args_1 = (world_1, world_1.options.exclude_locations.value, world_1.options.start_inventory.value)
+
+        derived_logic_cache.clear()
+        with ThreadPoolExecutor(4) as pool:
+            logics = list(pool.map(lambda _: get_player_logic(*args_1), range(8)))
+
+        self.assertEqual([get_logic_fingerprint(*args_1)], list(derived_logic_cache))
+        for logic in logics:
+            self.assertIs(logic.REQUIREMENTS_BY_HEX, logics[0].REQUIREMENTS_BY_HEX)